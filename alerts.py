@@ -0,0 +1,274 @@
+"""헤드리스 알림 데몬
+
+설정한 종목/간격을 계속 돌면서 조건(지지선 근접, RSI 과매도, POC 돌파 등)을
+검사하고, 조건이 새로 맞을 때만 알림을 파일/웹훅/표준 출력으로 보낸다.
+
+한 주기에 현재가 API를 한 번만 호출해 모든 종목 가격을 받고, RSI는 종목별
+증분 지표 엔진(IndicatorEngine)으로 O(1) 갱신한다. 지지/저항선, POC, 매매
+신호는 새 캔들이 시작될 때(직전 캔들 마감)만 analyze()로 다시 계산한다.
+
+    python alerts.py KRW-BTC KRW-ETH -i 1시간 --rule near_support=1 --rule rsi_below=30
+    python alerts.py --all -i 15분 --rule poc_cross --output alerts.jsonl --period 5
+"""
+import argparse
+import json
+import sys
+import time
+
+import requests
+
+from analysis import analyze
+from indicators import IndicatorEngine
+from live_stream import candle_start
+from upbit_api import INTERVAL_ENDPOINTS, fetch_candles, fetch_markets, fetch_tickers
+
+_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+DEFAULT_PERIOD = 5      # 검사 주기(초)
+DEFAULT_COOLDOWN = 600  # 같은 알림을 다시 보내기까지 최소 간격(초)
+REFRESH_PER_TICK = 10   # 한 주기에 캔들을 다시 받을 최대 (종목, 간격) 수 (요청 한도 보호)
+
+
+def _distance_pct(a, b):
+    return abs(a - b) / b * 100
+
+
+# 조건 이름 -> (state, price, value) -> 충족 여부. value는 --rule 이름=값의 값
+CONDITIONS = {
+    'near_support': lambda s, price, value: s.nearest_support is not None
+        and _distance_pct(price, s.nearest_support) <= value,
+    'near_resistance': lambda s, price, value: s.nearest_resistance is not None
+        and _distance_pct(price, s.nearest_resistance) <= value,
+    'rsi_below': lambda s, price, value: s.rsi is not None and s.rsi < value,
+    'rsi_above': lambda s, price, value: s.rsi is not None and s.rsi > value,
+    'poc_cross': lambda s, price, value: s.poc_price is not None and s.prev_price is not None
+        and (s.prev_price - s.poc_price) * (price - s.poc_price) < 0,
+    'buy_signal': lambda s, price, value: s.best_buy is not None and price <= s.best_buy,
+    'sell_signal': lambda s, price, value: s.best_sell is not None and price >= s.best_sell,
+}
+
+DEFAULT_VALUES = {'near_support': 1.0, 'near_resistance': 1.0, 'rsi_below': 30, 'rsi_above': 70}
+
+
+def parse_rule(text):
+    """'이름' 또는 '이름=값' → (이름, 값)"""
+    name, _, value = text.partition('=')
+    if name not in CONDITIONS:
+        raise argparse.ArgumentTypeError(f"알 수 없는 조건: {name} (가능: {', '.join(CONDITIONS)})")
+    return name, float(value) if value else DEFAULT_VALUES.get(name)
+
+
+class MarketState:
+    """한 (market, interval)의 증분 상태: 지표 엔진과 마지막으로 계산한 레벨/신호"""
+
+    def __init__(self, market, interval):
+        self.market = market
+        self.interval = interval
+        self.engine = IndicatorEngine(history_size=2)
+        self.candle_key = None  # 레벨을 계산한 마지막 캔들 시각 (UTC 문자열)
+        self.nearest_support = None
+        self.nearest_resistance = None
+        self.poc_price = None
+        self.best_buy = None
+        self.best_sell = None
+        self.rsi = None
+        self.prev_price = None
+
+    def refresh(self, df):
+        """새로 받은 캔들로 레벨/신호 다시 계산, 지표 엔진 재초기화"""
+        result = analyze(df, self.market, self.interval)
+        self.candle_key = df['candle_date_time_utc'].iloc[-1]
+        self.nearest_support = result.nearest_support
+        self.nearest_resistance = result.nearest_resistance
+        self.poc_price = result.poc_price
+        self.best_buy = result.buy_signals[0][1] if result.buy_signals else None
+        self.best_sell = result.sell_signals[0][1] if result.sell_signals else None
+        self.rsi = result.rsi
+        with self.engine.lock:
+            self.engine.seed(df['candle_date_time_utc'], df['trade_price'])
+
+    def update_price(self, price, key):
+        """현재가를 진행 중인 캔들 종가로 반영하고 RSI 갱신"""
+        with self.engine.lock:
+            values = self.engine.update(key, price)
+        rsi = values['RSI'] if values else None
+        self.rsi = None if rsi is None or rsi != rsi else rsi  # NaN 제외
+
+
+class FileSink:
+    """알림을 JSON Lines 파일에 덧붙인다"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, alert):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(alert, ensure_ascii=False) + '\n')
+
+
+class WebhookSink:
+    """알림을 JSON으로 POST (실패해도 데몬은 계속 돈다)"""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def emit(self, alert):
+        try:
+            self.session.post(self.url, json=alert, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"웹훅 전송 실패: {e}", file=sys.stderr)
+
+
+class StdoutSink:
+    def emit(self, alert):
+        print(json.dumps(alert, ensure_ascii=False), flush=True)
+
+
+class AlertDaemon:
+    """종목/간격/조건 조합을 주기적으로 검사하는 알림 루프
+
+    조건이 거짓→참으로 바뀔 때만 알림을 보내고, 같은 알림은 cooldown초 안에
+    다시 보내지 않는다.
+    """
+
+    def __init__(self, markets, intervals, rules, sinks, count=200, fetch=fetch_candles,
+                 cooldown=DEFAULT_COOLDOWN, refresh_per_tick=REFRESH_PER_TICK):
+        self.markets = list(markets)
+        self.rules = list(rules)
+        self.sinks = list(sinks)
+        self.count = count
+        self.fetch = fetch
+        self.cooldown = cooldown
+        self.refresh_per_tick = refresh_per_tick
+        self.states = [MarketState(m, i) for m in self.markets for i in intervals]
+        self.active = set()   # 지금 참인 (market, interval, 조건)
+        self.last_sent = {}   # (market, interval, 조건) -> 마지막 알림 시각
+
+    def _refresh(self, stale):
+        """캔들을 다시 받아야 하는 상태를 최대 refresh_per_tick개 갱신 (나머지는 다음 주기)"""
+        for state in stale[:self.refresh_per_tick]:
+            try:
+                df = self.fetch(state.market, state.interval, self.count)
+            except Exception as e:
+                print(f"{state.market} {state.interval} 캔들 조회 실패: {e}", file=sys.stderr)
+                continue
+            if len(df) >= 20:
+                state.refresh(df)
+
+    def tick(self, now=None):
+        """한 주기 검사 후 이번에 보낸 알림 목록 반환"""
+        now = time.time() if now is None else now
+        tickers = {t['market']: t for t in fetch_tickers(self.markets)}
+
+        stale = []
+        keys = {}
+        for state in self.states:
+            ticker = tickers.get(state.market)
+            if ticker is None:
+                continue
+            key = candle_start(ticker['trade_timestamp'], state.interval).strftime(_TIME_FORMAT)
+            keys[id(state)] = key
+            if state.candle_key is None or key > state.candle_key:
+                stale.append(state)
+        self._refresh(stale)
+
+        sent = []
+        for state in self.states:
+            ticker = tickers.get(state.market)
+            if ticker is None or state.candle_key is None:
+                continue
+            price = ticker['trade_price']
+            state.update_price(price, keys[id(state)])
+
+            for name, value in self.rules:
+                alert_key = (state.market, state.interval, name)
+                if not CONDITIONS[name](state, price, value):
+                    self.active.discard(alert_key)
+                    continue
+                last = self.last_sent.get(alert_key)
+                if alert_key in self.active or (last is not None and now - last < self.cooldown):
+                    self.active.add(alert_key)
+                    continue
+                self.active.add(alert_key)
+                self.last_sent[alert_key] = now
+                alert = {
+                    'time': time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(now)),
+                    'market': state.market,
+                    'interval': state.interval,
+                    'condition': name,
+                    'value': value,
+                    'price': price,
+                    'rsi': state.rsi,
+                    'nearest_support': state.nearest_support,
+                    'nearest_resistance': state.nearest_resistance,
+                    'poc_price': state.poc_price
+                }
+                for sink in self.sinks:
+                    sink.emit(alert)
+                sent.append(alert)
+            state.prev_price = price
+        return sent
+
+    def run(self, period=DEFAULT_PERIOD):
+        while True:
+            started = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:  # 네트워크 오류는 다음 주기에 다시 시도
+                print(f"검사 실패: {e}", file=sys.stderr)
+            time.sleep(max(0, period - (time.monotonic() - started)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="업비트 매매 조건 알림 데몬")
+    parser.add_argument('markets', nargs='*', help="감시할 마켓 코드 (예: KRW-BTC)")
+    parser.add_argument('--all', action='store_true', help="원화 마켓 전체 감시")
+    parser.add_argument('--limit', type=int, default=None, help="--all 사용 시 앞에서부터 N개만")
+    parser.add_argument('-i', '--interval', nargs='+', default=['1시간'], choices=list(INTERVAL_ENDPOINTS))
+    parser.add_argument('-n', '--count', type=int, default=200, help="레벨 계산에 쓸 캔들 개수")
+    parser.add_argument('--rule', type=parse_rule, action='append', required=True,
+                        help=f"조건[=값] (반복 가능): {', '.join(CONDITIONS)}")
+    parser.add_argument('--period', type=float, default=DEFAULT_PERIOD, help="검사 주기(초)")
+    parser.add_argument('--cooldown', type=float, default=DEFAULT_COOLDOWN, help="같은 알림 최소 간격(초)")
+    parser.add_argument('-o', '--output', help="알림 JSON Lines 파일")
+    parser.add_argument('--webhook', help="알림을 POST할 URL")
+    parser.add_argument('--store', action='store_true', help="로컬 캔들 저장소를 거쳐 증분 조회")
+    parser.add_argument('--once', action='store_true', help="한 주기만 검사하고 종료")
+    args = parser.parse_args(argv)
+
+    markets = args.markets
+    if args.all:
+        markets = [m['market'] for m in fetch_markets('KRW')][:args.limit]
+    if not markets:
+        parser.error("마켓 코드를 주거나 --all을 지정하세요.")
+
+    sinks = [StdoutSink()]
+    if args.output:
+        sinks.append(FileSink(args.output))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+
+    fetch = fetch_candles
+    if args.store:
+        from candle_store import CandleStore
+        fetch = CandleStore().get_candles
+
+    # --once면 모든 종목 레벨을 한 번에 계산해야 검사가 의미 있다
+    refresh_per_tick = len(markets) * len(args.interval) if args.once else REFRESH_PER_TICK
+    daemon = AlertDaemon(markets, args.interval, args.rule, sinks, args.count, fetch,
+                         args.cooldown, refresh_per_tick)
+    print(f"{len(markets)}개 종목 × {len(args.interval)}개 간격, 조건 {len(args.rule)}개 감시 시작",
+          file=sys.stderr)
+    if args.once:
+        daemon.tick()
+        return 0
+    try:
+        daemon.run(args.period)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,482 @@
+"""차트 분석 코어 (Streamlit 없이 import 가능)
+
+지표, 지지/저항선, 거래량 프로파일, 매매 신호 계산 함수와 이를 한 번에
+실행해 AnalysisResult로 묶는 analyze()를 제공한다. 노트북, 배치 작업,
+프로세스 풀 워커에서 그대로 쓸 수 있다.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from indicator_pipeline import DEFAULT_INDICATORS, NODES, compute_indicators
+
+
+def _sliding_extreme(values, size, op):
+    """길이 size 창의 최댓값/최솟값 (창을 두 배씩 넓혀 가는 방식, O(n log size))
+
+    op는 np.maximum 또는 np.minimum. 결과의 j번째 값은 values[j:j + size]에 대한 값이다.
+    """
+    out = values
+    span = 1
+    while span * 2 <= size:
+        out = op(out[:-span], out[span:])
+        span *= 2
+    count = len(values) - size + 1
+    if span < size:
+        # 길이 span인 두 창을 겹쳐 나머지 길이를 채운다
+        return op(out[:count], out[size - span:size - span + count])
+    return out[:count]
+
+
+def find_pivots(high, low, left, right):
+    """피봇 고점/저점 탐지
+
+    i번째 고가가 [i - left, i + right] 구간 최고가와 같으면 피봇 고점,
+    저가가 같은 구간 최저가와 같으면 피봇 저점이다.
+    반환: (고점 인덱스, 고점 가격, 저점 인덱스, 저점 가격)
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    size = left + right + 1
+    if len(high) < size:
+        empty = np.array([], dtype=int)
+        return empty, high[empty], empty, low[empty]
+
+    center = slice(left, len(high) - right)
+    high_idx = np.flatnonzero(high[center] == _sliding_extreme(high, size, np.maximum)) + left
+    low_idx = np.flatnonzero(low[center] == _sliding_extreme(low, size, np.minimum)) + left
+    return high_idx, high[high_idx], low_idx, low[low_idx]
+
+
+def calculate_support_resistance(df, window=20, walls_df=None):
+    """지지선/저항선 계산 (개선된 버전)
+
+    walls_df(orderbook.detect_walls 결과)를 주면 호가 벽 가격도 레벨에 넣는다.
+    """
+    if len(df) < window:
+        return [], []
+    
+    current_price = df['trade_price'].iloc[-1]
+    
+    # 피봇 포인트 계산 (window 길이 중앙 정렬 창, 양 끝 window개 캔들 제외)
+    high_idx, high_prices, low_idx, low_prices = find_pivots(
+        df['high_price'].to_numpy(), df['low_price'].to_numpy(),
+        left=window // 2, right=(window - 1) // 2
+    )
+    last = len(df) - window
+    resistance_levels = high_prices[(high_idx >= window) & (high_idx < last)].tolist()
+    support_levels = low_prices[(low_idx >= window) & (low_idx < last)].tolist()
+    
+    # 이동평균선도 동적 지지/저항으로 추가
+    if len(df) >= 20:
+        ma20 = df['MA20'].iloc[-1]
+        ma60 = df['MA60'].iloc[-1] if len(df) >= 60 else None
+        
+        if ma20 < current_price:
+            support_levels.append(ma20)
+        else:
+            resistance_levels.append(ma20)
+            
+        if ma60:
+            if ma60 < current_price:
+                support_levels.append(ma60)
+            else:
+                resistance_levels.append(ma60)
+    
+    # 호가 벽도 지금 쌓여 있는 유동성 기반 지지/저항으로 추가
+    if walls_df is not None and not walls_df.empty:
+        support_levels += walls_df.loc[walls_df['side'] == 'bid', 'price'].tolist()
+        resistance_levels += walls_df.loc[walls_df['side'] == 'ask', 'price'].tolist()
+    
+    # 현재가 기준으로 올바른 지지/저항 분리
+    support_levels = [level for level in support_levels if level < current_price]
+    resistance_levels = [level for level in resistance_levels if level > current_price]
+    
+    # 중복 제거 및 정렬
+    support_levels = sorted(list(set([round(x, -1) for x in support_levels])), reverse=True)[:10]
+    resistance_levels = sorted(list(set([round(x, -1) for x in resistance_levels])))[:10]
+    
+    return support_levels, resistance_levels
+
+
+def calculate_volume_profile(df, bins=50):
+    """거래량 프로파일 계산
+
+    각 캔들의 거래량을 고가-저가 구간에 고르게 퍼져 있다고 보고, 가격 구간과
+    겹치는 길이만큼 나눠 배분한다. 가격 x 이하 누적 거래량 F(x)는 저가에서
+    기울기가 늘고 고가에서 줄어드는 꺾은선이라, 구간 경계마다 기울기 합을
+    누적합으로 구해 O(n + bins)로 계산한다.
+    """
+    if df.empty:
+        return pd.DataFrame()
+    
+    low = df['low_price'].to_numpy(dtype=float)
+    high = df['high_price'].to_numpy(dtype=float)
+    volume = df['candle_acc_trade_volume'].to_numpy(dtype=float)
+    
+    min_price = low.min()
+    max_price = high.max()
+    price_bins = np.linspace(min_price, max_price, bins)
+    
+    if max_price == min_price:
+        return pd.DataFrame([{
+            'price': min_price,
+            'volume': volume.sum(),
+            'price_range': f"{min_price:.0f} - {max_price:.0f}"
+        }])
+    
+    # 큰 가격에서 상쇄 오차를 줄이려고 최저가 기준으로 옮겨 계산
+    edges = price_bins - min_price
+    low = low - min_price
+    high = high - min_price
+    
+    width = high - low
+    flat = width == 0
+    density = np.divide(volume, width, out=np.zeros_like(volume), where=~flat)
+    
+    # F(x) = Σ d·(x - low)[x ≥ low] - Σ d·(x - high)[x ≥ high]
+    low_pos = np.searchsorted(edges, low, side='left')
+    high_pos = np.searchsorted(edges, high, side='left')
+    slope_on = np.cumsum(np.bincount(low_pos, weights=density, minlength=bins)[:bins])
+    offset_on = np.cumsum(np.bincount(low_pos, weights=density * low, minlength=bins)[:bins])
+    slope_off = np.cumsum(np.bincount(high_pos, weights=density, minlength=bins)[:bins])
+    offset_off = np.cumsum(np.bincount(high_pos, weights=density * high, minlength=bins)[:bins])
+    cumulative = (slope_on * edges - offset_on) - (slope_off * edges - offset_off)
+    bin_volume = np.diff(cumulative)
+    
+    # 고가 = 저가인 캔들은 가격이 속한 구간에 전부 배분
+    if flat.any():
+        flat_pos = np.clip(np.searchsorted(edges, low[flat], side='left') - 1, 0, bins - 2)
+        bin_volume += np.bincount(flat_pos, weights=volume[flat], minlength=bins - 1)
+    
+    return pd.DataFrame({
+        'price': (price_bins[:-1] + price_bins[1:]) / 2,
+        'volume': np.maximum(bin_volume, 0),
+        'price_range': [f"{lo:.0f} - {hi:.0f}" for lo, hi in zip(price_bins[:-1], price_bins[1:])]
+    })
+
+
+def calculate_value_area(volume_profile_df, ratio=0.7):
+    """POC와 밸류 에어리어(거래량 ratio 비율 구간) 상단/하단 계산
+
+    POC 구간에서 시작해 양옆 중 거래량이 큰 쪽으로 넓혀 가며 전체 거래량의
+    ratio 이상을 담을 때까지 확장한다.
+    반환: (POC 가격, 밸류 에어리어 하단, 밸류 에어리어 상단)
+    """
+    if volume_profile_df.empty:
+        return None, None, None
+    
+    prices = volume_profile_df['price'].to_numpy()
+    volumes = volume_profile_df['volume'].to_numpy()
+    half_width = (prices[1] - prices[0]) / 2 if len(prices) > 1 else 0
+    
+    poc = int(volumes.argmax())
+    lo = hi = poc
+    covered = volumes[poc]
+    target = volumes.sum() * ratio
+    
+    while covered < target and (lo > 0 or hi < len(volumes) - 1):
+        below = volumes[lo - 1] if lo > 0 else -1
+        above = volumes[hi + 1] if hi < len(volumes) - 1 else -1
+        if above >= below:
+            hi += 1
+            covered += above
+        else:
+            lo -= 1
+            covered += below
+    
+    return prices[poc], prices[lo] - half_width, prices[hi] + half_width
+
+
+def calculate_technical_indicators(df, indicators=None):
+    """기술적 지표 계산
+
+    indicators를 주면 그 지표와 분석에 필요한 MA20/MA60/RSI만 계산한다
+    (indicator_pipeline.ALIASES의 화면 이름이나 컬럼 이름). 기본값은
+    MA5/20/60/120, RSI, 볼린저 밴드 전체.
+    """
+    if df.empty or len(df) < 20:
+        return df
+    
+    df = compute_indicators(df, DEFAULT_INDICATORS if indicators is None else indicators)
+    
+    # float32 캔들(candle_arrays)이면 지표 열도 float32로 맞춰 메모리를 줄인다
+    if df['trade_price'].dtype == np.float32:
+        columns = [c for c in df.columns if c in NODES]
+        df[columns] = df[columns].astype(np.float32)
+    
+    return df
+
+
+# 매매 신호 배수 기본값 (백테스트에서 바꿔 가며 검증)
+SIGNAL_PARAMS = {
+    'support_margin': 1.02,     # 강력 지지선 대비 매수가
+    'resistance_margin': 0.98,  # 강력 저항선 대비 매도가
+    'poc_margin': 0.01,         # POC 위/아래 여유
+    'volatility_mult': 1.5,     # 단기 매수가 = 현재가 × (1 - 변동성 × 배수)
+    'target_mult': 2            # 단기 목표 = 현재가 × (1 + max(5%, 변동성 × 배수))
+}
+
+
+def signal_context(df, support_levels, resistance_levels, volume_profile_df):
+    """매매 신호 계산에 쓰는 마지막 캔들 기준 값 (현재가, RSI, POC, 지지/저항선, 변동성)"""
+    current_price = df['trade_price'].iloc[-1]
+    rsi = df['RSI'].iloc[-1] if not df['RSI'].isna().iloc[-1] else 50
+    
+    # 거래량 프로파일에서 POC (Point of Control) 찾기
+    poc_price = None
+    if not volume_profile_df.empty:
+        poc_idx = volume_profile_df['volume'].idxmax()
+        poc_price = volume_profile_df['price'].iloc[poc_idx]
+        
+        # POC가 현재가보다 아래면 지지선으로 추가
+        if poc_price < current_price:
+            support_levels.append(poc_price)
+        elif poc_price > current_price:
+            resistance_levels.append(poc_price)
+    
+    # 지지선/저항선 재정렬
+    support_levels = sorted([s for s in support_levels if s < current_price], reverse=True)
+    resistance_levels = sorted([r for r in resistance_levels if r > current_price])
+    
+    # 변동성 계산 (최근 20일 변동폭)
+    recent_volatility = df['trade_price'].tail(20).std() / current_price
+    
+    ma20 = None
+    if len(df) >= 20 and not df['MA20'].isna().iloc[-1]:
+        ma20 = df['MA20'].iloc[-1]
+    
+    return {
+        'current_price': current_price,
+        'rsi': rsi,
+        'poc_price': poc_price,
+        'support_levels': support_levels,
+        'resistance_levels': resistance_levels,
+        # 가장 가까운 지지선/저항선
+        'nearest_support': support_levels[0] if support_levels else current_price * 0.85,
+        'nearest_resistance': resistance_levels[0] if resistance_levels else current_price * 1.15,
+        'volatility_factor': max(0.02, min(0.1, recent_volatility)),  # 2%~10% 범위
+        'ma20': ma20
+    }
+
+
+def build_signals(context, params):
+    """signal_context 값과 배수로 (근거, 가격, 강도) 매수/매도 후보 목록 생성
+
+    배수에 NumPy 배열을 넣으면 가격도 같은 모양의 배열이 된다 (백테스트 파라미터 격자용).
+    """
+    current_price = context['current_price']
+    rsi = context['rsi']
+    poc_price = context['poc_price']
+    support_levels = context['support_levels']
+    resistance_levels = context['resistance_levels']
+    volatility_factor = context['volatility_factor']
+    
+    # 매수 추천가 계산
+    buy_signals = []
+    
+    # 1. 강력한 지지선 근처 (가장 강력한 지지선 +2%)
+    if support_levels:
+        strong_support = support_levels[0]
+        buy_price_1 = strong_support * params['support_margin']
+        confidence = "강력 추천" if current_price > strong_support * 1.1 else "추천"
+        buy_signals.append(('강력 지지선', buy_price_1, confidence))
+    
+    # 2. POC 근처 (거래량 집중 구간)
+    if poc_price and poc_price < current_price:
+        buy_price_poc = poc_price * (1 + params['poc_margin'])
+        buy_signals.append(('POC 지지', buy_price_poc, '강력 추천'))
+    
+    # 3. 단기 매수 (현재가 기준)
+    buy_price_2 = current_price * (1 - volatility_factor * params['volatility_mult'])
+    buy_signals.append(('단기 매수', buy_price_2, '추천'))
+    
+    # 4. RSI 기반 매수가
+    if rsi < 30:  # 과매도
+        buy_price_3 = current_price * 0.95
+        buy_signals.append(('RSI 과매도', buy_price_3, '강력 추천'))
+    elif rsi < 40:  # 중립 하단
+        buy_price_3 = current_price * 0.97
+        buy_signals.append(('RSI 약세', buy_price_3, '추천'))
+    elif rsi < 50:
+        buy_price_3 = current_price * 0.98
+        buy_signals.append(('RSI 중립하', buy_price_3, '보통'))
+    
+    # 5. 이동평균선 지지
+    ma20 = context['ma20']
+    if ma20 is not None and ma20 < current_price:
+        buy_signals.append(('MA20 지지', ma20 * 1.005, '추천'))
+    
+    # 매도 추천가 계산
+    sell_signals = []
+    
+    # 1. 강력한 저항선 근처
+    if resistance_levels:
+        strong_resistance = resistance_levels[0]
+        sell_price_1 = strong_resistance * params['resistance_margin']
+        confidence = "강력 추천" if current_price < strong_resistance * 0.9 else "추천"
+        sell_signals.append(('강력 저항선', sell_price_1, confidence))
+    
+    # 2. POC 저항 근처
+    if poc_price and poc_price > current_price:
+        sell_price_poc = poc_price * (1 - params['poc_margin'])
+        sell_signals.append(('POC 저항', sell_price_poc, '강력 추천'))
+    
+    # 3. 단기 목표 (변동성 기반)
+    target_profit = np.maximum(0.05, volatility_factor * params['target_mult'])  # 최소 5% 목표
+    sell_price_2 = current_price * (1 + target_profit)
+    sell_signals.append(('단기 목표', sell_price_2, '추천'))
+    
+    # 4. RSI 기반 매도가
+    if rsi > 70:  # 과매수
+        sell_price_3 = current_price * 1.02
+        sell_signals.append(('RSI 과매수', sell_price_3, '강력 추천'))
+    elif rsi > 60:  # 중립 상단
+        sell_price_3 = current_price * 1.04
+        sell_signals.append(('RSI 강세', sell_price_3, '추천'))
+    elif rsi > 50:
+        sell_price_3 = current_price * 1.06
+        sell_signals.append(('RSI 중립상', sell_price_3, '보통'))
+    
+    # 5. 중장기 목표 (피보나치 기반)
+    if resistance_levels:
+        fib_target = current_price + (resistance_levels[0] - current_price) * 0.618
+        sell_signals.append(('피보나치 61.8%', fib_target, '보통'))
+    
+    return buy_signals, sell_signals
+
+
+def wall_signals(walls_df, current_price, strong=6.0, top=2):
+    """호가 벽 기반 (근거, 가격, 강도) 매수/매도 후보
+
+    매수벽 바로 위(+0.1%)에 매수, 매도벽 바로 아래(-0.1%)에 매도한다.
+    벽 강도(잔량 중앙값 대비 배수)가 strong 이상이면 '강력 추천'.
+    """
+    def confidence(strength):
+        return '강력 추천' if strength >= strong else '추천'
+
+    bids = walls_df[(walls_df['side'] == 'bid') & (walls_df['price'] < current_price)]
+    asks = walls_df[(walls_df['side'] == 'ask') & (walls_df['price'] > current_price)]
+    buy_signals = [('호가 매수벽', wall.price * 1.001, confidence(wall.strength))
+                   for wall in bids.nlargest(top, 'strength').itertuples()]
+    sell_signals = [('호가 매도벽', wall.price * 0.999, confidence(wall.strength))
+                    for wall in asks.nlargest(top, 'strength').itertuples()]
+    return buy_signals, sell_signals
+
+
+def calculate_trade_signals(df, support_levels, resistance_levels, volume_profile_df, params=None,
+                            walls_df=None):
+    """매수/매도 신호 계산 (개선된 버전)
+
+    params로 SIGNAL_PARAMS 중 일부 배수를 바꿀 수 있다. walls_df를 주면 호가 벽
+    신호(wall_signals)를 더한다.
+    """
+    if df.empty or len(df) < 20:
+        return None, None, None, None
+    
+    context = signal_context(df, support_levels, resistance_levels, volume_profile_df)
+    buy_signals, sell_signals = build_signals(context, dict(SIGNAL_PARAMS, **(params or {})))
+    if walls_df is not None and not walls_df.empty:
+        wall_buys, wall_sells = wall_signals(walls_df, context['current_price'])
+        buy_signals += wall_buys
+        sell_signals += wall_sells
+    
+    # 중복 제거 및 정렬
+    buy_signals = sorted(list(set(buy_signals)), key=lambda x: x[1], reverse=True)
+    sell_signals = sorted(list(set(sell_signals)), key=lambda x: x[1])
+    
+    return buy_signals, sell_signals, context['nearest_support'], context['nearest_resistance']
+
+
+@dataclass
+class AnalysisResult:
+    """한 종목 분석 결과"""
+    market: str
+    interval: str
+    candles: pd.DataFrame
+    support_levels: list = field(default_factory=list)
+    resistance_levels: list = field(default_factory=list)
+    volume_profile: pd.DataFrame = field(default_factory=pd.DataFrame)
+    buy_signals: list = field(default_factory=list)
+    sell_signals: list = field(default_factory=list)
+    nearest_support: float = None
+    nearest_resistance: float = None
+    poc_price: float = None
+    value_area_low: float = None
+    value_area_high: float = None
+
+    @property
+    def current_price(self):
+        return float(self.candles['trade_price'].iloc[-1])
+
+    @property
+    def rsi(self):
+        value = self.candles['RSI'].iloc[-1] if 'RSI' in self.candles else np.nan
+        return None if pd.isna(value) else float(value)
+
+    def to_dict(self, candles=False):
+        """JSON 직렬화용 dict (candles=True면 지표 포함 캔들 전체 포함)"""
+        def signals(items):
+            return [{'reason': reason, 'price': float(price), 'strength': strength}
+                    for reason, price, strength in items or []]
+
+        def number(value):
+            return None if value is None else float(value)
+
+        result = {
+            'market': self.market,
+            'interval': self.interval,
+            'time': self.candles['candle_date_time_kst'].iloc[-1].isoformat(),
+            'current_price': self.current_price,
+            'rsi': self.rsi,
+            'support_levels': [float(x) for x in self.support_levels],
+            'resistance_levels': [float(x) for x in self.resistance_levels],
+            'nearest_support': number(self.nearest_support),
+            'nearest_resistance': number(self.nearest_resistance),
+            'poc_price': number(self.poc_price),
+            'value_area_low': number(self.value_area_low),
+            'value_area_high': number(self.value_area_high),
+            'buy_signals': signals(self.buy_signals),
+            'sell_signals': signals(self.sell_signals),
+            'volume_profile': self.volume_profile[['price', 'volume']].to_dict('records')
+        }
+        if candles:
+            frame = self.candles.copy()
+            floats = frame.select_dtypes(np.float32).columns
+            frame[floats] = frame[floats].astype(float)  # float32 스칼라는 JSON으로 못 바꾼다
+            frame['candle_date_time_kst'] = frame['candle_date_time_kst'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+            result['candles'] = frame.astype(object).where(frame.notna(), None).to_dict('records')
+        return result
+
+
+def analyze(df, market=None, interval=None, window=20, bins=50, walls_df=None):
+    """지표 → 지지/저항선 → 거래량 프로파일 → 매매 신호 전체 분석
+
+    walls_df(orderbook.detect_walls 결과)를 주면 호가 벽을 레벨과 신호에 반영한다.
+    """
+    df = calculate_technical_indicators(df.copy())
+    support_levels, resistance_levels = calculate_support_resistance(df, window, walls_df)
+    volume_profile_df = calculate_volume_profile(df, bins)
+    poc_price, value_area_low, value_area_high = calculate_value_area(volume_profile_df)
+
+    # calculate_trade_signals가 POC를 지지/저항 목록에 덧붙인다
+    buy_signals, sell_signals, nearest_support, nearest_resistance = calculate_trade_signals(
+        df, support_levels, resistance_levels, volume_profile_df, walls_df=walls_df
+    )
+
+    return AnalysisResult(
+        market=market,
+        interval=interval,
+        candles=df,
+        support_levels=support_levels,
+        resistance_levels=resistance_levels,
+        volume_profile=volume_profile_df,
+        buy_signals=buy_signals or [],
+        sell_signals=sell_signals or [],
+        nearest_support=nearest_support,
+        nearest_resistance=nearest_resistance,
+        poc_price=poc_price,
+        value_area_low=value_area_low,
+        value_area_high=value_area_high
+    )
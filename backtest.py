@@ -0,0 +1,190 @@
+"""매매 신호 백테스트와 파라미터 격자 탐색
+
+캔들마다 그 시점까지의 lookback개 캔들만으로 지지/저항선, 거래량 프로파일,
+매매 신호를 다시 계산하고 (미래 캔들 사용 없음), 최선 매수가/매도가를 다음
+캔들의 지정가 주문으로 넣어 체결 여부를 시뮬레이션한다.
+
+지지/저항선과 프로파일은 (window, bins)에만 달려 있어 조합마다 캔들별 기준값을
+한 번만 계산하고, 배수 격자 전체는 NumPy 배열로 한꺼번에 시뮬레이션한다.
+(window, bins) 조합은 프로세스 풀에서 나눠 돌린다.
+
+    python backtest.py KRW-BTC -i 1시간 -n 8760 --windows 10 20 30 --bins 30 50 \\
+        --support-margin 1 1.01 1.02 --volatility-mult 1 1.5 2 -o sweep.csv
+    python backtest.py --synthetic 5000 --windows 20 --bins 50
+"""
+import argparse
+import itertools
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from analysis import (
+    SIGNAL_PARAMS,
+    build_signals,
+    calculate_support_resistance,
+    calculate_technical_indicators,
+    calculate_volume_profile,
+    signal_context
+)
+from upbit_api import INTERVAL_ENDPOINTS, fetch_candles
+
+FEE = 0.0005  # 업비트 원화 마켓 거래 수수료 (0.05%)
+DEFAULT_LOOKBACK = 200  # 신호 계산에 쓰는 과거 캔들 수 (차트 기본 캔들 개수와 동일)
+SIGNAL_COLUMNS = ['high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume', 'MA20', 'MA60', 'RSI']
+
+
+def param_grid(grid):
+    """{이름: 값 목록} → 모든 조합을 펼친 {이름: 배열}"""
+    names = list(grid)
+    combos = np.array(list(itertools.product(*(grid[name] for name in names))), dtype=float)
+    return {name: combos[:, i] for i, name in enumerate(names)}
+
+
+def signal_contexts(df, window, bins, lookback=DEFAULT_LOOKBACK):
+    """lookback - 1번째 캔들부터 캔들마다 직전 lookback개 캔들로 계산한 signal_context 목록"""
+    # 신호 계산에 필요한 MA20/MA60/RSI만 계산
+    df = calculate_technical_indicators(df.reset_index(drop=True).copy(), indicators=[])
+    # 캔들마다 잘라 쓰므로 계산에 쓰는 숫자 열만 남긴다
+    df = df[[column for column in df.columns if column in SIGNAL_COLUMNS]]
+    contexts = []
+    for end in range(lookback, len(df) + 1):
+        recent = df.iloc[end - lookback:end]
+        support_levels, resistance_levels = calculate_support_resistance(recent, window)
+        volume_profile_df = calculate_volume_profile(recent, bins)
+        contexts.append(signal_context(recent, support_levels, resistance_levels, volume_profile_df))
+    return contexts
+
+
+def order_prices(context, params, size):
+    """한 캔들의 최선 매수가(가장 높은 매수 후보)와 최선 매도가(가장 낮은 매도 후보)"""
+    buy_signals, sell_signals = build_signals(context, params)
+    buy = reduce(np.fmax, [price for _, price, _ in buy_signals])
+    sell = reduce(np.fmin, [price for _, price, _ in sell_signals])
+    return np.broadcast_to(buy, size), np.broadcast_to(sell, size)
+
+
+def simulate(df, contexts, params, fee=FEE):
+    """contexts[i]로 낸 지정가 주문을 그다음 캔들에서 체결 (조합별 전액 매수/매도)
+
+    시가가 지정가보다 유리하면 시가에 체결한다. 같은 캔들 안의 매수 후 매도처럼
+    순서를 알 수 없는 체결은 하지 않는다.
+    """
+    size = len(next(iter(params.values())))
+    start = len(df) - len(contexts) + 1  # contexts[0] 다음 캔들
+    opens = df['opening_price'].to_numpy(dtype=float)
+    highs = df['high_price'].to_numpy(dtype=float)
+    lows = df['low_price'].to_numpy(dtype=float)
+    closes = df['trade_price'].to_numpy(dtype=float)
+
+    cash = np.ones(size)
+    entry = np.zeros(size)
+    holding = np.zeros(size, dtype=bool)
+    trades = np.zeros(size, dtype=int)
+    wins = np.zeros(size, dtype=int)
+    peak = np.ones(size)
+    max_drawdown = np.zeros(size)
+    value = cash.copy()
+
+    for i in range(start, len(df)):
+        buy_price, sell_price = order_prices(contexts[i - start], params, size)
+
+        sold = holding & (highs[i] >= sell_price)
+        if sold.any():
+            fill = np.maximum(sell_price[sold], opens[i])
+            trade_return = fill / entry[sold] * (1 - fee) ** 2
+            cash[sold] *= trade_return
+            trades[sold] += 1
+            wins[sold] += trade_return > 1
+            holding &= ~sold
+
+        bought = ~holding & ~sold & (lows[i] <= buy_price)
+        if bought.any():
+            entry[bought] = np.minimum(buy_price[bought], opens[i])
+            holding |= bought
+
+        # 보유 중이면 종가에 매도했다고 보고 평가 (실현 거래와 같이 매수/매도 수수료 모두 반영)
+        value = np.where(holding, cash * (1 - fee) ** 2 * closes[i] / np.where(holding, entry, 1), cash)
+        peak = np.maximum(peak, value)
+        max_drawdown = np.maximum(max_drawdown, 1 - value / peak)
+
+    return {
+        'return_pct': (value - 1) * 100,
+        'trades': trades,
+        'hit_rate': np.divide(wins, trades, out=np.full(size, np.nan), where=trades > 0),
+        'max_drawdown_pct': max_drawdown * 100,
+        'holding': holding
+    }
+
+
+def run_group(df, window, bins, grid, lookback=DEFAULT_LOOKBACK, fee=FEE):
+    """(window, bins) 하나에 대한 배수 격자 전체 백테스트 결과 표"""
+    params = param_grid(dict({name: [value] for name, value in SIGNAL_PARAMS.items()}, **grid))
+    contexts = signal_contexts(df, window, bins, lookback)
+    result = pd.DataFrame(params)
+    result.insert(0, 'bins', bins)
+    result.insert(0, 'window', window)
+    for name, values in simulate(df.reset_index(drop=True), contexts, params, fee).items():
+        result[name] = values
+    return result
+
+
+def sweep(df, windows, bins_list, grid, lookback=DEFAULT_LOOKBACK, fee=FEE, max_workers=None):
+    """window × bins × 배수 격자 백테스트 (수익률 내림차순)"""
+    if len(df) <= lookback:
+        raise ValueError(f"캔들이 lookback({lookback})보다 많아야 합니다: {len(df)}개")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as workers:
+        jobs = [workers.submit(run_group, df, window, bins, grid, lookback, fee)
+                for window, bins in itertools.product(windows, bins_list)]
+        results = [job.result() for job in as_completed(jobs)]
+
+    return pd.concat(results, ignore_index=True).sort_values(
+        'return_pct', ascending=False).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="매매 신호 백테스트 (파라미터 격자 탐색)")
+    parser.add_argument('market', nargs='?', default='KRW-BTC', help="마켓 코드 (예: KRW-BTC)")
+    parser.add_argument('-i', '--interval', default='1시간', choices=list(INTERVAL_ENDPOINTS))
+    parser.add_argument('-n', '--count', type=int, default=2000, help="캔들 개수")
+    parser.add_argument('--store', action='store_true', help="로컬 캔들 저장소를 거쳐 증분 조회")
+    parser.add_argument('--synthetic', type=int, metavar='N', help="조회 대신 합성 1시간봉 N개 사용")
+    parser.add_argument('--windows', type=int, nargs='+', default=[20])
+    parser.add_argument('--bins', type=int, nargs='+', default=[50])
+    for name, default in SIGNAL_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=float, nargs='+',
+                            default=[default])
+    parser.add_argument('--lookback', type=int, default=DEFAULT_LOOKBACK)
+    parser.add_argument('--fee', type=float, default=FEE)
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수")
+    parser.add_argument('--top', type=int, default=20, help="표준 출력에 보여 줄 상위 조합 수")
+    parser.add_argument('-o', '--output', help="전체 결과 CSV 파일")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        from bench import make_candles
+        df = make_candles(args.synthetic, interval_minutes=60)
+    elif args.store:
+        from candle_store import CandleStore
+        df = CandleStore().get_candles(args.market, args.interval, args.count)
+    else:
+        df = fetch_candles(args.market, args.interval, args.count)
+
+    grid = {name: getattr(args, name) for name in SIGNAL_PARAMS}
+    started = time.perf_counter()
+    result = sweep(df, args.windows, args.bins, grid, args.lookback, args.fee, args.workers)
+
+    if args.output:
+        result.to_csv(args.output, index=False)
+    print(result.head(args.top).to_string(index=False))
+    print(f"{len(result)}개 조합, 캔들 {len(df)}개 ({time.perf_counter() - started:.1f}초)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""여러 종목 일괄 분석과 명령줄 실행
+
+캔들 조회는 요청 한도를 나눠 쓰는 스레드에서, 분석은 프로세스 풀에서 돌린다.
+
+    python batch.py KRW-BTC KRW-ETH --interval 일봉 --count 200 --output result.json
+    python batch.py --all --limit 50 --output krw.json
+"""
+import argparse
+import functools
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from analysis import analyze
+from candle_arrays import fetch_candles_compact, to_frame
+from upbit_api import INTERVAL_ENDPOINTS, fetch_candles, fetch_markets
+
+MIN_CANDLES = 20  # 매매 신호 계산에 필요한 최소 캔들 수
+
+
+def fetch_compact(market, interval, count, float32=False):
+    """필요한 OHLCV 컬럼만 담은 캔들 프레임 조회 (프로세스 간 전달량도 줄어든다)"""
+    return to_frame(fetch_candles_compact(market, interval, count, float32=float32))
+
+
+def map_markets(markets, interval, count, func, fetch=fetch_candles,
+                fetch_workers=8, max_workers=None, skip=None, processes=True):
+    """종목별 캔들을 병렬 조회하고, 받는 대로 프로세스 풀에서 func(df, market, interval) 실행
+
+    skip(df, market)이 참인 종목은 분석하지 않는다 (결과에서 빠짐).
+    processes=False면 분석도 스레드 풀에서 돌린다. 백그라운드 스레드가 도는
+    서버(Streamlit 앱) 안에서는 fork한 자식이 잡힌 락에 걸릴 수 있어 이쪽을 쓴다.
+    반환: ({종목: func 결과}, {종목: 예외})
+    """
+    results = {}
+    errors = {}
+    pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetcher, \
+            pool(max_workers=max_workers) as workers:
+        fetches = {fetcher.submit(fetch, m, interval, count): m for m in markets}
+        jobs = {}
+        for future in as_completed(fetches):
+            market = fetches[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                errors[market] = e
+                continue
+            if skip is not None and skip(df, market):
+                continue
+            jobs[workers.submit(func, df, market, interval)] = market
+
+        for future in as_completed(jobs):
+            market = jobs[future]
+            try:
+                results[market] = future.result()
+            except Exception as e:
+                errors[market] = e
+
+    return results, errors
+
+
+def scan_row(result):
+    """스캔 표 한 줄 (RSI, 지지/저항선 거리, 최선 매수/매도가)"""
+    current_price = result.current_price
+    best_buy = result.buy_signals[0] if result.buy_signals else (None, np.nan, None)
+    best_sell = result.sell_signals[0] if result.sell_signals else (None, np.nan, None)
+
+    return {
+        '종목': result.market,
+        '현재가': current_price,
+        'RSI': result.rsi,
+        '지지선 거리(%)': (current_price - result.nearest_support) / current_price * 100,
+        '저항선 거리(%)': (result.nearest_resistance - current_price) / current_price * 100,
+        '추천 매수가': best_buy[1],
+        '매수 근거': best_buy[0],
+        '매수가 괴리(%)': (current_price - best_buy[1]) / current_price * 100,
+        '추천 매도가': best_sell[1],
+        '매도 근거': best_sell[0],
+        '매도가 괴리(%)': (best_sell[1] - current_price) / current_price * 100,
+    }
+
+
+def _scan_one(df, market, interval):
+    if len(df) < MIN_CANDLES:
+        return None
+    return scan_row(analyze(df, market, interval))
+
+
+def _analyze_one(df, market, interval, candles=False):
+    if len(df) < MIN_CANDLES:
+        return None
+    return analyze(df, market, interval).to_dict(candles=candles)
+
+
+def _analyze_with_candles(df, market, interval):
+    return _analyze_one(df, market, interval, candles=True)
+
+
+def scan_markets(markets, interval, count, fetch=fetch_candles, max_workers=None, processes=True):
+    """여러 종목을 분석해 RSI 오름차순 표와 실패 종목 목록 반환 (processes는 map_markets 참고)"""
+    rows, errors = map_markets(markets, interval, count, _scan_one,
+                               fetch=fetch, max_workers=max_workers, processes=processes)
+
+    result = pd.DataFrame([row for row in rows.values() if row is not None])
+    if not result.empty:
+        result = result.sort_values('RSI').reset_index(drop=True)
+    return result, sorted(errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="업비트 종목 일괄 분석 (JSON 출력)")
+    parser.add_argument('markets', nargs='*', help="분석할 마켓 코드 (예: KRW-BTC)")
+    parser.add_argument('--all', action='store_true', help="원화 마켓 전체 분석")
+    parser.add_argument('--limit', type=int, default=None, help="--all 사용 시 앞에서부터 N개만")
+    parser.add_argument('-i', '--interval', default='일봉', choices=list(INTERVAL_ENDPOINTS))
+    parser.add_argument('-n', '--count', type=int, default=200, help="캔들 개수")
+    parser.add_argument('-o', '--output', default='-', help="출력 파일 (기본: 표준 출력)")
+    parser.add_argument('--candles', action='store_true', help="지표 포함 캔들 전체를 결과에 포함")
+    parser.add_argument('--store', action='store_true', help="로컬 캔들 저장소를 거쳐 증분 조회")
+    parser.add_argument('--compact', action='store_true',
+                        help="OHLCV 컬럼만 배열로 바로 파싱해 조회 (--store와 함께 쓸 수 없음)")
+    parser.add_argument('--float32', action='store_true', help="--compact 가격/거래량을 float32로 보관")
+    parser.add_argument('--workers', type=int, default=None, help="분석 프로세스 수")
+    args = parser.parse_args(argv)
+
+    markets = args.markets
+    if args.all:
+        markets = [m['market'] for m in fetch_markets('KRW')][:args.limit]
+    if not markets:
+        parser.error("마켓 코드를 주거나 --all을 지정하세요.")
+
+    fetch = fetch_candles
+    if args.compact or args.float32:
+        if args.store:
+            parser.error("--compact/--float32는 --store와 함께 쓸 수 없습니다.")
+        fetch = functools.partial(fetch_compact, float32=args.float32)
+    elif args.store:
+        from candle_store import CandleStore
+        fetch = CandleStore().get_candles
+
+    started = time.perf_counter()
+    func = _analyze_with_candles if args.candles else _analyze_one
+    results, errors = map_markets(markets, args.interval, args.count, func,
+                                  fetch=fetch, max_workers=args.workers)
+
+    output = {
+        'interval': args.interval,
+        'count': args.count,
+        'results': [results[m] for m in markets if results.get(m) is not None],
+        'errors': {m: str(e) for m, e in errors.items()}
+    }
+    text = json.dumps(output, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    print(f"{len(output['results'])}개 분석, {len(errors)}개 실패 "
+          f"({time.perf_counter() - started:.1f}초)", file=sys.stderr)
+    return 1 if errors and not output['results'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""분석 단계별 오프라인 벤치마크
+
+네트워크 없이 업비트 캔들 스키마와 같은 합성 OHLCV를 만들어 지표, 지지/저항선,
+거래량 프로파일, 매매 신호, 차트 생성 단계의 시간과 최대 메모리를 잰다.
+결과는 JSON으로 저장해 커밋 사이에 비교할 수 있다.
+
+    python bench.py --output bench_report.json
+    python bench.py --sizes 200 10000 --compare bench_report.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from indicator_pipeline import CATALOG
+
+DEFAULT_SIZES = [200, 10_000, 100_000, 1_000_000]
+
+# 업비트 원화 마켓 호가 단위 (가격 하한, 호가 단위)
+KRW_TICK_SIZES = [
+    (2_000_000, 1000),
+    (1_000_000, 500),
+    (500_000, 100),
+    (100_000, 50),
+    (10_000, 10),
+    (1_000, 1),
+    (100, 0.1),
+    (10, 0.01),
+    (1, 0.001),
+    (0, 0.0001)
+]
+
+
+def round_to_tick(prices):
+    """원화 마켓 호가 단위로 반올림"""
+    ticks = np.select([prices >= floor for floor, _ in KRW_TICK_SIZES],
+                      [tick for _, tick in KRW_TICK_SIZES])
+    return np.round(prices / ticks) * ticks
+
+
+def make_candles(n, interval_minutes=1, start_price=100_000_000, seed=0,
+                 end='2026-01-01 00:00:00', market='KRW-BTC'):
+    """업비트 캔들 API 응답과 같은 컬럼의 합성 캔들 (시간순)
+
+    변동성이 뭉쳐 다니도록 GARCH(1,1) 형태로 수익률을 만들고, 거래량은
+    수익률 크기에 비례해 늘어나는 로그정규 분포로 만든다.
+    """
+    rng = np.random.default_rng(seed)
+
+    # GARCH(1,1) 변동성
+    omega, alpha, beta = 2e-8, 0.08, 0.9
+    shocks = rng.standard_normal(n)
+    returns = np.empty(n)
+    variance = omega / (1 - alpha - beta)
+    for i in range(n):
+        returns[i] = np.sqrt(variance) * shocks[i]
+        variance = omega + alpha * returns[i] ** 2 + beta * variance
+
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    spread = np.abs(rng.standard_normal((2, n))) * np.sqrt(omega / (1 - alpha - beta)) * close
+    high = round_to_tick(np.maximum(open_, close) + spread[0])
+    low = round_to_tick(np.minimum(open_, close) - spread[1])
+    open_ = round_to_tick(open_)
+    close = round_to_tick(close)
+
+    volume = rng.lognormal(mean=0, sigma=0.8, size=n) * (1 + 200 * np.abs(returns))
+    utc = pd.date_range(end=end, periods=n, freq=f'{interval_minutes}min')
+    kst = utc + pd.Timedelta(hours=9)
+
+    return pd.DataFrame({
+        'market': market,
+        'candle_date_time_utc': utc.strftime('%Y-%m-%dT%H:%M:%S'),
+        'candle_date_time_kst': kst,
+        'opening_price': open_,
+        'high_price': high,
+        'low_price': low,
+        'trade_price': close,
+        'timestamp': (utc - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1) + interval_minutes * 60_000 - 1,
+        'candle_acc_trade_price': volume * close,
+        'candle_acc_trade_volume': volume,
+        'unit': interval_minutes
+    })
+
+
+def _prepare(df):
+    """단계별 입력 준비 (측정 대상 아님)"""
+    indicators_df = analysis.calculate_technical_indicators(df.copy())
+    support, resistance = analysis.calculate_support_resistance(indicators_df)
+    profile = analysis.calculate_volume_profile(indicators_df)
+    return indicators_df, support, resistance, profile
+
+
+def _chart(indicators_df, support, resistance, profile):
+    from charts import create_main_chart
+    fig = create_main_chart(indicators_df, support, resistance, True, profile,
+                            ['MA20', 'MA60', '볼린저밴드', 'RSI'])
+    return len(fig.to_json())
+
+
+STAGES = {
+    'indicators': lambda df, prep: analysis.calculate_technical_indicators(df.copy()),
+    'indicator_catalog': lambda df, prep: analysis.calculate_technical_indicators(df.copy(), CATALOG),
+    'support_resistance': lambda df, prep: analysis.calculate_support_resistance(prep[0]),
+    'volume_profile': lambda df, prep: analysis.calculate_volume_profile(prep[0]),
+    'trade_signals': lambda df, prep: analysis.calculate_trade_signals(
+        prep[0], list(prep[1]), list(prep[2]), prep[3]),
+    'main_chart': lambda df, prep: _chart(*prep),
+}
+
+
+def measure(func, repeat):
+    """실행 시간(ms) 목록과 최대 메모리(MB), 마지막 반환값"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return times, peak / 2 ** 20, result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, stages, repeat, seed):
+    results = []
+    for n in sizes:
+        df = make_candles(n, seed=seed)
+        prep = _prepare(df)
+        for stage in stages:
+            times, peak_mb, value = measure(lambda: STAGES[stage](df, prep), repeat)
+            row = {
+                'stage': stage,
+                'candles': n,
+                'repeat': repeat,
+                'min_ms': min(times),
+                'median_ms': statistics.median(times),
+                'peak_mb': peak_mb
+            }
+            if stage == 'main_chart':
+                row['payload_bytes'] = value
+            results.append(row)
+            print(f"{stage:>20} {n:>9,}  {row['median_ms']:10.2f} ms  {peak_mb:8.1f} MB",
+                  file=sys.stderr)
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'time': pd.Timestamp.now(tz='UTC').isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'seed': seed
+        },
+        'results': results
+    }
+
+
+def compare(report, baseline):
+    """기준 리포트 대비 중앙값 시간 비율 출력"""
+    base = {(r['stage'], r['candles']): r for r in baseline['results']}
+    print(f"{'stage':>20} {'candles':>9}  {'base ms':>10}  {'now ms':>10}  {'ratio':>6}")
+    for row in report['results']:
+        old = base.get((row['stage'], row['candles']))
+        if old is None:
+            continue
+        ratio = row['median_ms'] / old['median_ms'] if old['median_ms'] else float('nan')
+        print(f"{row['stage']:>20} {row['candles']:>9,}  {old['median_ms']:10.2f}  "
+              f"{row['median_ms']:10.2f}  {ratio:6.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분석 단계별 오프라인 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='bench_report.json')
+    parser.add_argument('--compare', help="비교할 기준 리포트 JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.stages, args.repeat, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
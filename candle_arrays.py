@@ -0,0 +1,110 @@
+"""컴팩트 캔들 표현 (열별 NumPy 배열)
+
+캔들 API 응답에서 분석에 쓰는 시간/OHLCV만 골라 연속 배열로 바로 만든다.
+행마다 dict를 DataFrame으로 바꾸지 않고, 시각은 UTC 캔들 시작 시각의 epoch
+밀리초(int64)로 둔다. float32=True면 가격/거래량을 float32로 저장해 메모리를
+절반으로 줄인다 (원화 가격 1억 원대에서 유효 자릿수는 약 7자리).
+
+orjson 패키지가 있으면 JSON 디코딩에 쓴다.
+
+    arrays = fetch_candles_compact('KRW-BTC', '1시간', 5000, float32=True)
+    df = to_frame(arrays)  # 분석/차트 함수가 받는 캔들 프레임
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from upbit_api import fetch_candle_pages
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+KST_OFFSET = pd.Timedelta(hours=9)
+_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# 배열 이름 -> API 필드 (캔들 프레임 컬럼 이름과 같음)
+FIELDS = {
+    'open': 'opening_price',
+    'high': 'high_price',
+    'low': 'low_price',
+    'close': 'trade_price',
+    'volume': 'candle_acc_trade_volume'
+}
+
+
+def decode(payload):
+    """JSON 바이트/문자열을 파이썬 객체로 (이미 디코딩된 목록은 그대로)"""
+    if isinstance(payload, (bytes, bytearray, memoryview, str)):
+        return orjson.loads(payload) if orjson is not None else json.loads(payload)
+    return payload
+
+
+def _epoch_ms(utc_strings):
+    """'YYYY-MM-DDTHH:MM:SS' UTC 문자열 배열 → epoch 밀리초 int64"""
+    return np.array(utc_strings, dtype='datetime64[s]').astype('datetime64[ms]').astype(np.int64)
+
+
+def empty_arrays(float32=False):
+    dtype = np.float32 if float32 else np.float64
+    arrays = {'timestamp': np.array([], dtype=np.int64)}
+    arrays.update({name: np.array([], dtype=dtype) for name in FIELDS})
+    return arrays
+
+
+def parse_candles(payload, float32=False):
+    """캔들 API 응답 → {'timestamp', 'open', 'high', 'low', 'close', 'volume'} 배열 (시간순)"""
+    rows = decode(payload)
+    if not rows:
+        return empty_arrays(float32)
+
+    dtype = np.float32 if float32 else np.float64
+    n = len(rows)
+    arrays = {'timestamp': _epoch_ms([row['candle_date_time_utc'] for row in rows])}
+    for name, field in FIELDS.items():
+        arrays[name] = np.fromiter((row[field] for row in rows), dtype=dtype, count=n)
+    return sort_candles(arrays)
+
+
+def sort_candles(arrays, count=None):
+    """시각 중복 제거(나중 값 우선) 후 시간순 정렬, count를 주면 최신 count개만"""
+    timestamps = arrays['timestamp']
+    # 뒤집어서 unique를 구하면 같은 시각 중 마지막 행의 인덱스가 남는다
+    _, last = np.unique(timestamps[::-1], return_index=True)
+    order = len(timestamps) - 1 - last
+    if count is not None:
+        order = order[-count:]
+    return {name: np.ascontiguousarray(values[order]) for name, values in arrays.items()}
+
+
+def concat_candles(parts, count=None):
+    """여러 조각(페이지, 증분분)을 하나로 합치기"""
+    filled = [part for part in parts if len(part['timestamp'])]
+    if not filled:
+        return parts[0] if parts else empty_arrays()
+    merged = {name: np.concatenate([part[name] for part in filled]) for name in filled[0]}
+    return sort_candles(merged, count)
+
+
+def fetch_candles_compact(market, interval, count=200, to=None, float32=False, max_workers=4):
+    """fetch_candles와 같은 페이지 조회를 하되 응답을 바로 배열로 파싱"""
+    def decode_page(payload):
+        rows = decode(payload)
+        return parse_candles(rows, float32), [row['candle_date_time_utc'] for row in rows]
+
+    pages = fetch_candle_pages(market, interval, count, to, decode_page, raw=True, max_workers=max_workers)
+    return concat_candles(pages, count)
+
+
+def to_frame(arrays):
+    """컴팩트 배열 → 분석/차트 함수가 받는 캔들 프레임 (필요한 컬럼만, 배열 dtype 유지)"""
+    utc = pd.to_datetime(arrays['timestamp'], unit='ms')
+    frame = {
+        'candle_date_time_utc': utc.strftime(_TIME_FORMAT),
+        'candle_date_time_kst': utc + KST_OFFSET
+    }
+    frame.update({field: arrays[name] for name, field in FIELDS.items()})
+    return pd.DataFrame(frame)
+
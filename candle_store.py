@@ -0,0 +1,219 @@
+"""로컬 캔들 저장소 (SQLite)
+
+(market, interval)별 캔들을 디스크에 보관하고, 새로고침 때는 마지막 저장
+캔들 이후 구간만 조회해 덧붙인다. 아직 마감되지 않은 마지막 캔들은 다음
+동기화 때 덮어쓴다. 오래 쉬어 공백이 요청 구간보다 길면 최근 구간만 받아
+두고 끊긴 지점을 기록한다. 그 앞의 저장분은 지우지 않고, 과거 방향으로 채우다
+공백이 메워지면 다시 이어 쓴다.
+"""
+import math
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from upbit_api import INTERVAL_DELTAS, fetch_candles
+
+DEFAULT_PATH = os.environ.get(
+    'DANTA_STORE_PATH',
+    os.path.join(os.path.expanduser('~'), '.cache', 'danta', 'candles.sqlite3')
+)
+
+# 저장 컬럼 (분석에 쓰지 않는 API 필드는 저장하지 않음)
+COLUMNS = [
+    'candle_date_time_utc',
+    'candle_date_time_kst',
+    'opening_price',
+    'high_price',
+    'low_price',
+    'trade_price',
+    'candle_acc_trade_price',
+    'candle_acc_trade_volume'
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    market TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    candle_date_time_utc TEXT NOT NULL,
+    candle_date_time_kst TEXT NOT NULL,
+    opening_price REAL,
+    high_price REAL,
+    low_price REAL,
+    trade_price REAL,
+    candle_acc_trade_price REAL,
+    candle_acc_trade_volume REAL,
+    PRIMARY KEY (market, interval, candle_date_time_utc)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS history (
+    market TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    complete INTEGER NOT NULL,
+    PRIMARY KEY (market, interval)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS gaps (
+    market TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start_utc TEXT NOT NULL,
+    PRIMARY KEY (market, interval, start_utc)
+) WITHOUT ROWID;
+"""
+
+_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def _candles_since(interval, last_utc, now=None):
+    """마지막 저장 캔들(포함)부터 현재까지의 캔들 개수 추정"""
+    now = pd.Timestamp.now(tz='UTC').tz_localize(None) if now is None else now
+    last = pd.Timestamp(last_utc)
+    delta = INTERVAL_DELTAS[interval]
+    if delta is None:
+        return (now.to_period('M') - last.to_period('M')).n + 1
+    return max(1, math.floor((now - last) / delta) + 1)
+
+
+class CandleStore:
+    """(market, interval)별 증분 캔들 저장소"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('PRAGMA mmap_size=268435456')
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _lock(self, market, interval):
+        with self._locks_guard:
+            return self._locks.setdefault((market, interval), threading.Lock())
+
+    def _bounds(self, conn, market, interval, start=None):
+        """start 이후 저장분의 (가장 오래된 시각, 가장 최근 시각, 개수)"""
+        return conn.execute(
+            'SELECT MIN(candle_date_time_utc), MAX(candle_date_time_utc), COUNT(*) '
+            'FROM candles WHERE market = ? AND interval = ? AND candle_date_time_utc >= ?',
+            (market, interval, start or '')
+        ).fetchone()
+
+    def _segment_start(self, conn, market, interval):
+        """최신 캔들과 끊김 없이 이어진 구간의 시작 시각 (공백이 없으면 None)"""
+        return conn.execute(
+            'SELECT MAX(start_utc) FROM gaps WHERE market = ? AND interval = ?',
+            (market, interval)
+        ).fetchone()[0]
+
+    def _set_gap(self, conn, market, interval, old_start, new_start):
+        """끊긴 지점 old_start를 new_start로 옮긴다 (None이면 추가/삭제)"""
+        if old_start is not None:
+            conn.execute('DELETE FROM gaps WHERE market = ? AND interval = ? AND start_utc = ?',
+                         (market, interval, old_start))
+        if new_start is not None:
+            conn.execute('INSERT OR REPLACE INTO gaps (market, interval, start_utc) VALUES (?, ?, ?)',
+                         (market, interval, new_start))
+
+    def _is_complete(self, conn, market, interval):
+        row = conn.execute(
+            'SELECT complete FROM history WHERE market = ? AND interval = ?',
+            (market, interval)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def _write(self, conn, market, interval, df, complete=None):
+        if not df.empty:
+            records = df[COLUMNS].copy()
+            records['candle_date_time_kst'] = records['candle_date_time_kst'].dt.strftime(_TIME_FORMAT)
+            conn.executemany(
+                f'INSERT OR REPLACE INTO candles (market, interval, {", ".join(COLUMNS)}) '
+                f'VALUES (?, ?, {", ".join("?" * len(COLUMNS))})',
+                ((market, interval, *row) for row in records.itertuples(index=False))
+            )
+        if complete is not None:
+            conn.execute(
+                'INSERT OR REPLACE INTO history (market, interval, complete) VALUES (?, ?, ?)',
+                (market, interval, int(complete))
+            )
+
+    def sync(self, market, interval, count):
+        """최신 캔들 증분 반영 후, 부족하면 과거 방향으로 채우기"""
+        with self._lock(market, interval), self._connect() as conn:
+            start = self._segment_start(conn, market, interval)
+            oldest, newest, stored = self._bounds(conn, market, interval, start)
+
+            if newest is not None:
+                missing = _candles_since(interval, newest)
+                if missing >= count:
+                    # 공백이 요청 구간보다 길면 최근 count개만 받고 끊긴 지점을 기록한다
+                    # (그 앞 저장분은 과거 방향 채우기로 공백이 메워지면 다시 쓴다)
+                    df = fetch_candles(market, interval, count)
+                    self._write(conn, market, interval, df)
+                    # 받은 구간이 저장된 최신 캔들에 닿으면 이어진 것이라 공백이 아니다
+                    if not df.empty and df['candle_date_time_utc'].iloc[0] > newest:
+                        self._set_gap(conn, market, interval, None, df['candle_date_time_utc'].iloc[0])
+                    return
+                # 마지막 저장 캔들(미마감)도 다시 받아 덮어쓴다
+                self._write(conn, market, interval, fetch_candles(market, interval, missing))
+                oldest, newest, stored = self._bounds(conn, market, interval, start)
+
+            if newest is None:
+                df = fetch_candles(market, interval, count)
+                self._write(conn, market, interval, df, complete=len(df) < count)
+                return
+
+            if stored >= count:
+                return
+            if start is None:
+                if not self._is_complete(conn, market, interval):
+                    need = count - stored
+                    df = fetch_candles(market, interval, need, to=oldest + 'Z')
+                    self._write(conn, market, interval, df, complete=len(df) < need)
+                return
+
+            # 공백 뒤 구간을 과거 방향으로 채우고, 공백 앞 저장분에 닿으면 끊긴 지점을 지운다
+            previous = conn.execute(
+                'SELECT MAX(candle_date_time_utc) FROM candles '
+                'WHERE market = ? AND interval = ? AND candle_date_time_utc < ?',
+                (market, interval, start)
+            ).fetchone()[0]
+            df = fetch_candles(market, interval, count - stored, to=oldest + 'Z')
+            self._write(conn, market, interval, df)
+            if df.empty:
+                return
+            first = df['candle_date_time_utc'].iloc[0]
+            self._set_gap(conn, market, interval, start,
+                          None if previous is None or first <= previous else first)
+
+    def load(self, market, interval, count):
+        """저장된 최신 count개 캔들을 시간순으로 읽기 (공백 너머 저장분은 제외)"""
+        with self._connect() as conn:
+            start = self._segment_start(conn, market, interval)
+            rows = conn.execute(
+                f'SELECT {", ".join(COLUMNS)} FROM candles '
+                'WHERE market = ? AND interval = ? AND candle_date_time_utc >= ? '
+                'ORDER BY candle_date_time_utc DESC LIMIT ?',
+                (market, interval, start or '', count)
+            ).fetchall()
+
+        df = pd.DataFrame.from_records(rows[::-1], columns=COLUMNS)
+        if df.empty:
+            return df
+        df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'], format=_TIME_FORMAT)
+        return df
+
+    def get_candles(self, market, interval, count=200):
+        """동기화 후 최신 count개 캔들 반환"""
+        self.sync(market, interval, count)
+        return self.load(market, interval, count)
@@ -0,0 +1,288 @@
+"""Plotly 차트 생성
+
+캔들이 화면 해상도보다 많으면 캔들은 구간별 OHLC 집계로, 지표 선은 LTTB로
+줄여서 보낸다. 선은 WebGL(Scattergl)로 그려 브라우저 부담을 줄인다.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+MAX_POINTS = 1500  # 화면 폭 기준 최대 표시 점 수
+
+
+def downsample_ohlcv(df, max_points=MAX_POINTS):
+    """연속한 캔들을 max_points개 구간으로 묶어 OHLCV 집계
+
+    시가는 첫 캔들, 종가는 마지막 캔들, 고가/저가는 구간 최고/최저, 거래량은 합계.
+    시간은 구간 첫 캔들 시각을 쓴다.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+
+    starts = np.unique(np.arange(max_points) * n // max_points)
+    ends = np.append(starts[1:], n) - 1
+    return pd.DataFrame({
+        'candle_date_time_kst': df['candle_date_time_kst'].to_numpy()[starts],
+        'opening_price': df['opening_price'].to_numpy()[starts],
+        'high_price': np.maximum.reduceat(df['high_price'].to_numpy(), starts),
+        'low_price': np.minimum.reduceat(df['low_price'].to_numpy(), starts),
+        'trade_price': df['trade_price'].to_numpy()[ends],
+        'candle_acc_trade_volume': np.add.reduceat(df['candle_acc_trade_volume'].to_numpy(), starts)
+    })
+
+
+def lttb(x, y, threshold=MAX_POINTS):
+    """Largest-Triangle-Three-Buckets 선 다운샘플링 (NaN 구간은 제외)
+
+    각 구간에서 직전 선택점과 다음 구간 평균점이 이루는 삼각형 넓이가 가장 큰
+    점을 고른다. 모양(고점/저점)이 잘 보존된다.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    pos = np.arange(n, dtype=float)
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(int) + 1
+    edges = np.append(edges, n)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        avg_x = pos[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((pos[a] - avg_x) * (y[start:end] - y[a])
+                      - (pos[a] - pos[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
+
+
+# 가격 차트에 겹쳐 그리는 선 (지표 이름 -> 선 모양)
+PRICE_LINES = {
+    'MA5': dict(color='orange', width=1),
+    'MA20': dict(color='blue', width=1),
+    'MA60': dict(color='purple', width=1),
+    'MA120': dict(color='brown', width=1),
+    'EMA12': dict(color='gold', width=1, dash='dot'),
+    'EMA20': dict(color='royalblue', width=1, dash='dot'),
+    'EMA26': dict(color='darkorange', width=1, dash='dot'),
+    'EMA50': dict(color='mediumpurple', width=1, dash='dot')
+}
+
+# 별도 패널에 그리는 지표 -> [(컬럼, 범례 이름, 선 모양)]
+PANEL_INDICATORS = {
+    'MACD': [('MACD', 'MACD', dict(color='blue', width=1)),
+             ('MACD_signal', 'MACD 시그널', dict(color='orange', width=1))],
+    '스토캐스틱': [('STOCH_K', '%K', dict(color='blue', width=1)),
+                ('STOCH_D', '%D', dict(color='orange', width=1))],
+    'ATR': [('ATR', 'ATR', dict(color='gray', width=1))]
+}
+
+
+def _line(df, column, name, line, max_points):
+    x, y = lttb(df['candle_date_time_kst'].to_numpy(), df[column].to_numpy(), max_points)
+    return go.Scattergl(x=x, y=y, name=name, line=line, mode='lines', meta=column)
+
+
+def create_main_chart(df, support_levels, resistance_levels, show_volume_profile, volume_profile_df, indicators,
+                      max_points=MAX_POINTS, x_range=None):
+    """메인 차트 생성
+
+    x_range=(시작, 끝)을 주면 그 구간만 잘라 다시 집계한다 (확대 시 세부 표시).
+    """
+    if x_range is not None:
+        times = df['candle_date_time_kst']
+        df = df[(times >= x_range[0]) & (times <= x_range[1])]
+    candles = downsample_ohlcv(df, max_points)
+    
+    # 가격/거래량/RSI 아래에 고른 보조 지표마다 패널 하나씩
+    panels = [name for name in PANEL_INDICATORS if name in indicators]
+    rows = 3 + len(panels)
+    fig = make_subplots(
+        rows=rows, cols=2,
+        row_heights=[0.6, 0.2, 0.2] + [0.2] * len(panels),  # 비율 (plotly가 정규화)
+        column_widths=[0.8, 0.2],
+        specs=[[{"secondary_y": False}, {"type": "bar"}]] + [[{"secondary_y": False}, None]] * (rows - 1),
+        # 제목은 None이 아닌 칸에 순서대로 붙는다 (1행 두 칸, 이후 행은 한 칸씩)
+        subplot_titles=('가격 차트', '거래량 프로파일', '거래량', 'RSI') + tuple(panels),
+        vertical_spacing=0.05,
+        horizontal_spacing=0.05
+    )
+    
+    # 캔들스틱 차트
+    fig.add_trace(
+        go.Candlestick(
+            x=candles['candle_date_time_kst'],
+            open=candles['opening_price'],
+            high=candles['high_price'],
+            low=candles['low_price'],
+            close=candles['trade_price'],
+            name="캔들스틱",
+            meta='ohlc',
+            increasing_line_color='#ff6b6b',
+            decreasing_line_color='#4ecdc4'
+        ),
+        row=1, col=1
+    )
+    
+    # 이동평균선 / 지수이동평균선
+    for name, line in PRICE_LINES.items():
+        if name in indicators and name in df:
+            fig.add_trace(_line(df, name, name, line, max_points), row=1, col=1)
+    
+    # 볼린저 밴드
+    if '볼린저밴드' in indicators:
+        fig.add_trace(
+            _line(df, 'BB_upper', 'BB Upper', dict(color='gray', width=1, dash='dash'), max_points),
+            row=1, col=1
+        )
+        fig.add_trace(
+            _line(df, 'BB_lower', 'BB Lower', dict(color='gray', width=1, dash='dash'), max_points),
+            row=1, col=1
+        )
+    
+    # 지지선/저항선
+    if support_levels:
+        for level in support_levels[-5:]:  # 최근 5개만
+            fig.add_hline(y=level, line_dash="dash", line_color="green", 
+                         annotation_text=f"지지: {level:,.0f}", row=1, col=1)
+    
+    if resistance_levels:
+        for level in resistance_levels[-5:]:  # 최근 5개만
+            fig.add_hline(y=level, line_dash="dash", line_color="red", 
+                         annotation_text=f"저항: {level:,.0f}", row=1, col=1)
+    
+    # 거래량 프로파일
+    if show_volume_profile and not volume_profile_df.empty and 'buy_volume' in volume_profile_df:
+        # 체결 기반 프로파일: 매수 체결 위에 매도 체결을 이어 쌓는다
+        fig.add_trace(
+            go.Bar(
+                y=volume_profile_df['price'],
+                x=volume_profile_df['buy_volume'],
+                orientation='h',
+                name='매수 체결',
+                marker_color='rgba(220, 53, 69, 0.6)',
+                hovertemplate='가격: %{y:,.0f}<br>매수 체결량: %{x:,.4f}<extra></extra>'
+            ),
+            row=1, col=2
+        )
+        fig.add_trace(
+            go.Bar(
+                y=volume_profile_df['price'],
+                x=volume_profile_df['sell_volume'],
+                base=volume_profile_df['buy_volume'],
+                orientation='h',
+                name='매도 체결',
+                marker_color='rgba(13, 110, 253, 0.6)',
+                hovertemplate='가격: %{y:,.0f}<br>매도 체결량: %{x:,.4f}<extra></extra>'
+            ),
+            row=1, col=2
+        )
+    elif show_volume_profile and not volume_profile_df.empty:
+        fig.add_trace(
+            go.Bar(
+                y=volume_profile_df['price'],
+                x=volume_profile_df['volume'],
+                orientation='h',
+                name='거래량 프로파일',
+                marker_color='rgba(102, 126, 234, 0.6)',
+                hovertemplate='가격: %{y:,.0f}<br>거래량: %{x:,.0f}<extra></extra>'
+            ),
+            row=1, col=2
+        )
+    
+    # 거래량 차트
+    colors = np.where(candles['opening_price'] > candles['trade_price'], 'red', 'blue')
+    fig.add_trace(
+        go.Bar(x=candles['candle_date_time_kst'], y=candles['candle_acc_trade_volume'],
+               name='거래량', marker_color=colors, meta='candle_acc_trade_volume'),
+        row=2, col=1
+    )
+    
+    # RSI
+    if not df['RSI'].isna().all():
+        fig.add_trace(
+            _line(df, 'RSI', 'RSI', dict(color='purple'), max_points),
+            row=3, col=1
+        )
+        if 'RSI(Wilder)' in indicators and 'RSI_wilder' in df:
+            fig.add_trace(
+                _line(df, 'RSI_wilder', 'RSI(Wilder)', dict(color='teal', width=1), max_points),
+                row=3, col=1
+            )
+        fig.add_hline(y=70, line_dash="dash", line_color="red", row=3, col=1)
+        fig.add_hline(y=30, line_dash="dash", line_color="green", row=3, col=1)
+    
+    # 보조 지표 패널
+    for row, name in enumerate(panels, start=4):
+        for column, label, line in PANEL_INDICATORS[name]:
+            if column in df:
+                fig.add_trace(_line(df, column, label, line, max_points), row=row, col=1)
+        if name == '스토캐스틱':
+            fig.add_hline(y=80, line_dash="dash", line_color="red", row=row, col=1)
+            fig.add_hline(y=20, line_dash="dash", line_color="green", row=row, col=1)
+    
+    # 레이아웃 설정
+    fig.update_layout(
+        title="업비트 차트 분석",
+        xaxis_rangeslider_visible=False,
+        height=800 + 160 * len(panels),
+        showlegend=True,
+        template="plotly_white"
+    )
+    
+    return fig
+
+
+def _replace_last(values, value):
+    """plotly 트레이스 배열(읽기 전용일 수 있음)의 마지막 값만 바꾼 복사본"""
+    values = np.array(values)
+    values[-1] = value
+    return values
+
+
+def patch_last_candle(fig, df, x_range=None):
+    """진행 중인 마지막 캔들과 지표 끝값만 이미 만든 그림에 반영 (그림을 다시 만들지 않음)
+
+    df는 그림을 만들 때와 마지막 캔들 시각이 같아야 한다 (새 캔들이 생기면 그림을
+    다시 만든다). 다운샘플된 그림은 마지막 묶음을 df에서 다시 집계한다. 지지/저항선과
+    거래량 프로파일은 건드리지 않는다. x_range가 마지막 캔들을 포함하지 않으면 그대로 둔다.
+    """
+    times = df['candle_date_time_kst']
+    last_time = times.iloc[-1]
+    if x_range is not None and x_range[1] < last_time:
+        return fig
+    for trace in fig.data:
+        if trace.meta is None or trace.x is None or not len(trace.x):
+            continue
+        trace_last = pd.Timestamp(trace.x[-1])
+        if trace_last > last_time:
+            continue
+        if trace.meta == 'ohlc':
+            bucket = df.iloc[times.searchsorted(trace_last):]
+            trace.high = _replace_last(trace.high, bucket['high_price'].max())
+            trace.low = _replace_last(trace.low, bucket['low_price'].min())
+            trace.close = _replace_last(trace.close, bucket['trade_price'].iloc[-1])
+        elif trace.meta == 'candle_acc_trade_volume':
+            bucket = df.iloc[times.searchsorted(trace_last):]
+            trace.y = _replace_last(trace.y, bucket['candle_acc_trade_volume'].sum())
+            down = bucket['opening_price'].iloc[0] > bucket['trade_price'].iloc[-1]
+            trace.marker.color = _replace_last(trace.marker.color, 'red' if down else 'blue')
+        elif trace.meta in df and trace_last == last_time:
+            # LTTB는 마지막 점을 항상 남기므로 끝값만 바꾸면 된다
+            value = df[trace.meta].iloc[-1]
+            if value == value:  # NaN 제외
+                trace.y = _replace_last(trace.y, value)
+    return fig
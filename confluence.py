@@ -0,0 +1,120 @@
+"""멀티 타임프레임 지지/저항 합류(confluence) 분석
+
+여러 간격 캔들을 스레드에서 동시에 조회해 (전체 지연 ≈ 가장 느린 조회 하나)
+간격마다 지지/저항선과 거래량 프로파일 POC를 구하고, 가까운 가격끼리 한
+구간으로 묶어 몇 개 간격이 그 구간에 동의하는지로 순위를 매긴다.
+
+    zones, levels, errors = analyze_confluence('KRW-BTC', ['15분', '1시간', '4시간', '일봉'])
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from analysis import (
+    calculate_support_resistance,
+    calculate_technical_indicators,
+    calculate_value_area,
+    calculate_volume_profile
+)
+from upbit_api import fetch_candles
+
+DEFAULT_INTERVALS = ['15분', '1시간', '4시간', '일봉']
+DEFAULT_TOLERANCE = 0.005  # 구간 폭: 구간 첫 가격의 ±0.5%
+
+
+def fetch_timeframes(market, intervals, count=200, fetch=fetch_candles):
+    """간격별 캔들 동시 조회 → ({간격: 캔들}, {간격: 예외})"""
+    frames = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=len(intervals) or 1) as executor:
+        futures = {interval: executor.submit(fetch, market, interval, count) for interval in intervals}
+        for interval, future in futures.items():
+            try:
+                frames[interval] = future.result()
+            except Exception as e:
+                errors[interval] = e
+    return frames, errors
+
+
+def timeframe_levels(df, window=20, bins=50):
+    """한 간격의 (가격, 근거) 목록: 지지/저항선과 POC"""
+    df = calculate_technical_indicators(df.copy(), indicators=[])  # 레벨에 쓰는 MA20/MA60만
+    support_levels, resistance_levels = calculate_support_resistance(df, window)
+    poc_price, _, _ = calculate_value_area(calculate_volume_profile(df, bins))
+
+    levels = [(price, '지지선') for price in support_levels]
+    levels += [(price, '저항선') for price in resistance_levels]
+    if poc_price is not None:
+        levels.append((float(poc_price), 'POC'))
+    return levels
+
+
+def merge_levels(levels_by_interval, current_price, tolerance=DEFAULT_TOLERANCE):
+    """간격별 레벨을 가격 구간으로 묶어 동의하는 간격 수 순으로 정렬한 표
+
+    가격순으로 훑으면서 구간 첫 가격에서 tolerance 비율 안에 드는 레벨을 같은
+    구간에 넣는다. 점수는 구간에 레벨이 있는 간격 수, 같은 점수면 레벨 수와
+    현재가와의 거리로 정렬한다.
+    """
+    points = sorted(
+        (float(price), interval, source)
+        for interval, levels in levels_by_interval.items()
+        for price, source in levels
+    )
+
+    zones = []
+    for price, interval, source in points:
+        if zones and price <= zones[-1]['low'] * (1 + tolerance):
+            zone = zones[-1]
+        else:
+            zone = {'low': price, 'prices': [], 'intervals': set(), 'sources': set()}
+            zones.append(zone)
+        zone['prices'].append(price)
+        zone['intervals'].add(interval)
+        zone['sources'].add(source)
+
+    order = {interval: i for i, interval in enumerate(levels_by_interval)}
+    rows = []
+    for zone in zones:
+        price = sum(zone['prices']) / len(zone['prices'])
+        rows.append({
+            '가격': price,
+            '구분': '지지' if price < current_price else '저항',
+            '점수': len(zone['intervals']),
+            '레벨 수': len(zone['prices']),
+            '간격': ', '.join(sorted(zone['intervals'], key=order.get)),
+            '근거': ', '.join(sorted(zone['sources'])),
+            '구간 하단': zone['low'],
+            '구간 상단': max(zone['prices']),
+            '현재가 대비(%)': (price - current_price) / current_price * 100
+        })
+
+    result = pd.DataFrame(rows)
+    if result.empty:
+        return result
+    result['_distance'] = result['현재가 대비(%)'].abs()
+    result = result.sort_values(['점수', '레벨 수', '_distance'], ascending=[False, False, True])
+    return result.drop(columns='_distance').reset_index(drop=True)
+
+
+def analyze_confluence(market, intervals=DEFAULT_INTERVALS, count=200, fetch=fetch_candles,
+                       window=20, bins=50, tolerance=DEFAULT_TOLERANCE):
+    """여러 간격 동시 조회 → 간격별 레벨 → 합류 구간 표
+
+    반환: (합류 구간 표, {간격: 레벨 목록}, {간격: 예외})
+    현재가는 intervals 중 처음 조회에 성공한 간격의 마지막 종가를 쓴다 (짧은 간격부터 주면 가장 최신).
+    """
+    frames, errors = fetch_timeframes(market, list(intervals), count, fetch)
+    levels_by_interval = {}
+    current_price = None
+    for interval in intervals:
+        df = frames.get(interval)
+        if df is None or df.empty:
+            continue
+        levels_by_interval[interval] = timeframe_levels(df, window, bins)
+        if current_price is None:
+            current_price = float(df['trade_price'].iloc[-1])
+
+    if current_price is None:
+        return pd.DataFrame(), levels_by_interval, errors
+    return merge_levels(levels_by_interval, current_price, tolerance), levels_by_interval, errors
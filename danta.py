@@ -1,24 +1,46 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import requests
-import time
-from datetime import datetime, timedelta
+import os
 import warnings
+import sqlite3
+import live_stream
+from analysis import (
+    calculate_support_resistance,
+    calculate_technical_indicators,
+    calculate_trade_signals,
+    calculate_value_area,
+    calculate_volume_profile
+)
+from batch import scan_markets
+from charts import MAX_POINTS as CHART_MAX_POINTS, create_main_chart, patch_last_candle
+from upbit_api import fetch_candles, fetch_markets
+from candle_store import CandleStore
+from orderbook import OrderbookSampler
+from price_board import price_board, top_markets
+from confluence import DEFAULT_INTERVALS as CONFLUENCE_INTERVALS, analyze_confluence
+from derived_cache import DerivedCache, frame_fingerprint
+from fetch_scheduler import FetchScheduler, parse_watchlist
+from metrics import recorder
+from live_stream import StreamPool, TradeStream, merge_live_candles
+from indicators import EngineRegistry, fill_indicator_tail
+from indicator_pipeline import CATALOG as INDICATOR_CATALOG, compute_indicators
+from resample import TimeframeSet
+from tick_profile import TickProfile, sync_trades
 warnings.filterwarnings('ignore')
 
-# 페이지 설정
-st.set_page_config(
-    page_title="업비트 차트 분석기",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+TICK_PROFILE_WINDOW = 200_000  # 종목별 체결 프로파일에 보관할 최근 체결 수
 
-# CSS 스타일
-st.markdown("""
+def setup_page():
+    """페이지 설정과 CSS (첫 Streamlit 호출이어야 함)"""
+    st.set_page_config(
+        page_title="업비트 차트 분석기",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    # CSS 스타일
+    st.markdown("""
 <style>
     .main-header {
         background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
@@ -74,389 +96,377 @@ def get_upbit_tickers():
     }
     return major_cryptos
 
-@st.cache_data(ttl=60)
+@st.cache_resource
+def get_candle_store():
+    """로컬 캔들 저장소 (프로세스 공유)"""
+    return CandleStore()
+
+@st.cache_resource
+def get_fetch_generations():
+    """(market, interval)별 새로고침 횟수 (캐시 키에 넣어 그 종목만 다시 조회)"""
+    return {}
+
+def fetch_generation(market, interval):
+    return get_fetch_generations().get((market, interval), 0)
+
+def fetch_stored_candles(market, interval, count):
+    """로컬 저장소에 증분 반영하며 캔들 조회"""
+    try:
+        return get_candle_store().get_candles(market, interval, count)
+    except sqlite3.Error:
+        # 저장소를 쓸 수 없는 환경이면 직접 조회
+        return fetch_candles(market, interval, count)
+
+@st.cache_resource
+def get_candle_scheduler():
+    """캔들 공유 조회 스케줄러 (프로세스 공유, 관심 종목 미리 조회)
+
+    관심 종목은 DANTA_WATCHLIST='KRW-BTC:1시간:500,KRW-ETH' 형식으로 지정하고,
+    없으면 주요 종목 일봉 200개를 미리 받아 둔다.
+    """
+    scheduler = FetchScheduler(fetch_stored_candles).start()
+    watchlist = os.environ.get('DANTA_WATCHLIST')
+    if watchlist:
+        scheduler.warm(parse_watchlist(watchlist))
+    else:
+        scheduler.warm((market, '일봉', 200) for market in get_upbit_tickers().values())
+    return scheduler
+
 def get_upbit_candles(market, interval, count=200):
-    """업비트 캔들 데이터 조회"""
+    """업비트 캔들 데이터 조회 (공유 스케줄러가 만료 전에 미리 갱신)
+
+    만료 직후에도 API를 기다리지 않고 직전 결과를 받는다. 스케줄러 결과는
+    모든 세션이 같이 쓰므로 복사본을 돌려준다.
+    """
     try:
-        intervals = {
-            '1분': 'minutes/1',
-            '5분': 'minutes/5', 
-            '15분': 'minutes/15',
-            '30분': 'minutes/30',
-            '1시간': 'minutes/60',
-            '4시간': 'minutes/240',
-            '일봉': 'days',
-            '주봉': 'weeks',
-            '월봉': 'months'
-        }
-        
-        url = f"https://api.upbit.com/v1/candles/{intervals[interval]}"
-        params = {'market': market, 'count': count}
-        
-        response = requests.get(url, params=params)
-        data = response.json()
-        
-        df = pd.DataFrame(data)
-        df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
-        df = df.sort_values('candle_date_time_kst').reset_index(drop=True)
-        
-        return df
+        return get_candle_scheduler().get(market, interval, count).copy()
     except Exception as e:
         st.error(f"캔들 데이터를 가져오는데 실패했습니다: {e}")
         return pd.DataFrame()
 
-def calculate_support_resistance(df, window=20):
-    """지지선/저항선 계산 (개선된 버전)"""
-    if len(df) < window:
-        return [], []
-    
-    current_price = df.iloc[-1]['trade_price']
-    
-    # 피봇 포인트 계산
-    highs = df['high_price'].rolling(window=window, center=True).max()
-    lows = df['low_price'].rolling(window=window, center=True).min()
-    
-    resistance_levels = []
-    support_levels = []
-    
-    for i in range(window, len(df) - window):
-        if df.iloc[i]['high_price'] == highs.iloc[i]:
-            resistance_levels.append(df.iloc[i]['high_price'])
-        if df.iloc[i]['low_price'] == lows.iloc[i]:
-            support_levels.append(df.iloc[i]['low_price'])
-    
-    # 이동평균선도 동적 지지/저항으로 추가
-    if len(df) >= 20:
-        ma20 = df['MA20'].iloc[-1]
-        ma60 = df['MA60'].iloc[-1] if len(df) >= 60 else None
-        
-        if ma20 < current_price:
-            support_levels.append(ma20)
-        else:
-            resistance_levels.append(ma20)
-            
-        if ma60:
-            if ma60 < current_price:
-                support_levels.append(ma60)
-            else:
-                resistance_levels.append(ma60)
-    
-    # 현재가 기준으로 올바른 지지/저항 분리
-    support_levels = [level for level in support_levels if level < current_price]
-    resistance_levels = [level for level in resistance_levels if level > current_price]
-    
-    # 중복 제거 및 정렬
-    support_levels = sorted(list(set([round(x, -1) for x in support_levels])), reverse=True)[:10]
-    resistance_levels = sorted(list(set([round(x, -1) for x in resistance_levels])))[:10]
-    
-    return support_levels, resistance_levels
+# 1분봉 기반 로컬 리샘플링
+@st.cache_resource(max_entries=16)
+def get_timeframes(market, base_days):
+    """(종목, 1분봉 보관 기간)별 1분봉과 상위 간격 캔들 (프로세스 공유, 보관 기간만큼만 유지)"""
+    return TimeframeSet(max_base=base_days * 24 * 60)
 
-def calculate_volume_profile(df, bins=50):
-    """거래량 프로파일 계산"""
-    if df.empty:
-        return pd.DataFrame()
-    
-    min_price = df['low_price'].min()
-    max_price = df['high_price'].max()
-    price_bins = np.linspace(min_price, max_price, bins)
-    
-    volume_profile = []
-    
-    for i in range(len(price_bins) - 1):
-        bin_low = price_bins[i]
-        bin_high = price_bins[i + 1]
-        bin_center = (bin_low + bin_high) / 2
-        
-        # 각 가격 구간에 해당하는 거래량 합계
-        mask = (df['low_price'] <= bin_high) & (df['high_price'] >= bin_low)
-        total_volume = df.loc[mask, 'candle_acc_trade_volume'].sum()
-        
-        volume_profile.append({
-            'price': bin_center,
-            'volume': total_volume,
-            'price_range': f"{bin_low:.0f} - {bin_high:.0f}"
-        })
-    
-    return pd.DataFrame(volume_profile)
+def get_resampled_candles(market, interval, count, base_days):
+    """1분봉 하나로 만든 interval 캔들 (간격을 바꿔도 API 호출 없음)
 
-def calculate_technical_indicators(df):
-    """기술적 지표 계산"""
-    if df.empty or len(df) < 20:
-        return df
-    
-    # 이동평균선
-    df['MA5'] = df['trade_price'].rolling(window=5).mean()
-    df['MA20'] = df['trade_price'].rolling(window=20).mean()
-    df['MA60'] = df['trade_price'].rolling(window=60).mean()
-    df['MA120'] = df['trade_price'].rolling(window=120).mean()
-    
-    # RSI 계산
-    delta = df['trade_price'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    
-    # 볼린저 밴드
-    df['BB_middle'] = df['trade_price'].rolling(window=20).mean()
-    bb_std = df['trade_price'].rolling(window=20).std()
-    df['BB_upper'] = df['BB_middle'] + (bb_std * 2)
-    df['BB_lower'] = df['BB_middle'] - (bb_std * 2)
-    
-    return df
+    보관 기간을 바꾸면 그 기간의 1분봉으로 만든 별도 묶음을 쓴다.
+    """
+    base = get_upbit_candles(market, '1분', base_days * 24 * 60)
+    timeframes = get_timeframes(market, base_days)
+    timeframes.update(base)
+    return timeframes.get(interval, count)
 
-def calculate_trade_signals(df, support_levels, resistance_levels, volume_profile_df):
-    """매수/매도 신호 계산 (개선된 버전)"""
-    if df.empty or len(df) < 20:
-        return None, None, None, None
-    
-    current_price = df.iloc[-1]['trade_price']
-    rsi = df['RSI'].iloc[-1] if not df['RSI'].isna().iloc[-1] else 50
-    
-    # 거래량 프로파일에서 POC (Point of Control) 찾기
-    poc_price = None
-    if not volume_profile_df.empty:
-        poc_idx = volume_profile_df['volume'].idxmax()
-        poc_price = volume_profile_df.iloc[poc_idx]['price']
-        
-        # POC가 현재가보다 아래면 지지선으로 추가
-        if poc_price < current_price:
-            support_levels.append(poc_price)
-        elif poc_price > current_price:
-            resistance_levels.append(poc_price)
-    
-    # 지지선/저항선 재정렬
-    support_levels = sorted([s for s in support_levels if s < current_price], reverse=True)
-    resistance_levels = sorted([r for r in resistance_levels if r > current_price])
-    
-    # 가장 가까운 지지선/저항선 찾기
-    nearest_support = support_levels[0] if support_levels else current_price * 0.85
-    nearest_resistance = resistance_levels[0] if resistance_levels else current_price * 1.15
-    
-    # 변동성 계산 (최근 20일 변동폭)
-    recent_volatility = df['trade_price'].tail(20).std() / current_price
-    volatility_factor = max(0.02, min(0.1, recent_volatility))  # 2%~10% 범위
-    
-    # 매수 추천가 계산
-    buy_signals = []
-    
-    # 1. 강력한 지지선 근처 (가장 강력한 지지선 +2%)
-    if support_levels:
-        strong_support = support_levels[0]
-        buy_price_1 = strong_support * 1.02
-        confidence = "강력 추천" if current_price > strong_support * 1.1 else "추천"
-        buy_signals.append(('강력 지지선', buy_price_1, confidence))
-    
-    # 2. POC 근처 (거래량 집중 구간)
-    if poc_price and poc_price < current_price:
-        buy_price_poc = poc_price * 1.01
-        buy_signals.append(('POC 지지', buy_price_poc, '강력 추천'))
-    
-    # 3. 단기 매수 (현재가 기준)
-    buy_price_2 = current_price * (1 - volatility_factor * 1.5)
-    buy_signals.append(('단기 매수', buy_price_2, '추천'))
-    
-    # 4. RSI 기반 매수가
-    if rsi < 30:  # 과매도
-        buy_price_3 = current_price * 0.95
-        buy_signals.append(('RSI 과매도', buy_price_3, '강력 추천'))
-    elif rsi < 40:  # 중립 하단
-        buy_price_3 = current_price * 0.97
-        buy_signals.append(('RSI 약세', buy_price_3, '추천'))
-    elif rsi < 50:
-        buy_price_3 = current_price * 0.98
-        buy_signals.append(('RSI 중립하', buy_price_3, '보통'))
-    
-    # 5. 이동평균선 지지
-    if len(df) >= 20 and not df['MA20'].isna().iloc[-1]:
-        ma20 = df['MA20'].iloc[-1]
-        if ma20 < current_price:
-            buy_signals.append(('MA20 지지', ma20 * 1.005, '추천'))
-    
-    # 매도 추천가 계산
-    sell_signals = []
-    
-    # 1. 강력한 저항선 근처
-    if resistance_levels:
-        strong_resistance = resistance_levels[0]
-        sell_price_1 = strong_resistance * 0.98
-        confidence = "강력 추천" if current_price < strong_resistance * 0.9 else "추천"
-        sell_signals.append(('강력 저항선', sell_price_1, confidence))
-    
-    # 2. POC 저항 근처
-    if poc_price and poc_price > current_price:
-        sell_price_poc = poc_price * 0.99
-        sell_signals.append(('POC 저항', sell_price_poc, '강력 추천'))
-    
-    # 3. 단기 목표 (변동성 기반)
-    target_profit = max(0.05, volatility_factor * 2)  # 최소 5% 목표
-    sell_price_2 = current_price * (1 + target_profit)
-    sell_signals.append(('단기 목표', sell_price_2, '추천'))
-    
-    # 4. RSI 기반 매도가
-    if rsi > 70:  # 과매수
-        sell_price_3 = current_price * 1.02
-        sell_signals.append(('RSI 과매수', sell_price_3, '강력 추천'))
-    elif rsi > 60:  # 중립 상단
-        sell_price_3 = current_price * 1.04
-        sell_signals.append(('RSI 강세', sell_price_3, '추천'))
-    elif rsi > 50:
-        sell_price_3 = current_price * 1.06
-        sell_signals.append(('RSI 중립상', sell_price_3, '보통'))
-    
-    # 5. 중장기 목표 (피보나치 기반)
-    if resistance_levels:
-        fib_target = current_price + (resistance_levels[0] - current_price) * 0.618
-        sell_signals.append(('피보나치 61.8%', fib_target, '보통'))
-    
-    # 중복 제거 및 정렬
-    buy_signals = sorted(list(set(buy_signals)), key=lambda x: x[1], reverse=True)
-    sell_signals = sorted(list(set(sell_signals)), key=lambda x: x[1])
-    
-    return buy_signals, sell_signals, nearest_support, nearest_resistance
-    """기술적 지표 계산"""
-    if df.empty or len(df) < 20:
-        return df
-    
-    # 이동평균선
-    df['MA5'] = df['trade_price'].rolling(window=5).mean()
-    df['MA20'] = df['trade_price'].rolling(window=20).mean()
-    df['MA60'] = df['trade_price'].rolling(window=60).mean()
-    df['MA120'] = df['trade_price'].rolling(window=120).mean()
-    
-    # RSI 계산
-    delta = df['trade_price'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    
-    # 볼린저 밴드
-    df['BB_middle'] = df['trade_price'].rolling(window=20).mean()
-    bb_std = df['trade_price'].rolling(window=20).std()
-    df['BB_upper'] = df['BB_middle'] + (bb_std * 2)
-    df['BB_lower'] = df['BB_middle'] - (bb_std * 2)
-    
+# 파생 결과 캐시 (지표, 지지/저항선, 거래량 프로파일, 차트)
+@st.cache_resource
+def get_derived_cache():
+    """캔들 내용 지문 키 LRU 캐시 (프로세스 공유)"""
+    return DerivedCache()
+
+def cached_stage(stage, market, interval, fingerprint, params, compute, rows):
+    """파생 결과 캐시 조회를 stage 이름으로 계측 (계산하면 cache=miss)"""
+    def run():
+        recorder.note(cache='miss')
+        return compute()
+
+    with recorder.time(stage, rows=rows, cache='hit'):
+        return get_derived_cache().get_or_compute(market, interval, stage, fingerprint, params, run)
+
+def load_candles(market, interval, count, local_resample, base_days):
+    """차트용 캔들 (조회 시간, 행 수, 캐시 적중 여부 계측)"""
+    with recorder.time('candles', cache='hit') as fields:
+        if local_resample:
+            df = get_resampled_candles(market, interval, count, base_days)
+        else:
+            df = get_upbit_candles(market, interval, count)
+        fields['rows'] = len(df)
     return df
 
-def create_main_chart(df, support_levels, resistance_levels, show_volume_profile, volume_profile_df, indicators):
-    """메인 차트 생성"""
-    fig = make_subplots(
-        rows=3, cols=2,
-        row_heights=[0.6, 0.2, 0.2],
-        column_widths=[0.8, 0.2],
-        specs=[[{"secondary_y": False}, {"type": "bar"}],
-               [{"secondary_y": False}, None],
-               [{"secondary_y": False}, None]],
-        subplot_titles=('가격 차트', '거래량 프로파일', '거래량', '', 'RSI', ''),
-        vertical_spacing=0.05,
-        horizontal_spacing=0.05
-    )
-    
-    # 캔들스틱 차트
-    fig.add_trace(
-        go.Candlestick(
-            x=df['candle_date_time_kst'],
-            open=df['opening_price'],
-            high=df['high_price'],
-            low=df['low_price'],
-            close=df['trade_price'],
-            name="캔들스틱",
-            increasing_line_color='#ff6b6b',
-            decreasing_line_color='#4ecdc4'
-        ),
-        row=1, col=1
-    )
-    
-    # 이동평균선
-    if 'MA5' in indicators:
-        fig.add_trace(
-            go.Scatter(x=df['candle_date_time_kst'], y=df['MA5'], 
-                      name='MA5', line=dict(color='orange', width=1)),
-            row=1, col=1
-        )
-    if 'MA20' in indicators:
-        fig.add_trace(
-            go.Scatter(x=df['candle_date_time_kst'], y=df['MA20'], 
-                      name='MA20', line=dict(color='blue', width=1)),
-            row=1, col=1
-        )
-    if 'MA60' in indicators:
-        fig.add_trace(
-            go.Scatter(x=df['candle_date_time_kst'], y=df['MA60'], 
-                      name='MA60', line=dict(color='purple', width=1)),
-            row=1, col=1
-        )
-    
-    # 볼린저 밴드
-    if '볼린저밴드' in indicators:
-        fig.add_trace(
-            go.Scatter(x=df['candle_date_time_kst'], y=df['BB_upper'], 
-                      name='BB Upper', line=dict(color='gray', width=1, dash='dash')),
-            row=1, col=1
-        )
-        fig.add_trace(
-            go.Scatter(x=df['candle_date_time_kst'], y=df['BB_lower'], 
-                      name='BB Lower', line=dict(color='gray', width=1, dash='dash')),
-            row=1, col=1
-        )
-    
-    # 지지선/저항선
-    if support_levels:
-        for level in support_levels[-5:]:  # 최근 5개만
-            fig.add_hline(y=level, line_dash="dash", line_color="green", 
-                         annotation_text=f"지지: {level:,.0f}", row=1, col=1)
-    
-    if resistance_levels:
-        for level in resistance_levels[-5:]:  # 최근 5개만
-            fig.add_hline(y=level, line_dash="dash", line_color="red", 
-                         annotation_text=f"저항: {level:,.0f}", row=1, col=1)
-    
-    # 거래량 프로파일
-    if show_volume_profile and not volume_profile_df.empty:
-        fig.add_trace(
-            go.Bar(
-                y=volume_profile_df['price'],
-                x=volume_profile_df['volume'],
-                orientation='h',
-                name='거래량 프로파일',
-                marker_color='rgba(102, 126, 234, 0.6)',
-                hovertemplate='가격: %{y:,.0f}<br>거래량: %{x:,.0f}<extra></extra>'
-            ),
-            row=1, col=2
+def refresh_market(market, intervals):
+    """선택한 종목/간격의 캔들과 파생 결과만 무효화"""
+    generations = get_fetch_generations()
+    cache = get_derived_cache()
+    scheduler = get_candle_scheduler()
+    for interval in intervals:
+        generations[(market, interval)] = generations.get((market, interval), 0) + 1
+        scheduler.invalidate(market, interval)
+        cache.invalidate(market, interval)
+
+def derive_analysis(market, interval, df, fingerprint, show_support_resistance, show_volume_profile,
+                    walls_df=None, tick_profile=None):
+    """지지/저항선, 거래량 프로파일, 매매 신호 (같은 캔들과 옵션, 호가 벽이면 캐시 사용)
+
+    tick_profile을 주면 거래량 프로파일을 캔들 대신 체결 히스토그램으로 만든다.
+    """
+    def compute():
+        support_levels, resistance_levels = [], []
+        if show_support_resistance:
+            with recorder.time('support_resistance', rows=len(df)):
+                support_levels, resistance_levels = calculate_support_resistance(df, walls_df=walls_df)
+        volume_profile_df = pd.DataFrame()
+        if show_volume_profile:
+            with recorder.time('volume_profile', rows=len(df)):
+                if tick_profile is not None:
+                    volume_profile_df = tick_profile.frame()
+                else:
+                    volume_profile_df = calculate_volume_profile(df)
+        # calculate_trade_signals가 POC를 지지/저항 목록에 덧붙이므로 같이 캐시한다
+        with recorder.time('trade_signals', rows=len(df)):
+            signals = calculate_trade_signals(df, support_levels, resistance_levels, volume_profile_df,
+                                              walls_df=walls_df)
+        return (support_levels, resistance_levels, volume_profile_df) + tuple(signals)
+
+    walls = () if walls_df is None else tuple(walls_df[['price', 'side', 'strength']].itertuples(index=False))
+    ticks = None if tick_profile is None else tick_profile.total  # 체결이 들어오면 다시 계산
+    return cached_stage('analysis', market, interval, fingerprint,
+                        (show_support_resistance, show_volume_profile, walls, ticks), compute, len(df))
+
+# 체결 기반 거래량 프로파일
+@st.cache_resource(max_entries=16)
+def get_tick_profile(market):
+    """종목별 체결 히스토그램 (프로세스 공유, 최근 20만 건)"""
+    return TickProfile(window=TICK_PROFILE_WINDOW)
+
+def load_tick_profile(market, stream=None):
+    """REST로 새 체결을 받아 반영 (체결 스트림이 있으면 리스너로 붙이고 처음 한 번만 조회)"""
+    profile = get_tick_profile(market)
+    with recorder.time('tick_profile') as fields:
+        if stream is not None and profile.on_trade not in stream.listeners:
+            stream.listeners.append(profile.on_trade)
+        elif stream is not None and profile.total:
+            return profile
+        fields['rows'] = sync_trades(profile, market)
+    return profile
+
+# 호가 벽 (호가 스냅샷 주기 수집)
+@st.cache_resource
+def get_orderbook_samplers():
+    """종목별 호가 수집 스레드 (프로세스 공유, 최근 16종목, 밀려난 수집기는 멈춤)"""
+    return StreamPool(lambda market: OrderbookSampler([market]).start(), max_entries=16)
+
+def get_orderbook_sampler(market):
+    """종목 호가 수집기 (1초 주기, 최근 60개 평균)"""
+    return get_orderbook_samplers().get(market)
+
+# 전체 시장 스캐너
+@st.cache_data(ttl=3600)
+def get_krw_markets():
+    """원화 마켓 전체 목록 {마켓코드: 한글명}"""
+    return {m['market']: m['korean_name'] for m in fetch_markets('KRW')}
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_market_scan(markets, interval, count):
+    """여러 종목 병렬 조회/분석 결과 (RSI 순 표, 실패 종목)"""
+    # 앱 프로세스에는 스트림/수집 스레드가 떠 있어 fork 대신 스레드로 분석한다
+    return scan_markets(markets, interval, count, fetch=get_candle_store().get_candles, processes=False)
+
+def render_market_scanner():
+    """전체 시장 스캔 화면"""
+    with st.sidebar:
+        interval = st.selectbox(
+            "⏰ 차트 간격",
+            options=['1분', '5분', '15분', '30분', '1시간', '4시간', '일봉', '주봉', '월봉'],
+            index=6
         )
-    
-    # 거래량 차트
-    colors = ['red' if row['opening_price'] > row['trade_price'] else 'blue' for _, row in df.iterrows()]
-    fig.add_trace(
-        go.Bar(x=df['candle_date_time_kst'], y=df['candle_acc_trade_volume'],
-               name='거래량', marker_color=colors),
-        row=2, col=1
+        candle_count = st.slider("📊 캔들 개수", min_value=50, max_value=1000, value=200, step=50)
+        run_scan = st.button("🔎 스캔 시작", type="primary")
+
+    st.markdown("## 🔎 원화 마켓 전체 스캔")
+    st.caption("표 머리글을 누르면 RSI, 지지/저항선 거리, 추천가 괴리율 순으로 정렬할 수 있습니다.")
+
+    if not run_scan:
+        st.info("사이드바에서 간격을 고르고 '스캔 시작'을 누르세요.")
+        return
+
+    try:
+        names = get_krw_markets()
+    except Exception as e:
+        st.error(f"마켓 목록을 가져오는데 실패했습니다: {e}")
+        return
+
+    with st.spinner(f"{len(names)}개 종목을 분석하는 중..."):
+        result, failed = get_market_scan(tuple(names), interval, candle_count)
+
+    if result.empty:
+        st.error("분석 결과가 없습니다.")
+        return
+
+    result.insert(1, '이름', result['종목'].map(names))
+    st.dataframe(
+        result,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            '현재가': st.column_config.NumberColumn(format="%,.0f"),
+            'RSI': st.column_config.NumberColumn(format="%.1f"),
+            '지지선 거리(%)': st.column_config.NumberColumn(format="%.2f"),
+            '저항선 거리(%)': st.column_config.NumberColumn(format="%.2f"),
+            '추천 매수가': st.column_config.NumberColumn(format="%,.0f"),
+            '매수가 괴리(%)': st.column_config.NumberColumn(format="%.2f"),
+            '추천 매도가': st.column_config.NumberColumn(format="%,.0f"),
+            '매도가 괴리(%)': st.column_config.NumberColumn(format="%.2f"),
+        }
     )
-    
-    # RSI
-    if not df['RSI'].isna().all():
-        fig.add_trace(
-            go.Scatter(x=df['candle_date_time_kst'], y=df['RSI'], 
-                      name='RSI', line=dict(color='purple')),
-            row=3, col=1
+    if failed:
+        st.warning(f"조회에 실패한 종목 {len(failed)}개: {', '.join(sorted(failed))}")
+
+# 멀티 타임프레임 합류 분석
+@st.cache_data(ttl=60, show_spinner=False)
+def get_confluence(market, intervals, count, tolerance):
+    """여러 간격 동시 조회 후 합류 구간 표 (실패 간격은 이름만)"""
+    zones, levels, errors = analyze_confluence(market, intervals, count,
+                                               fetch=get_candle_scheduler().get,
+                                               tolerance=tolerance)
+    return zones, levels, sorted(errors)
+
+def render_confluence():
+    """여러 간격의 지지/저항선을 한 표로 모아 보는 화면"""
+    with st.sidebar:
+        tickers = get_upbit_tickers()
+        coin_name = st.selectbox("📈 분석할 종목을 선택하세요", options=list(tickers.keys()), index=0)
+        intervals = st.multiselect(
+            "⏰ 함께 볼 간격",
+            options=['1분', '5분', '15분', '30분', '1시간', '4시간', '일봉', '주봉', '월봉'],
+            default=CONFLUENCE_INTERVALS
         )
-        fig.add_hline(y=70, line_dash="dash", line_color="red", row=3, col=1)
-        fig.add_hline(y=30, line_dash="dash", line_color="green", row=3, col=1)
-    
-    # 레이아웃 설정
-    fig.update_layout(
-        title="업비트 차트 분석",
-        xaxis_rangeslider_visible=False,
-        height=800,
-        showlegend=True,
-        template="plotly_white"
+        candle_count = st.slider("📊 간격별 캔들 개수", min_value=50, max_value=1000, value=200, step=50)
+        tolerance = st.slider("구간 폭(%)", min_value=0.1, max_value=2.0, value=0.5, step=0.1) / 100
+
+    market_code = tickers[coin_name]
+    st.markdown(f"## 🧭 멀티 타임프레임 합류 분석 ({market_code})")
+    st.caption("여러 간격이 같은 가격 구간을 지지/저항선으로 가리킬수록 점수가 높습니다.")
+
+    if not intervals:
+        st.info("사이드바에서 간격을 하나 이상 고르세요.")
+        return
+
+    with st.spinner(f"{len(intervals)}개 간격을 동시에 조회하는 중..."):
+        zones, levels, failed = get_confluence(market_code, tuple(intervals), candle_count, tolerance)
+
+    if failed:
+        st.warning(f"조회에 실패한 간격: {', '.join(failed)}")
+    if zones.empty:
+        st.error("합류 구간을 찾을 수 없습니다.")
+        return
+
+    st.dataframe(
+        zones,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            '가격': st.column_config.NumberColumn(format="%,.0f"),
+            '구간 하단': st.column_config.NumberColumn(format="%,.0f"),
+            '구간 상단': st.column_config.NumberColumn(format="%,.0f"),
+            '현재가 대비(%)': st.column_config.NumberColumn(format="%+.2f"),
+        }
     )
-    
-    return fig
+
+    with st.expander("간격별 레벨"):
+        for interval, items in levels.items():
+            text = ', '.join(f"{price:,.0f}({source})" for price, source in sorted(items))
+            st.markdown(f"**{interval}**: {text or '없음'}")
+
+# 관심 종목 시세판 (현재가 API 한 번에 여러 종목)
+@st.cache_data(ttl=2, show_spinner=False)
+def get_price_board(markets):
+    """관심 종목 현재가/24시간 통계 (세션 간 공유, 2초 캐시)"""
+    return price_board(markets)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_top_markets(limit):
+    """24시간 거래대금 상위 종목 {마켓코드: 한글명}"""
+    names, _ = top_markets('KRW', limit)
+    return names
+
+def render_price_board():
+    """관심 종목 시세판 화면 (짧은 주기로 표만 다시 그림)"""
+    with st.sidebar:
+        source = st.radio("📋 관심 종목", ['주요 종목', '거래대금 상위', '직접 선택'])
+        if source == '주요 종목':
+            names = {code: name for name, code in get_upbit_tickers().items()}
+        elif source == '거래대금 상위':
+            limit = st.slider("종목 수", min_value=10, max_value=100, value=30, step=10)
+            names = get_top_markets(limit)
+        else:
+            all_names = get_krw_markets()
+            chosen = st.multiselect("종목 선택", options=list(all_names),
+                                    default=list(get_upbit_tickers().values()),
+                                    format_func=lambda code: f"{all_names[code]} ({code})")
+            names = {code: all_names[code] for code in chosen}
+        refresh_seconds = st.slider("갱신 주기(초)", min_value=1, max_value=30, value=3)
+
+    st.markdown(f"## 💹 시세판 ({len(names)}종목)")
+    st.caption("현재가 API 한 번으로 모든 관심 종목을 갱신합니다. 거래량/거래대금은 최근 24시간 합계입니다.")
+    if not names:
+        st.info("사이드바에서 종목을 하나 이상 고르세요.")
+        return
+
+    @st.fragment(run_every=refresh_seconds)
+    def board():
+        try:
+            table = get_price_board(tuple(names))
+        except Exception as e:
+            st.error(f"현재가를 가져오는데 실패했습니다: {e}")
+            return
+        if table.empty:
+            st.info("현재가 응답이 비어 있습니다. 다음 갱신 때 다시 시도합니다.")
+            return
+        table.insert(1, '이름', table['종목'].map(names))
+        st.dataframe(
+            table,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                '현재가': st.column_config.NumberColumn(format="%,.2f"),
+                '전일 대비': st.column_config.NumberColumn(format="%+,.2f"),
+                '전일 대비(%)': st.column_config.NumberColumn(format="%+.2f"),
+                '고가': st.column_config.NumberColumn(format="%,.2f"),
+                '저가': st.column_config.NumberColumn(format="%,.2f"),
+                '24시간 거래량': st.column_config.NumberColumn(format="%,.2f"),
+                '24시간 거래대금': st.column_config.NumberColumn(format="%,.0f"),
+            }
+        )
+        st.caption(f"갱신: {pd.Timestamp.now(tz='Asia/Seoul'):%H:%M:%S}")
+
+    board()
+
+# 실시간 체결 스트림
+@st.cache_resource
+def get_trade_streams():
+    """종목별 체결 스트림 (프로세스 공유, 최근 16종목, 밀려난 스트림은 연결 종료)"""
+    return StreamPool(lambda market: TradeStream([market]).start(), max_entries=16)
+
+def get_trade_stream(market):
+    """종목 체결 스트림 (간격이 달라도 연결 하나를 같이 쓴다)"""
+    return get_trade_streams().get(market)
+
+@st.cache_resource
+def get_indicator_engines():
+    """(market, interval)별 증분 지표 엔진 (프로세스 공유)"""
+    return EngineRegistry()
+
+@st.cache_data(ttl=60)
+def get_indicator_candles(market, interval, count, generation=0):
+    """REST 캔들 + 일괄 계산한 지표 (캔들과 같은 주기로 캐시)"""
+    return calculate_technical_indicators(get_upbit_candles(market, interval, count))
+
+@recorder.timed('live_candles')
+def apply_live_candles(market, interval, count):
+    """체결 스트림 캔들을 REST 캔들에 덮어쓰고, 바뀐 꼬리 구간 지표만 증분 계산"""
+    df = get_indicator_candles(market, interval, count, fetch_generation(market, interval))
+    stream = get_trade_stream(market)
+    stream.seed(market, interval, df.iloc[-1])
+    merged = merge_live_candles(df, stream.candles(market, interval))
+    start = merged['candle_date_time_utc'].searchsorted(df['candle_date_time_utc'].iloc[-1])
+    engine = get_indicator_engines().get(market, interval)
+    return fill_indicator_tail(engine, merged, start)
 
 # 메인 애플리케이션
 def main():
+    recorder.start_run()
     # 헤더
     st.markdown("""
     <div class="main-header">
@@ -465,6 +475,19 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
+    with st.sidebar:
+        mode = st.radio("🧭 모드", ['차트 분석', '시세판', '멀티 타임프레임', '전체 시장 스캔'], horizontal=True)
+    
+    if mode == '전체 시장 스캔':
+        render_market_scanner()
+        return
+    if mode == '시세판':
+        render_price_board()
+        return
+    if mode == '멀티 타임프레임':
+        render_confluence()
+        return
+    
             # 사이드바
     with st.sidebar:
         st.markdown("## ⚙️ 분석 설정")
@@ -491,7 +514,12 @@ def main():
         )
         
         # 캔들 개수
-        candle_count = st.slider("📊 캔들 개수", min_value=50, max_value=500, value=200, step=50)
+        candle_count = st.slider("📊 캔들 개수", min_value=50, max_value=5000, value=200, step=50)
+        
+        local_resample = st.checkbox("🧮 1분봉에서 직접 만들기", value=False,
+                                     help="1분봉만 받아 상위 간격을 로컬에서 집계합니다. 간격을 바꿔도 다시 조회하지 않습니다.")
+        base_days = st.slider("1분봉 보관 기간(일)", min_value=1, max_value=30, value=7,
+                              disabled=not local_resample)
         
         st.markdown("---")
         
@@ -500,71 +528,99 @@ def main():
         
         show_support_resistance = st.checkbox("🛡️ 지지선/저항선", value=True)
         show_volume_profile = st.checkbox("📊 거래량 프로파일", value=True)
+        use_tick_profile = st.checkbox("🎯 체결 기반 프로파일", value=False, disabled=not show_volume_profile,
+                                       help="캔들 고가/저가로 추정하지 않고 최근 체결의 실제 가격별 체결량으로 "
+                                            "프로파일을 만들고 매수/매도 체결을 나눠 보여 줍니다.")
+        show_walls = st.checkbox("📚 호가 벽", value=False,
+                                 help="최근 호가 스냅샷 평균에서 잔량이 몰린 가격을 지지/저항선과 매매 신호에 더합니다.")
         
         st.markdown("### 📈 기술적 지표")
         indicators = st.multiselect(
             "표시할 지표를 선택하세요",
-            options=['MA5', 'MA20', 'MA60', 'MA120', '볼린저밴드', 'RSI'],
+            options=INDICATOR_CATALOG,
             default=['MA20', 'MA60', 'RSI']
         )
         
+        st.markdown("### ⚡ 실시간")
+        live_mode = st.checkbox("실시간 모드 (WebSocket 체결)", value=False)
+        refresh_seconds = st.slider("갱신 주기(초)", min_value=1, max_value=10, value=2, disabled=not live_mode)
+        if live_mode and live_stream.websocket is None:
+            st.warning("실시간 모드에는 websocket-client 패키지가 필요합니다.")
+            live_mode = False
+        
         # 새로고침 버튼
         if st.button("🔄 데이터 새로고침", type="primary"):
-            st.cache_data.clear()
+            # 선택한 종목/간격만 다시 조회 (다른 종목과 다른 사용자 캐시는 유지)
+            refresh_market(market_code, {interval, '1분'} if local_resample else {interval})
             st.rerun()
+        
+        show_diagnostics = st.checkbox("🩺 진단 패널", value=False,
+                                       help="단계별 소요 시간, 캐시 적중 여부, 응답 크기를 보여 주고 내보냅니다.")
     
     # 메인 컨텐츠
     if coin_name:
-        col1, col2, col3 = st.columns(3)
-        
         with st.spinner("데이터를 분석하는 중..."):
             # 데이터 로드
-            df = get_upbit_candles(market_code, interval, candle_count)
+            df = load_candles(market_code, interval, candle_count, local_resample, base_days)
+            if local_resample and len(df) < candle_count:
+                st.info(f"1분봉 {base_days}일치로 만든 {interval} 캔들은 {len(df)}개입니다.")
             
             if df.empty:
                 st.error("데이터를 불러올 수 없습니다.")
                 return
+            if len(df) < 20:
+                st.error(f"분석에 필요한 캔들이 부족합니다 ({len(df)}개). 1분봉 보관 기간을 늘려 보세요.")
+                return
             
-            # 기술적 지표 계산
-            df = calculate_technical_indicators(df)
+            # 기술적 지표 계산 (실시간 모드는 체결 캔들을 반영하고 바뀐 구간만 증분 계산)
+            if live_mode:
+                df = apply_live_candles(market_code, interval, candle_count)
+                # 증분 엔진이 채우지 않는 지표(EMA, MACD 등)만 전체 구간으로 계산
+                df = compute_indicators(df, indicators, reuse_existing=True)
+                fingerprint = frame_fingerprint(df)
+            else:
+                # 캔들 내용이 같으면 이전 실행의 지표 결과를 그대로 쓴다 (고른 지표와 분석용만 계산)
+                fingerprint = frame_fingerprint(df)
+                raw = df
+                df = cached_stage('indicators', market_code, interval, fingerprint, tuple(sorted(indicators)),
+                                  lambda: calculate_technical_indicators(raw.copy(), indicators), len(df))
             
-            # 지지선/저항선 계산
-            support_levels, resistance_levels = [], []
-            if show_support_resistance:
-                support_levels, resistance_levels = calculate_support_resistance(df)
+            # 호가 벽 (첫 실행은 스냅샷이 쌓이기 전이라 비어 있을 수 있음)
+            walls_df = None
+            if show_walls:
+                sampler = get_orderbook_sampler(market_code)
+                walls_df = sampler.walls(market_code)
             
-            # 거래량 프로파일 계산
-            volume_profile_df = pd.DataFrame()
-            if show_volume_profile:
-                volume_profile_df = calculate_volume_profile(df)
+            # 체결 기반 프로파일 (실시간 모드면 체결 스트림으로 이어서 갱신)
+            tick_profile = None
+            if show_volume_profile and use_tick_profile:
+                tick_profile = load_tick_profile(
+                    market_code, get_trade_stream(market_code) if live_mode else None)
             
-            # 매매 신호 계산
-            buy_signals, sell_signals, nearest_support, nearest_resistance = calculate_trade_signals(
-                df, support_levels, resistance_levels, volume_profile_df
+            # 지지선/저항선, 거래량 프로파일, 매매 신호 계산
+            (support_levels, resistance_levels, volume_profile_df,
+             buy_signals, sell_signals, nearest_support, nearest_resistance) = derive_analysis(
+                market_code, interval, df, fingerprint, show_support_resistance, show_volume_profile,
+                walls_df, tick_profile
             )
         
-        # 현재 가격 정보
         current_price = df.iloc[-1]['trade_price']
-        prev_price = df.iloc[-2]['trade_price'] if len(df) > 1 else current_price
-        price_change = current_price - prev_price
-        price_change_pct = (price_change / prev_price) * 100 if prev_price != 0 else 0
         
-        with col1:
-            st.metric("현재가", f"{current_price:,.0f}원", f"{price_change:+.0f}원 ({price_change_pct:+.2f}%)")
-        
-        with col2:
-            st.metric("24시간 거래량", f"{df.iloc[-1]['candle_acc_trade_volume']:,.0f}")
-        
-        with col3:
-            if not df['RSI'].isna().iloc[-1]:
-                rsi_value = df['RSI'].iloc[-1]
-                rsi_status = "과매수" if rsi_value > 70 else "과매도" if rsi_value < 30 else "중립"
-                st.metric("RSI", f"{rsi_value:.1f}", rsi_status)
-        
-        # 메인 차트
-        fig = create_main_chart(df, support_levels, resistance_levels, 
-                               show_volume_profile, volume_profile_df, indicators)
-        st.plotly_chart(fig, use_container_width=True)
+        # 메인 차트. 호가 벽이 바뀌면 같은 캔들이라도 레벨이 달라지므로 레벨도 키에 넣는다 (체결 프로파일은 체결 수)
+        chart_params = (tuple(support_levels), tuple(resistance_levels), show_volume_profile, tuple(indicators),
+                        None if tick_profile is None else tick_profile.total)
+        build_chart = lambda x_range: create_main_chart(df, support_levels, resistance_levels, show_volume_profile,
+                                                        volume_profile_df, indicators, x_range=x_range)
+        if live_mode:
+            # 지표 카드와 차트만 주기적으로 다시 그리고, 새 캔들이 생길 때만 전체를 다시 실행한다
+            render_live_panel(market_code, interval, candle_count, indicators, df, chart_params, build_chart,
+                              refresh_seconds)
+        else:
+            render_metrics(market_code, df)
+            x_range = select_x_range(df)
+            fig = cached_stage('main_chart', market_code, interval, fingerprint, chart_params + (x_range,),
+                               lambda: build_chart(x_range), len(df))
+            render_chart(fig, show_diagnostics)
         
         # 분석 정보
         col1, col2 = st.columns(2)
@@ -589,6 +645,16 @@ def main():
                 st.markdown("### 🎯 주요 저항선")
                 st.markdown("저항선을 찾을 수 없습니다.")
         
+        # 호가 벽 정보
+        if show_walls:
+            st.markdown("### 📚 호가 벽")
+            if walls_df.empty:
+                st.markdown("아직 눈에 띄는 호가 벽이 없습니다 (호가 스냅샷을 모으는 중일 수 있습니다).")
+            for wall in walls_df.itertuples():
+                side = "매수벽" if wall.side == 'bid' else "매도벽"
+                st.markdown(f"- **{side}** {wall.price:,.0f}원: 평균 잔량 {wall.size:,.2f} "
+                            f"(중앙값의 {wall.strength:.1f}배)")
+        
         # 거래량 프로파일 정보
         if show_volume_profile and not volume_profile_df.empty:
             st.markdown("### 📊 거래량 분석")
@@ -600,6 +666,16 @@ def main():
             
             st.info(f"🎯 **POC (최대 거래량 가격)**: {poc_price:,.0f}원 (거래량: {poc_volume:,.0f})")
             
+            if tick_profile is not None:
+                buy_total = volume_profile_df['buy_volume'].sum()
+                buy_ratio = buy_total / volume_profile_df['volume'].sum() * 100
+                st.markdown(f"**⚖️ 최근 체결 {tick_profile.size:,}건 기준** 매수 {buy_ratio:.1f}% / "
+                            f"매도 {100 - buy_ratio:.1f}%")
+            
+            # 밸류 에어리어 (거래량 70% 구간)
+            _, value_area_low, value_area_high = calculate_value_area(volume_profile_df)
+            st.markdown(f"**📦 밸류 에어리어 (거래량 70%)**: {value_area_low:,.0f}원 ~ {value_area_high:,.0f}원")
+            
             # 상위 거래량 구간
             top_volumes = volume_profile_df.nlargest(3, 'volume')
             st.markdown("**📈 거래량 상위 3구간:**")
@@ -638,6 +714,9 @@ def main():
                            'low_price', 'trade_price', 'candle_acc_trade_volume']].copy()
             display_df.columns = ['시간', '시가', '고가', '저가', '종가', '거래량']
             st.dataframe(display_df.tail(20), use_container_width=True)
+            # 전체 캔들과 계산한 지표 (여러 종목을 한꺼번에 저장하려면 export.py)
+            st.download_button("지표 포함 전체 CSV", df.to_csv(index=False).encode('utf-8-sig'),
+                               file_name=f"{market_code}_{interval}.csv", mime="text/csv")
         
         # 🎯 매매 추천 시스템
         st.markdown("---")
@@ -734,13 +813,111 @@ def main():
         
         else:
             st.warning("매매 신호를 계산하기에 데이터가 부족합니다. 더 많은 캔들 데이터가 필요합니다.")
+        
+        if show_diagnostics:
+            render_diagnostics()
 
-if __name__ == "__main__":
-    main()
+def render_metrics(market_code, df):
+    """현재가, 24시간 거래량, RSI 카드"""
+    col1, col2, col3 = st.columns(3)
+    current_price = df.iloc[-1]['trade_price']
+    prev_price = df.iloc[-2]['trade_price'] if len(df) > 1 else current_price
+    price_change = current_price - prev_price
+    price_change_pct = (price_change / prev_price) * 100 if prev_price != 0 else 0
+    
+    with col1:
+        st.metric("현재가", f"{current_price:,.0f}원", f"{price_change:+.0f}원 ({price_change_pct:+.2f}%)")
+    
+    with col2:
+        # 마지막 캔들 거래량이 아닌 현재가 API의 24시간 합계
+        try:
+            ticker = get_price_board((market_code,)).iloc[0]
+            st.metric("24시간 거래량", f"{ticker['24시간 거래량']:,.0f}",
+                      f"{ticker['전일 대비(%)']:+.2f}% (전일 대비)")
+        except Exception:
+            st.metric("마지막 캔들 거래량", f"{df.iloc[-1]['candle_acc_trade_volume']:,.0f}")
+    
+    with col3:
+        if not df['RSI'].isna().iloc[-1]:
+            rsi_value = df['RSI'].iloc[-1]
+            rsi_status = "과매수" if rsi_value > 70 else "과매도" if rsi_value < 30 else "중립"
+            st.metric("RSI", f"{rsi_value:.1f}", rsi_status)
+
+def select_x_range(df):
+    """캔들이 많으면 표시 구간 선택 (그 구간만 다시 집계해 확대 시 세부 표시)"""
+    if len(df) <= CHART_MAX_POINTS:
+        return None
+    first = df['candle_date_time_kst'].iloc[0].to_pydatetime()
+    last = df['candle_date_time_kst'].iloc[-1].to_pydatetime()
+    return st.slider("🔍 표시 구간", min_value=first, max_value=last, value=(first, last),
+                     format="YYYY-MM-DD HH:mm")
 
-# 사용법 안내
-st.markdown("---")
-st.markdown("""
+def render_chart(fig, show_diagnostics=False):
+    """메인 차트 출력 (진단 패널이 켜져 있으면 직렬화 크기도 계측)"""
+    if show_diagnostics:
+        # 직렬화 크기는 진단 패널을 켰을 때만 잰다 (전송 전 한 번 더 직렬화하는 비용)
+        with recorder.time('chart_serialize') as fields:
+            fields['bytes'] = len(fig.to_json())
+    with recorder.time('chart_render'):
+        st.plotly_chart(fig, use_container_width=True, key='main_chart')
+
+def render_live_panel(market_code, interval, candle_count, indicators, df, chart_params, build_chart,
+                      refresh_seconds):
+    """실시간 모드 지표 카드와 차트 (refresh_seconds마다 이 부분만 다시 실행)
+
+    그림은 (종목, 간격, 마지막 캔들, 차트 옵션, 표시 구간)마다 세션에 한 번
+    만들어 두고, 주기마다 진행 중인 캔들과 지표 끝값만 고친다. 새 캔들이
+    시작되면(직전 캔들 마감) 앱 전체를 다시 실행해 지지/저항선, 거래량
+    프로파일, 매매 신호를 새로 계산한다.
+    """
+    candle_key = df['candle_date_time_utc'].iloc[-1]
+    
+    @st.fragment(run_every=refresh_seconds)
+    def panel():
+        live_df = apply_live_candles(market_code, interval, candle_count)
+        if live_df['candle_date_time_utc'].iloc[-1] != candle_key:
+            st.rerun()
+        # 증분 엔진이 채우지 않는 지표(EMA, MACD 등)만 전체 구간으로 계산
+        live_df = compute_indicators(live_df, indicators, reuse_existing=True)
+        render_metrics(market_code, live_df)
+        x_range = select_x_range(df)
+        
+        key = (market_code, interval, candle_key, chart_params, x_range)
+        state = st.session_state.get('live_chart')
+        if state is None or state['key'] != key:
+            with recorder.time('chart_build', rows=len(df)):
+                state = st.session_state['live_chart'] = {'key': key, 'fig': build_chart(x_range)}
+        with recorder.time('chart_patch', rows=len(live_df)):
+            patch_last_candle(state['fig'], live_df, x_range)
+        render_chart(state['fig'])
+    
+    panel()
+
+def render_diagnostics():
+    """사이드바 진단 패널: 이번 실행의 단계별 기록과 프로세스 전체 p50/p99, 내보내기"""
+    with st.sidebar:
+        st.markdown("## 🩺 진단")
+        records = recorder.run_records()
+        if records:
+            st.markdown("**이번 실행**")
+            st.dataframe(pd.DataFrame(records).drop(columns=['time', 'run']).round(2),
+                         use_container_width=True, hide_index=True)
+        st.markdown("**누적 (단계별 최근 기록)**")
+        st.dataframe(pd.DataFrame(recorder.summary()).round(2), use_container_width=True, hide_index=True)
+        st.markdown("**캔들 스케줄러**")
+        stats = get_candle_scheduler().stats()
+        st.dataframe(pd.DataFrame([stats]).round(1), use_container_width=True, hide_index=True)
+        st.markdown("**파생 결과 캐시**")
+        st.dataframe(pd.DataFrame([get_derived_cache().stats()]), use_container_width=True, hide_index=True)
+        st.download_button("JSON Lines 내보내기", recorder.to_jsonl(),
+                           file_name="danta_metrics.jsonl", mime="application/jsonl")
+        st.download_button("Prometheus 형식 내보내기", recorder.to_prometheus(),
+                           file_name="danta_metrics.prom", mime="text/plain")
+
+def render_usage_guide():
+    """사용법 안내"""
+    st.markdown("---")
+    st.markdown("""
 ### 💡 사용법 가이드
 
 1. **종목 선택**: 좌측 사이드바에서 분석하고 싶은 암호화폐를 선택하세요.
@@ -756,5 +933,10 @@ st.markdown("""
 - **🎯 POC 분석**: 최대 거래량이 발생한 가격대 표시
 - **📋 종합 분석**: RSI 상태, 지지/저항 거리 등 핵심 정보 요약
 
-**🔄 데이터는 1분마다 자동 캐시되어 API 호출을 최적화합니다.**
+**🔄 캔들은 로컬 저장소에 보관되고, 1분마다 새로 생긴 캔들만 받아옵니다.**
 """)
+
+if __name__ == "__main__":
+    setup_page()
+    main()
+    render_usage_guide()
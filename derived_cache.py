@@ -0,0 +1,113 @@
+"""캔들 파생 결과 캐시 (지표, 지지/저항선, 거래량 프로파일, 차트)
+
+캔들 프레임 내용의 지문(fingerprint)과 계산 파라미터를 키로 결과를 보관한다.
+같은 데이터에서 체크박스나 지표 선택만 바뀐 재실행은 계산을 건너뛴다.
+추정 메모리 합계가 예산을 넘으면 오래 안 쓴 항목부터 버리고,
+(market, interval) 단위로 무효화할 수 있다.
+"""
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# 지문에 쓰는 컬럼 (파생 결과는 이 값들로만 결정된다)
+FINGERPRINT_COLUMNS = [
+    'candle_date_time_utc',
+    'opening_price',
+    'high_price',
+    'low_price',
+    'trade_price',
+    'candle_acc_trade_volume'
+]
+
+
+def frame_fingerprint(df):
+    """캔들 프레임 내용 지문 (행 순서와 값이 같으면 같은 문자열)"""
+    columns = [column for column in FINGERPRINT_COLUMNS if column in df.columns]
+    hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+
+
+def estimate_size(value):
+    """결과 객체의 대략적인 메모리 크기 (바이트)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if hasattr(value, 'to_plotly_json'):
+        # plotly Figure: 트레이스 배열이 대부분을 차지한다
+        return estimate_size(value.to_plotly_json())
+    return sys.getsizeof(value)
+
+
+class DerivedCache:
+    """내용 지문 키 LRU 캐시 (메모리 예산, 스레드 안전)
+
+    키는 (market, interval, kind, 지문, params). 값은 여러 실행이 같이 쓰므로
+    꺼낸 쪽에서 수정하면 안 된다.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, market, interval, kind, fingerprint, params, compute):
+        """캐시에 있으면 그 값을, 없으면 compute()를 실행해 저장하고 반환"""
+        key = (market, interval, kind, fingerprint, params)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+
+        # 계산은 락 밖에서 (같은 키를 동시에 계산하면 나중 결과로 덮어쓴다)
+        value = compute()
+        size = estimate_size(value)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            if size <= self.max_bytes:
+                self.entries[key] = (value, size)
+                self.total_bytes += size
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+
+    def invalidate(self, market, interval=None):
+        """market (interval을 주면 그 간격만)의 항목 삭제, 지운 개수 반환"""
+        with self.lock:
+            keys = [key for key in self.entries
+                    if key[0] == market and (interval is None or key[1] == interval)]
+            for key in keys:
+                self.total_bytes -= self.entries.pop(key)[1]
+            return len(keys)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -0,0 +1,316 @@
+"""분석 결과 일괄 내보내기 (Parquet/JSON 스냅샷)
+
+여러 종목 × 간격의 전체 분석(지표, 지지/저항선, 거래량 프로파일, 매매 신호)을
+프로세스 풀에서 돌려 표마다 고정 스키마 파일로 저장한다. 다른 작업이나
+대시보드는 Streamlit을 다시 돌리지 않고 이 파일을 읽으면 된다.
+
+    out/
+      manifest.json                       종목/간격별 캔들 지문과 요약, 마지막 실행 통계
+      summary.parquet                     종목/간격별 요약 한 줄씩
+      candles/days/KRW-BTC.parquet        캔들 + 지표 전체 (CATALOG)
+      levels/days/KRW-BTC.parquet         지지/저항선, POC, 밸류 에어리어
+      volume_profile/days/KRW-BTC.parquet
+      signals/days/KRW-BTC.parquet        추천 매수/매도가
+
+manifest의 캔들 지문과 같은 종목/간격은 다시 분석하지 않는다 (증분 내보내기).
+manifest가 가리키지 않는 파일(형식을 바꾸기 전 파일 등)은 실행 끝에 지운다.
+--every를 주면 그 주기로 계속 다시 내보낸다. Parquet은 pyarrow가 있어야 하고,
+없으면 JSON으로 저장한다.
+
+    python export.py KRW-BTC KRW-ETH -i 1시간 일봉 -o out
+    python export.py --all --limit 50 -i 15분 1시간 --store -o out --every 300
+    df = load_table('out', 'signals', interval='1시간')
+"""
+import argparse
+import functools
+import glob
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from analysis import analyze
+from batch import MIN_CANDLES, map_markets
+from derived_cache import frame_fingerprint
+from indicator_pipeline import CATALOG, compute_indicators, expand
+from upbit_api import INTERVAL_ENDPOINTS, fetch_candles, fetch_markets
+
+try:
+    import pyarrow
+except ImportError:  # 선택 의존성
+    pyarrow = None
+
+SCHEMA_VERSION = 1
+DEFAULT_FORMAT = 'parquet' if pyarrow is not None else 'json'
+EXTENSIONS = {'parquet': '.parquet', 'json': '.json'}
+
+_KEYS = {'market': 'object', 'interval': 'object'}
+_CANDLE_FIELDS = {
+    'candle_date_time_utc': 'object',
+    'candle_date_time_kst': 'datetime64[ns]',
+    'opening_price': 'float64',
+    'high_price': 'float64',
+    'low_price': 'float64',
+    'trade_price': 'float64',
+    'candle_acc_trade_price': 'float64',
+    'candle_acc_trade_volume': 'float64'
+}
+
+# 표 이름 -> {컬럼: dtype}. 컬럼 순서와 타입은 SCHEMA_VERSION 안에서 바뀌지 않는다.
+SCHEMAS = {
+    'candles': dict(_KEYS, **_CANDLE_FIELDS, **{column: 'float64' for column in expand(CATALOG)}),
+    'levels': dict(_KEYS, kind='object', price='float64'),
+    'volume_profile': dict(_KEYS, price='float64', volume='float64'),
+    'signals': dict(_KEYS, side='object', rank='int64', reason='object', price='float64', strength='object'),
+    'summary': dict(_KEYS, time='object', rows='int64', current_price='float64', rsi='float64',
+                    nearest_support='float64', nearest_resistance='float64', poc_price='float64',
+                    value_area_low='float64', value_area_high='float64', best_buy='float64',
+                    best_sell='float64', fingerprint='object', exported_at='object')
+}
+
+
+def conform(df, table):
+    """표를 스키마 컬럼 순서와 타입으로 맞춘다 (없는 컬럼은 빈 값)"""
+    return df.reindex(columns=list(SCHEMAS[table])).astype(SCHEMAS[table])
+
+
+def table_path(out_dir, table, market, interval, fmt=DEFAULT_FORMAT):
+    """표 파일 경로 (간격은 API 경로 이름을 디렉터리로: 1시간 → minutes60)"""
+    slug = INTERVAL_ENDPOINTS[interval].replace('/', '')
+    return os.path.join(out_dir, table, slug, market + EXTENSIONS[fmt])
+
+
+def write_table(df, path, fmt=DEFAULT_FORMAT):
+    """임시 파일에 쓴 뒤 바꿔치기 (읽는 쪽이 반쯤 쓴 파일을 보지 않게)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    if fmt == 'parquet':
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_json(tmp, orient='records', date_format='iso', force_ascii=False)
+    os.replace(tmp, path)
+
+
+def read_table(path, table):
+    if path.endswith(EXTENSIONS['parquet']):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_json(path, orient='records', dtype=False, convert_dates=False)
+        if 'candle_date_time_kst' in df:
+            df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
+    return conform(df, table)
+
+
+def load_table(out_dir, table, interval=None, market=None):
+    """내보낸 표 읽기 (interval/market을 주지 않으면 전부 합침)
+
+    manifest에 있는 종목/간격의 manifest 형식 파일만 읽는다. 형식을 바꾸기 전에
+    남은 파일이나 manifest에 없는 파일은 무시한다.
+    """
+    manifest = _read_manifest(out_dir)
+    fmt = manifest.get('format')
+    if fmt not in EXTENSIONS:
+        return conform(pd.DataFrame(), table)
+    if table == 'summary':
+        paths = [os.path.join(out_dir, 'summary' + EXTENSIONS[fmt])]
+    else:
+        paths = [table_path(out_dir, table, entry['market'], entry['interval'], fmt)
+                 for entry in manifest.get('entries', {}).values()
+                 if interval in (None, entry['interval']) and market in (None, entry['market'])]
+    frames = []
+    for path in sorted(paths):
+        try:
+            frames.append(read_table(path, table))
+        except FileNotFoundError:  # 다음 실행이 정리한 파일
+            continue
+    if not frames:
+        return conform(pd.DataFrame(), table)
+    return pd.concat(frames, ignore_index=True)
+
+
+def analysis_tables(result):
+    """AnalysisResult → {표 이름: 스키마에 맞춘 표}"""
+    keys = {'market': result.market, 'interval': result.interval}
+    candles = compute_indicators(result.candles, CATALOG, reuse_existing=True)
+
+    levels = [('support', price) for price in result.support_levels]
+    levels += [('resistance', price) for price in result.resistance_levels]
+    levels += [(kind, value) for kind, value in (('poc', result.poc_price),
+                                                 ('value_area_low', result.value_area_low),
+                                                 ('value_area_high', result.value_area_high))
+               if value is not None]
+
+    signals = [('buy', rank, reason, price, strength)
+               for rank, (reason, price, strength) in enumerate(result.buy_signals)]
+    signals += [('sell', rank, reason, price, strength)
+                for rank, (reason, price, strength) in enumerate(result.sell_signals)]
+
+    return {
+        'candles': conform(candles.assign(**keys), 'candles'),
+        'levels': conform(pd.DataFrame(levels, columns=['kind', 'price']).assign(**keys), 'levels'),
+        'volume_profile': conform(result.volume_profile.assign(**keys), 'volume_profile'),
+        'signals': conform(pd.DataFrame(signals, columns=['side', 'rank', 'reason', 'price', 'strength'])
+                           .assign(**keys), 'signals')
+    }
+
+
+def summary_row(result, fingerprint):
+    """manifest와 summary 표에 남기는 종목/간격 요약 한 줄"""
+    row = result.to_dict()
+    for name in ('volume_profile', 'support_levels', 'resistance_levels', 'buy_signals', 'sell_signals'):
+        row.pop(name)
+    row.update({
+        'rows': len(result.candles),
+        'best_buy': float(result.buy_signals[0][1]) if result.buy_signals else None,
+        'best_sell': float(result.sell_signals[0][1]) if result.sell_signals else None,
+        'fingerprint': fingerprint,
+        'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    })
+    return row
+
+
+def export_one(df, market, interval, out_dir, fmt=DEFAULT_FORMAT):
+    """한 종목/간격 전체 분석 후 표 파일 저장 (프로세스 풀에서 실행), 요약 반환"""
+    if len(df) < MIN_CANDLES:
+        return None
+    fingerprint = frame_fingerprint(df)
+    result = analyze(df, market, interval)
+    for table, frame in analysis_tables(result).items():
+        write_table(frame, table_path(out_dir, table, market, interval, fmt), fmt)
+    return summary_row(result, fingerprint)
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_manifest(out_dir, fmt):
+    """이전 manifest (스키마 버전이나 형식이 다르면 빈 manifest)"""
+    manifest = _read_manifest(out_dir)
+    if manifest.get('schema_version') != SCHEMA_VERSION or manifest.get('format') != fmt:
+        manifest = {}
+    return {'schema_version': SCHEMA_VERSION, 'format': fmt, 'entries': manifest.get('entries', {})}
+
+
+def prune(out_dir, manifest):
+    """manifest 항목이 가리키지 않는 표 파일 삭제 (형식을 바꾸기 전 파일, 빠진 종목), 삭제 수 반환"""
+    fmt = manifest['format']
+    keep = {os.path.join(out_dir, 'summary' + EXTENSIONS[fmt])}
+    for entry in manifest['entries'].values():
+        keep.update(table_path(out_dir, table, entry['market'], entry['interval'], fmt)
+                    for table in SCHEMAS if table != 'summary')
+
+    paths = [os.path.join(out_dir, 'summary' + ext) for ext in EXTENSIONS.values()]
+    for table in SCHEMAS:
+        paths += glob.glob(os.path.join(out_dir, table, '*', '*'))
+    removed = 0
+    for path in paths:
+        if path.endswith(tuple(EXTENSIONS.values())) and path not in keep and os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def _entry_key(market, interval):
+    return f"{market}/{interval}"
+
+
+def export_markets(markets, intervals, count, out_dir, fmt=DEFAULT_FORMAT, fetch=fetch_candles,
+                   full=False, max_workers=None):
+    """종목 × 간격 분석 결과 내보내기 (캔들이 바뀐 것만), manifest 반환
+
+    manifest['stats']에 이번 실행의 내보냄/변화 없음/실패 수를 남긴다.
+    """
+    manifest = load_manifest(out_dir, fmt)
+    entries = {} if full else manifest['entries']
+    func = functools.partial(export_one, out_dir=out_dir, fmt=fmt)
+    exported, unchanged, errors = 0, 0, {}
+
+    for interval in intervals:
+        def skip(df, market):
+            entry = entries.get(_entry_key(market, interval))
+            return entry is not None and entry['fingerprint'] == frame_fingerprint(df)
+
+        results, failed = map_markets(markets, interval, count, func, fetch=fetch,
+                                      max_workers=max_workers, skip=skip)
+        for market in markets:
+            row = results.get(market)
+            if row is not None:
+                entries[_entry_key(market, interval)] = row
+                exported += 1
+            elif market not in failed and _entry_key(market, interval) in entries:
+                unchanged += 1
+        errors.update({_entry_key(market, interval): str(e) for market, e in failed.items()})
+
+    manifest.update({
+        'entries': entries,
+        'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'errors': errors,
+        'stats': {'exported': exported, 'unchanged': unchanged, 'failed': len(errors)}
+    })
+    summary = conform(pd.DataFrame(list(entries.values())), 'summary')
+    write_table(summary, os.path.join(out_dir, 'summary' + EXTENSIONS[fmt]), fmt)
+    path = os.path.join(out_dir, 'manifest.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + '.tmp', path)
+    # 새 manifest를 쓴 뒤에 지워야 읽는 쪽이 지운 파일을 가리키는 manifest를 보지 않는다
+    prune(out_dir, manifest)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="업비트 분석 결과 일괄 내보내기 (Parquet/JSON)")
+    parser.add_argument('markets', nargs='*', help="내보낼 마켓 코드 (예: KRW-BTC)")
+    parser.add_argument('--all', action='store_true', help="원화 마켓 전체")
+    parser.add_argument('--limit', type=int, default=None, help="--all 사용 시 앞에서부터 N개만")
+    parser.add_argument('-i', '--interval', nargs='+', default=['일봉'], choices=list(INTERVAL_ENDPOINTS))
+    parser.add_argument('-n', '--count', type=int, default=200, help="캔들 개수")
+    parser.add_argument('-o', '--output', default='export', help="출력 디렉터리")
+    parser.add_argument('--format', choices=list(EXTENSIONS), default=DEFAULT_FORMAT)
+    parser.add_argument('--full', action='store_true', help="캔들이 그대로여도 전부 다시 내보냄")
+    parser.add_argument('--store', action='store_true', help="로컬 캔들 저장소를 거쳐 증분 조회")
+    parser.add_argument('--every', type=float, default=None, metavar='SECONDS',
+                        help="이 주기(초)로 계속 다시 내보냄 (바뀐 종목만)")
+    parser.add_argument('--workers', type=int, default=None, help="분석 프로세스 수")
+    args = parser.parse_args(argv)
+
+    if args.format == 'parquet' and pyarrow is None:
+        parser.error("Parquet 형식에는 pyarrow 패키지가 필요합니다 (--format json 사용 가능).")
+
+    markets = args.markets
+    if args.all:
+        markets = [m['market'] for m in fetch_markets('KRW')][:args.limit]
+    if not markets:
+        parser.error("마켓 코드를 주거나 --all을 지정하세요.")
+
+    fetch = fetch_candles
+    if args.store:
+        from candle_store import CandleStore
+        fetch = CandleStore().get_candles
+
+    full = args.full
+    while True:
+        started = time.perf_counter()
+        manifest = export_markets(markets, args.interval, args.count, args.output, args.format,
+                                  fetch=fetch, full=full, max_workers=args.workers)
+        stats = manifest['stats']
+        print(f"{stats['exported']}개 내보냄, {stats['unchanged']}개 변화 없음, {stats['failed']}개 실패 "
+              f"({time.perf_counter() - started:.1f}초) → {args.output}", file=sys.stderr)
+        if args.every is None:
+            return 1 if stats['failed'] and not manifest['entries'] else 0
+        full = False
+        try:
+            time.sleep(max(0, args.every - (time.perf_counter() - started)))
+        except KeyboardInterrupt:
+            return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
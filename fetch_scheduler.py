@@ -0,0 +1,204 @@
+"""캔들 조회 공유 스케줄러 (만료 전 미리 갱신)
+
+(market, interval, count) 키별로 마지막 조회 결과를 프로세스 전체에서 공유한다.
+백그라운드 스레드가 최근에 쓰인 키(와 관심 종목 목록)를 ttl이 끝나기
+refresh_ahead초 전에 다시 받아 두므로, 페이지 요청은 만료 시점에도 API를
+기다리지 않는다. 갱신 중이거나 갱신이 늦어지면 max_stale초까지는 직전
+결과를 그대로 준다 (stale-while-revalidate). 같은 키의 동시 요청은 진행
+중인 조회 하나를 같이 기다린다. API 호출 수는 사용자 수가 아니라 서로 다른
+키 수에 비례한다.
+
+    scheduler = FetchScheduler(fetch_candles).start()
+    scheduler.warm([('KRW-BTC', '일봉', 200)])
+    df = scheduler.get('KRW-BTC', '일봉', 200)
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import recorder
+
+DEFAULT_TTL = 60            # 조회 결과 유효 시간(초)
+DEFAULT_REFRESH_AHEAD = 10  # 만료 몇 초 전에 미리 갱신할지
+DEFAULT_MAX_STALE = 600     # 만료 후에도 갱신을 기다리지 않고 줄 수 있는 최대 나이(초)
+DEFAULT_HOT_SECONDS = 300   # 이 시간 안에 쓰인 키만 미리 갱신
+DEFAULT_IDLE_SECONDS = 1800  # 이 시간 동안 안 쓰인 키는 삭제 (관심 종목 제외)
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_WORKERS = 4
+POLL_SECONDS = 1.0          # 갱신 대상 검사 주기
+RETRY_SECONDS = 10          # 미리 갱신이 실패한 키를 다시 시도하기까지 간격
+
+
+def parse_watchlist(text, default_interval='일봉', default_count=200):
+    """'KRW-BTC:1시간:500,KRW-ETH' 형식 → [(market, interval, count)]"""
+    keys = []
+    for item in text.split(','):
+        parts = [part.strip() for part in item.split(':')]
+        if not parts[0]:
+            continue
+        interval = parts[1] if len(parts) > 1 and parts[1] else default_interval
+        count = int(parts[2]) if len(parts) > 2 and parts[2] else default_count
+        keys.append((parts[0], interval, count))
+    return keys
+
+
+class _Entry:
+    def __init__(self):
+        self.value = None
+        self.fetched_at = None   # 마지막 조회 성공 시각 (monotonic)
+        self.accessed_at = time.monotonic()
+        self.pinned = False      # 관심 종목: 안 쓰여도 계속 갱신
+        self.future = None       # 진행 중인 조회
+        self.error = None        # 마지막 조회 실패
+        self.failed_at = None
+
+
+class FetchScheduler:
+    """(market, interval, count) 키별 공유 조회 결과와 만료 전 갱신 스레드
+
+    fetch(market, interval, count)는 여러 스레드에서 불린다. 반환값은 여러
+    사용자가 같이 쓰므로 꺼낸 쪽에서 수정하면 안 된다.
+    """
+
+    def __init__(self, fetch, ttl=DEFAULT_TTL, refresh_ahead=DEFAULT_REFRESH_AHEAD,
+                 max_stale=DEFAULT_MAX_STALE, hot_seconds=DEFAULT_HOT_SECONDS,
+                 idle_seconds=DEFAULT_IDLE_SECONDS, max_entries=DEFAULT_MAX_ENTRIES,
+                 workers=DEFAULT_WORKERS):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.max_stale = max_stale
+        self.hot_seconds = hot_seconds
+        self.idle_seconds = idle_seconds
+        self.max_entries = max_entries
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.counts = {'fresh': 0, 'stale': 0, 'miss': 0, 'coalesced': 0,
+                       'fetches': 0, 'refreshes': 0, 'errors': 0}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch-scheduler')
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._pool.shutdown(wait=False)
+
+    def get(self, market, interval, count):
+        """공유 조회 결과 반환 (없거나 너무 오래됐으면 조회를 기다림)"""
+        key = (market, interval, count)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = _Entry()
+                self._evict(now)
+            entry.accessed_at = now
+            age = None if entry.fetched_at is None else now - entry.fetched_at
+            if age is not None and age < self.ttl:
+                self.counts['fresh'] += 1
+                return entry.value
+            if age is not None and age < self.max_stale:
+                # 만료됐지만 기다리지 않고 직전 결과를 주고 뒤에서 갱신
+                self.counts['stale'] += 1
+                self._submit(key, entry)
+                return entry.value
+            self.counts['coalesced' if entry.future is not None else 'miss'] += 1
+            future = self._submit(key, entry)
+
+        recorder.note(cache='miss')
+        return future.result()
+
+    def warm(self, keys):
+        """관심 종목 키를 고정하고 바로 조회 시작 (기다리지 않음)"""
+        with self.lock:
+            for key in keys:
+                key = tuple(key)
+                entry = self.entries.get(key)
+                if entry is None:
+                    entry = self.entries[key] = _Entry()
+                entry.pinned = True
+                self._submit(key, entry)
+
+    def invalidate(self, market, interval=None):
+        """market (interval을 주면 그 간격만)의 결과를 버려 다음 get이 새로 조회하게 함"""
+        with self.lock:
+            keys = [key for key in self.entries
+                    if key[0] == market and (interval is None or key[1] == interval)]
+            for key in keys:
+                self.entries[key].fetched_at = None
+            return len(keys)
+
+    def _submit(self, key, entry):
+        """key 조회 시작 (이미 진행 중이면 그 조회를 반환). self.lock 안에서 호출"""
+        if entry.future is None:
+            self.counts['fetches'] += 1
+            entry.future = self._pool.submit(self._fetch, key, entry)
+        return entry.future
+
+    def _fetch(self, key, entry):
+        market, interval, count = key
+        try:
+            with recorder.time('scheduled_fetch', market=market, interval=interval) as fields:
+                value = self.fetch(market, interval, count)
+                fields['rows'] = len(value)
+        except Exception as e:
+            with self.lock:
+                self.counts['errors'] += 1
+                entry.error = e
+                entry.failed_at = time.monotonic()
+                entry.future = None
+            raise
+        with self.lock:
+            entry.value = value
+            entry.fetched_at = time.monotonic()
+            entry.error = None
+            entry.future = None
+        return value
+
+    def _due(self, now):
+        """만료가 가까운 최근 사용/관심 종목 키 (self.lock 안에서 호출)"""
+        return [
+            (key, entry) for key, entry in self.entries.items()
+            if entry.future is None and entry.fetched_at is not None
+            and now - entry.fetched_at >= self.ttl - self.refresh_ahead
+            and (entry.pinned or now - entry.accessed_at < self.hot_seconds)
+            and (entry.error is None or now - entry.failed_at >= RETRY_SECONDS)
+        ]
+
+    def _evict(self, now):
+        """오래 안 쓰인 키 삭제, 그래도 많으면 가장 오래 안 쓰인 키부터 (self.lock 안에서 호출)"""
+        idle = [key for key, entry in self.entries.items()
+                if not entry.pinned and entry.future is None and now - entry.accessed_at > self.idle_seconds]
+        for key in idle:
+            del self.entries[key]
+        excess = len(self.entries) - self.max_entries
+        if excess > 0:
+            candidates = sorted((entry.accessed_at, key) for key, entry in self.entries.items()
+                                if not entry.pinned and entry.future is None)
+            for _, key in candidates[:excess]:
+                del self.entries[key]
+
+    def _run(self):
+        while not self._stopped.wait(POLL_SECONDS):
+            now = time.monotonic()
+            with self.lock:
+                for key, entry in self._due(now):
+                    self.counts['refreshes'] += 1
+                    self._submit(key, entry)
+                self._evict(now)
+
+    def stats(self):
+        now = time.monotonic()
+        with self.lock:
+            stats = dict(self.counts)
+            stats['entries'] = len(self.entries)
+            stats['pinned'] = sum(entry.pinned for entry in self.entries.values())
+            stats['in_flight'] = sum(entry.future is not None for entry in self.entries.values())
+            stats['failing'] = sum(entry.error is not None for entry in self.entries.values())
+            stats['max_age'] = max((now - entry.fetched_at for entry in self.entries.values()
+                                    if entry.fetched_at is not None), default=0.0)
+        return stats
@@ -0,0 +1,197 @@
+"""의존성 기반 기술적 지표 파이프라인
+
+지표와 중간값(이동 합, EMA, 상승/하락폭 등)을 이름 붙은 노드로 등록하고, 각
+노드가 입력 노드를 선언한다. compute_indicators()는 고른 지표와 그 입력만
+한 번씩 계산한다. MA20과 볼린저 밴드 중심선은 같은 20기간 이동 합을, MACD와
+EMA12/26은 같은 EMA를 공유한다. 모든 노드는 pandas/NumPy 벡터 연산이다.
+
+    df = compute_indicators(df, ['MA20', 'MACD', 'ATR'])
+"""
+import numpy as np
+import pandas as pd
+
+# 노드 이름 -> (입력 노드 이름들, 계산 함수(ctx) -> Series)
+NODES = {}
+
+# 화면에서 고르는 이름 -> 프레임에 추가되는 컬럼
+ALIASES = {
+    '볼린저밴드': ['BB_middle', 'BB_upper', 'BB_lower'],
+    'MACD': ['MACD', 'MACD_signal', 'MACD_hist'],
+    '스토캐스틱': ['STOCH_K', 'STOCH_D'],
+    'RSI(Wilder)': ['RSI_wilder']
+}
+
+# 화면에서 고를 수 있는 지표
+CATALOG = ['MA5', 'MA20', 'MA60', 'MA120', 'EMA12', 'EMA20', 'EMA26', 'EMA50', '볼린저밴드',
+           'RSI', 'RSI(Wilder)', 'MACD', 'ATR', '스토캐스틱']
+
+# calculate_technical_indicators 기본 계산 목록 (기존 컬럼 전체)
+DEFAULT_INDICATORS = ['MA5', 'MA20', 'MA60', 'MA120', 'RSI', '볼린저밴드']
+
+# 지지/저항선과 매매 신호 계산이 읽는 컬럼 (항상 계산)
+ANALYSIS_REQUIRES = ['MA20', 'MA60', 'RSI']
+
+MA_WINDOWS = (5, 20, 60, 120)
+EMA_SPANS = (12, 20, 26, 50)
+RSI_WINDOW = 14
+BB_WINDOW = 20
+BB_K = 2
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+ATR_WINDOW = 14
+STOCH_WINDOW, STOCH_SMOOTH = 14, 3
+
+
+def node(name, *inputs):
+    """계산 함수를 name 노드로 등록하는 데코레이터"""
+    def register(func):
+        NODES[name] = (inputs, func)
+        return func
+    return register
+
+
+# 기본 입력
+node('close')(lambda ctx: ctx['df']['trade_price'])
+node('high')(lambda ctx: ctx['df']['high_price'])
+node('low')(lambda ctx: ctx['df']['low_price'])
+
+
+@node('delta', 'close')
+def _delta(ctx):
+    return ctx['close'].diff()
+
+
+@node('gain', 'delta')
+def _gain(ctx):
+    return ctx['delta'].where(ctx['delta'] > 0, 0)
+
+
+@node('loss', 'delta')
+def _loss(ctx):
+    return -ctx['delta'].where(ctx['delta'] < 0, 0)
+
+
+def _register_windows():
+    """기간별 노드 등록 (이동 합 → 이동평균, EMA)"""
+    for window in set(MA_WINDOWS) | {BB_WINDOW}:
+        node(f'sum_{window}', 'close')(
+            lambda ctx, w=window: ctx['close'].rolling(window=w).sum())
+        node(f'MA{window}', f'sum_{window}')(
+            lambda ctx, w=window: ctx[f'sum_{w}'] / w)
+    for span in EMA_SPANS:
+        node(f'EMA{span}', 'close')(
+            lambda ctx, s=span: ctx['close'].ewm(span=s, adjust=False).mean())
+
+
+_register_windows()
+
+
+# RSI (기존 방식: 14기간 단순 평균)
+@node('RSI', 'gain', 'loss')
+def _rsi(ctx):
+    gain = ctx['gain'].rolling(window=RSI_WINDOW).mean()
+    loss = ctx['loss'].rolling(window=RSI_WINDOW).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+# RSI (Wilder 평활: alpha = 1/14 지수 평균)
+@node('RSI_wilder', 'gain', 'loss')
+def _rsi_wilder(ctx):
+    alpha = 1 / RSI_WINDOW
+    gain = ctx['gain'].ewm(alpha=alpha, adjust=False, min_periods=RSI_WINDOW).mean()
+    loss = ctx['loss'].ewm(alpha=alpha, adjust=False, min_periods=RSI_WINDOW).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+# 볼린저 밴드 (중심선은 MA20과 같은 이동 합 사용)
+@node('std_20', 'close')
+def _std_20(ctx):
+    return ctx['close'].rolling(window=BB_WINDOW).std()
+
+
+node('BB_middle', f'MA{BB_WINDOW}')(lambda ctx: ctx[f'MA{BB_WINDOW}'])
+node('BB_upper', 'BB_middle', 'std_20')(lambda ctx: ctx['BB_middle'] + ctx['std_20'] * BB_K)
+node('BB_lower', 'BB_middle', 'std_20')(lambda ctx: ctx['BB_middle'] - ctx['std_20'] * BB_K)
+
+
+# MACD (EMA12 - EMA26, 시그널 EMA9)
+node('MACD', f'EMA{MACD_FAST}', f'EMA{MACD_SLOW}')(
+    lambda ctx: ctx[f'EMA{MACD_FAST}'] - ctx[f'EMA{MACD_SLOW}'])
+node('MACD_signal', 'MACD')(lambda ctx: ctx['MACD'].ewm(span=MACD_SIGNAL, adjust=False).mean())
+node('MACD_hist', 'MACD', 'MACD_signal')(lambda ctx: ctx['MACD'] - ctx['MACD_signal'])
+
+
+# ATR (진폭 = max(고가-저가, |고가-전 종가|, |저가-전 종가|), Wilder 평활)
+@node('true_range', 'high', 'low', 'close')
+def _true_range(ctx):
+    prev_close = ctx['close'].shift()
+    return pd.concat([
+        ctx['high'] - ctx['low'],
+        (ctx['high'] - prev_close).abs(),
+        (ctx['low'] - prev_close).abs()
+    ], axis=1).max(axis=1)
+
+
+@node('ATR', 'true_range')
+def _atr(ctx):
+    return ctx['true_range'].ewm(alpha=1 / ATR_WINDOW, adjust=False, min_periods=ATR_WINDOW).mean()
+
+
+# 스토캐스틱 (%K 14기간, %D = %K 3기간 평균)
+@node('STOCH_K', 'high', 'low', 'close')
+def _stoch_k(ctx):
+    highest = ctx['high'].rolling(window=STOCH_WINDOW).max()
+    lowest = ctx['low'].rolling(window=STOCH_WINDOW).min()
+    return (ctx['close'] - lowest) / (highest - lowest).replace(0, np.nan) * 100
+
+
+node('STOCH_D', 'STOCH_K')(lambda ctx: ctx['STOCH_K'].rolling(window=STOCH_SMOOTH).mean())
+
+
+def expand(selected):
+    """화면 이름/컬럼 이름 목록 → 계산할 컬럼 이름 목록 (순서 유지, 중복 제거)"""
+    columns = []
+    for name in selected:
+        for column in ALIASES.get(name, [name]):
+            if column not in NODES:
+                raise KeyError(f"알 수 없는 지표: {name}")
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def plan(columns, known=()):
+    """columns를 계산하는 데 필요한 노드를 의존 순서대로 (known 노드와 그 입력은 제외)"""
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order or name in known:
+            return
+        if name in visiting:
+            raise ValueError(f"지표 의존성 순환: {name}")
+        visiting.add(name)
+        for dependency in NODES[name][0]:
+            visit(dependency)
+        visiting.discard(name)
+        order.append(name)
+
+    for column in columns:
+        visit(column)
+    return order
+
+
+def compute_indicators(df, selected, required=ANALYSIS_REQUIRES, reuse_existing=False):
+    """selected(+required) 지표 컬럼을 df에 추가해 반환 (df를 직접 수정)
+
+    reuse_existing=True면 df에 이미 있는 지표 컬럼은 다시 계산하지 않고 입력으로
+    쓴다 (증분 계산으로 채운 실시간 캔들에 추가 지표만 붙일 때).
+    """
+    columns = expand(list(required) + list(selected))
+    ctx = {'df': df}
+    if reuse_existing:
+        ctx.update({name: df[name] for name in columns if name in df.columns})
+    for name in plan(columns, known=set(ctx)):
+        ctx[name] = NODES[name][1](ctx)
+    for name in columns:
+        df[name] = ctx[name]
+    return df
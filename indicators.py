@@ -0,0 +1,215 @@
+"""증분(스트리밍) 기술적 지표 엔진
+
+calculate_technical_indicators와 같은 MA5/20/60/120, RSI(14), 볼린저 밴드(20, 2σ)를
+새 캔들이나 수정된 마지막 캔들 하나당 O(1)로 갱신한다.
+
+일괄 계산과의 차이는 반올림 수준이다. MA, RSI, BB_middle은 상대 오차 1e-12
+이내이고, 볼린저 밴드 폭(2σ)은 합/제곱합으로 구한 표준편차가 pandas 롤링
+계산과 달라 σ 기준 상대 오차 1e-7 이내다 (tests/test_indicators.py).
+"""
+import math
+import threading
+from collections import OrderedDict, deque
+
+MA_WINDOWS = (5, 20, 60, 120)
+RSI_WINDOW = 14
+BB_WINDOW = 20
+BB_K = 2
+
+INDICATOR_COLUMNS = ['MA5', 'MA20', 'MA60', 'MA120', 'RSI', 'BB_middle', 'BB_upper', 'BB_lower']
+
+# 일괄 계산과 같은 값을 내는 데 필요한 최소 과거 캔들 수
+WARMUP = max(max(MA_WINDOWS), BB_WINDOW, RSI_WINDOW + 1)
+
+
+class RollingWindow:
+    """고정 길이 창의 합/제곱합 유지 (마지막 값 교체 지원)
+
+    큰 가격(원화 BTC 등)에서 제곱합 상쇄 오차를 줄이려고 첫 값을 기준점으로
+    빼서 누적하고, 창 크기만큼 갱신할 때마다 합을 다시 계산해 오차 누적을 막는다.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.ref = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nonzero = 0
+        self.updates = 0
+
+    def _add(self, x, sign):
+        d = x - self.ref
+        self.total += sign * d
+        self.total_sq += sign * d * d
+        self.nonzero += sign * (x != 0)
+
+    def _resync(self):
+        self.ref = self.values[0]
+        ds = [x - self.ref for x in self.values]
+        self.total = math.fsum(ds)
+        self.total_sq = math.fsum(d * d for d in ds)
+        self.updates = 0
+
+    def push(self, x):
+        if self.ref is None:
+            self.ref = x
+        if len(self.values) == self.size:
+            self._add(self.values[0], -1)
+        self.values.append(x)
+        self._add(x, 1)
+        self._tick()
+
+    def replace_last(self, x):
+        self._add(self.values[-1], -1)
+        self.values[-1] = x
+        self._add(x, 1)
+        self._tick()
+
+    def _tick(self):
+        self.updates += 1
+        if self.updates >= self.size:
+            self._resync()
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        if not self.full:
+            return math.nan
+        if self.nonzero == 0:
+            return 0.0
+        return self.ref + self.total / self.size
+
+    def std(self):
+        """표본 표준편차 (ddof=1, pandas rolling std와 동일)"""
+        if not self.full:
+            return math.nan
+        n = self.size
+        var = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return math.sqrt(max(var, 0.0))
+
+
+class IndicatorEngine:
+    """한 (market, interval)의 지표 상태
+
+    update(ts, close)는 ts가 마지막 캔들과 같으면 그 캔들을 수정하고,
+    더 새로우면 새 캔들로 추가한다. 계산한 값은 최근 history_size개를 보관한다.
+    """
+
+    def __init__(self, history_size=500):
+        self.history_size = history_size
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.last_ts = None
+        self.prev_close = None
+        self.last_close = None
+        self.ma = {w: RollingWindow(w) for w in MA_WINDOWS}
+        self.gains = RollingWindow(RSI_WINDOW)
+        self.losses = RollingWindow(RSI_WINDOW)
+        self.history = OrderedDict()
+
+    def _delta_parts(self, close):
+        # 첫 캔들은 diff가 NaN이고, 일괄 계산의 where(...)가 이를 0으로 바꾼다
+        if self.prev_close is None:
+            return 0.0, 0.0
+        delta = close - self.prev_close
+        return max(delta, 0.0), max(-delta, 0.0)
+
+    def update(self, ts, close):
+        """캔들 하나 반영 후 그 캔들의 지표 값 반환"""
+        if self.last_ts is not None and ts < self.last_ts:
+            return self.history.get(ts)
+
+        if ts == self.last_ts:
+            gain, loss = self._delta_parts(close)
+            for window in self.ma.values():
+                window.replace_last(close)
+            self.gains.replace_last(gain)
+            self.losses.replace_last(loss)
+        else:
+            self.prev_close = self.last_close
+            gain, loss = self._delta_parts(close)
+            for window in self.ma.values():
+                window.push(close)
+            self.gains.push(gain)
+            self.losses.push(loss)
+            self.last_ts = ts
+        self.last_close = close
+
+        values = self.values()
+        self.history[ts] = values
+        self.history.move_to_end(ts)
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+        return values
+
+    def values(self):
+        """현재 마지막 캔들의 지표 값"""
+        values = {f'MA{w}': window.mean() for w, window in self.ma.items()}
+
+        if self.gains.full:
+            gain, loss = self.gains.mean(), self.losses.mean()
+            if loss == 0:
+                values['RSI'] = math.nan if gain == 0 else 100.0
+            else:
+                values['RSI'] = 100 - (100 / (1 + gain / loss))
+        else:
+            values['RSI'] = math.nan
+
+        bb = self.ma[BB_WINDOW]
+        values['BB_middle'] = bb.mean()
+        values['BB_upper'] = values['BB_middle'] + bb.std() * BB_K
+        values['BB_lower'] = values['BB_middle'] - bb.std() * BB_K
+        return values
+
+    def seed(self, timestamps, closes):
+        """과거 캔들로 상태 재구성 (마지막 WARMUP개만 있으면 된다)"""
+        self.reset()
+        timestamps, closes = list(timestamps)[-WARMUP:], list(closes)[-WARMUP:]
+        for ts, close in zip(timestamps, closes):
+            self.update(ts, close)
+
+
+class EngineRegistry:
+    """(market, interval)별 지표 엔진 모음 (스레드 안전)"""
+
+    def __init__(self):
+        self.engines = {}
+        self.lock = threading.Lock()
+
+    def get(self, market, interval):
+        with self.lock:
+            key = (market, interval)
+            if key not in self.engines:
+                self.engines[key] = IndicatorEngine()
+            return self.engines[key]
+
+
+def fill_indicator_tail(engine, df, start):
+    """df의 start 행부터 지표 열을 증분 계산으로 채운다
+
+    start 이전 행은 이미 지표가 계산되어 있어야 한다. 엔진 상태가 start 직전
+    캔들과 이어지지 않으면 그 앞 구간으로 다시 초기화한다.
+    """
+    ts = df['candle_date_time_utc'].tolist()
+    closes = df['trade_price'].tolist()
+
+    with engine.lock:
+        if engine.last_ts is None or (start > 0 and engine.last_ts < ts[start - 1]):
+            engine.seed(ts[:start], closes[:start])
+
+        rows = []
+        for i in range(start, len(df)):
+            values = engine.update(ts[i], closes[i])
+            if values is None:
+                engine.seed(ts[:i], closes[:i])
+                values = engine.update(ts[i], closes[i])
+            rows.append(values)
+
+    for column in INDICATOR_COLUMNS:
+        df.loc[df.index[start:], column] = [row[column] for row in rows]
+    return df
@@ -0,0 +1,247 @@
+"""업비트 WebSocket 체결 스트림으로 현재 캔들을 로컬에서 만드는 모듈
+
+websocket-client 패키지가 있어야 스트림을 열 수 있다. 캔들 집계
+(CandleBuilder)는 패키지 없이도 쓸 수 있다.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+import pandas as pd
+
+try:
+    import websocket
+except ImportError:  # 선택 의존성
+    websocket = None
+
+WS_URL = "wss://api.upbit.com/websocket/v1"
+
+KST_OFFSET = pd.Timedelta(hours=9)
+_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+CANDLE_COLUMNS = [
+    'candle_date_time_utc',
+    'candle_date_time_kst',
+    'opening_price',
+    'high_price',
+    'low_price',
+    'trade_price',
+    'candle_acc_trade_price',
+    'candle_acc_trade_volume'
+]
+
+# 분봉 간격(분). 일/주/월봉은 UTC 00:00 기준 (KST 09:00, 업비트와 동일)
+INTERVAL_MINUTES = {
+    '1분': 1,
+    '5분': 5,
+    '15분': 15,
+    '30분': 30,
+    '1시간': 60,
+    '4시간': 240
+}
+
+
+def candle_start(ts_ms, interval):
+    """체결 시각(ms)이 속한 캔들 시작 시각(UTC Timestamp)"""
+    ts = pd.Timestamp(ts_ms, unit='ms')
+    if interval in INTERVAL_MINUTES:
+        return ts.floor(f"{INTERVAL_MINUTES[interval]}min")
+    if interval == '일봉':
+        return ts.floor('D')
+    if interval == '주봉':
+        return ts.floor('D') - pd.Timedelta(days=ts.dayofweek)
+    if interval == '월봉':
+        return ts.floor('D').replace(day=1)
+    raise ValueError(f"지원하지 않는 간격: {interval}")
+
+
+class CandleBuilder:
+    """체결을 받아 한 종목의 캔들을 만든다 (최근 max_candles개만 보관)"""
+
+    def __init__(self, interval, max_candles=500):
+        self.interval = interval
+        self.closed = deque(maxlen=max_candles)
+        self.current = None
+
+    def _new_candle(self, start, price):
+        return {
+            'candle_date_time_utc': start.strftime(_TIME_FORMAT),
+            'candle_date_time_kst': start + KST_OFFSET,
+            'opening_price': price,
+            'high_price': price,
+            'low_price': price,
+            'trade_price': price,
+            'candle_acc_trade_price': 0.0,
+            'candle_acc_trade_volume': 0.0
+        }
+
+    def seed(self, row):
+        """REST로 받은 마지막 캔들로 현재 캔들 초기화 (더 새 캔들이 있으면 무시)"""
+        if self.current is not None and row['candle_date_time_utc'] <= self.current['candle_date_time_utc']:
+            return
+        self.current = {key: row[key] for key in CANDLE_COLUMNS}
+
+    def add_trade(self, price, volume, ts_ms):
+        """체결 한 건 반영. 새 캔들이 시작되면 직전 캔들을 마감한다."""
+        start = candle_start(ts_ms, self.interval)
+        key = start.strftime(_TIME_FORMAT)
+
+        if self.current is None or key > self.current['candle_date_time_utc']:
+            if self.current is not None:
+                self.closed.append(self.current)
+            self.current = self._new_candle(start, price)
+        elif key < self.current['candle_date_time_utc']:
+            return  # 이미 마감된 캔들의 늦은 체결
+
+        candle = self.current
+        candle['high_price'] = max(candle['high_price'], price)
+        candle['low_price'] = min(candle['low_price'], price)
+        candle['trade_price'] = price
+        candle['candle_acc_trade_price'] += price * volume
+        candle['candle_acc_trade_volume'] += volume
+
+    def to_frame(self):
+        rows = list(self.closed)
+        if self.current is not None:
+            rows.append(dict(self.current))
+        return pd.DataFrame(rows)
+
+
+def merge_live_candles(df, live_df):
+    """REST 캔들에 실시간 캔들 덮어쓰기 (같은 시각은 교체, 새 캔들은 추가)"""
+    if live_df.empty:
+        return df
+    if df.empty:
+        return live_df
+    live_df = live_df[live_df['candle_date_time_utc'] >= df['candle_date_time_utc'].iloc[-1]]
+    kept = df[~df['candle_date_time_utc'].isin(live_df['candle_date_time_utc'])]
+    merged = pd.concat([kept, live_df[[c for c in df.columns if c in live_df.columns]]],
+                       ignore_index=True)
+    return merged.sort_values('candle_date_time_utc').reset_index(drop=True)
+
+
+class TradeStream:
+    """종목별 체결 스트림 구독 스레드 (종목마다 연결 하나를 모든 간격이 같이 쓴다)
+
+    간격별 캔들은 candles(market, interval)를 처음 부를 때 만들기 시작한다.
+    연결이 끊기면 백오프 후 다시 연결한다. url을 바꾸면 녹화된 메시지를
+    재생하는 로컬 서버에도 붙일 수 있다.
+    """
+
+    def __init__(self, markets, url=WS_URL, max_candles=500):
+        if websocket is None:
+            raise ImportError("실시간 모드에는 websocket-client 패키지가 필요합니다.")
+        self.markets = list(markets)
+        self.url = url
+        self.max_candles = max_candles
+        self.builders = {m: {} for m in self.markets}  # 종목 → {간격: CandleBuilder}
+        self.lock = threading.Lock()
+        self.last_message = None
+        self.listeners = []  # 체결 메시지(dict)를 받는 함수 (예: TickProfile.on_trade)
+        self._app = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """연결을 닫고 재연결을 멈춘다 (수신 스레드는 늦어도 ping_timeout 안에 끝난다)"""
+        self._stopped.set()
+        if self._app is not None:
+            self._app.close()
+
+    def _subscribe(self, app):
+        app.send(json.dumps([
+            {'ticket': str(uuid.uuid4())},
+            {'type': 'trade', 'codes': self.markets},
+            {'format': 'DEFAULT'}
+        ]))
+
+    def handle_message(self, message):
+        """체결 메시지 한 건 처리 (스냅샷은 REST 캔들에 이미 반영되어 무시)"""
+        data = json.loads(message)
+        if data.get('type') != 'trade' or data.get('stream_type') == 'SNAPSHOT':
+            return
+        builders = self.builders.get(data['code'])
+        if builders is None:
+            return
+        with self.lock:
+            for builder in builders.values():
+                builder.add_trade(data['trade_price'], data['trade_volume'], data['trade_timestamp'])
+            self.last_message = time.time()
+        for listener in self.listeners:
+            listener(data)
+
+    def _run(self):
+        backoff = 1
+        while not self._stopped.is_set():
+            self._app = websocket.WebSocketApp(
+                self.url,
+                on_open=self._subscribe,
+                on_message=lambda app, message: self.handle_message(message)
+            )
+            started = time.time()
+            self._app.run_forever(ping_interval=60, ping_timeout=10)
+            if self._stopped.is_set():
+                break
+            # 오래 유지된 연결이 끊긴 경우는 바로 재연결
+            backoff = 1 if time.time() - started > 60 else min(backoff * 2, 30)
+            self._stopped.wait(backoff)
+
+    def _builder(self, market, interval):
+        """(market, interval) 캔들 빌더 (self.lock 안에서 호출, 없으면 만든다)"""
+        builders = self.builders[market]
+        if interval not in builders:
+            builders[interval] = CandleBuilder(interval, self.max_candles)
+        return builders[interval]
+
+    def seed(self, market, interval, row):
+        with self.lock:
+            self._builder(market, interval).seed(row)
+
+    def candles(self, market, interval):
+        """지금까지 만든 캔들 (마지막 행은 진행 중인 캔들)"""
+        with self.lock:
+            return self._builder(market, interval).to_frame()
+
+
+class StreamPool:
+    """키별 백그라운드 스레드 객체를 최대 max_entries개 보관 (스레드 안전)
+
+    가장 오래 안 쓰인 객체부터 밀려나며, 밀려난 객체는 stop()으로 연결과
+    스레드를 정리한다.
+
+        pool = StreamPool(lambda market: TradeStream([market]).start())
+        stream = pool.get('KRW-BTC')
+    """
+
+    def __init__(self, create, max_entries=16):
+        self.create = create
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, *key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.entries[key] = entry = self.create(*key)
+            evicted = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False)[1])
+        for old in evicted:
+            old.stop()
+        return entry
+
+    def close(self):
+        """보관 중인 객체를 모두 멈추고 비운다"""
+        with self.lock:
+            entries = list(self.entries.values())
+            self.entries.clear()
+        for entry in entries:
+            entry.stop()
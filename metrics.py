@@ -0,0 +1,164 @@
+"""단계별 실행 시간 계측
+
+조회, 지표/레벨/프로파일 계산, 차트 생성 같은 단계를 `recorder.time(stage)`로
+감싸면 소요 시간과 처리 행 수, 응답 크기, 캐시 적중 여부를 단계별 고정 길이
+버퍼에 남긴다. 요약(p50/p99)과 JSON Lines, Prometheus 텍스트 형식으로 내보낼 수
+있다. Prometheus의 _sum/_count와 캐시 카운터는 버퍼와 별도로 프로세스 시작
+이후 누적값을 쓰므로 줄어들지 않는다. 기록은 프로세스 전체에서 공유되고,
+같은 스레드의 한 실행(run) 단위로 묶어 볼 수 있다.
+
+    with recorder.time('volume_profile', rows=len(df)):
+        profile = calculate_volume_profile(df)
+"""
+import functools
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+DEFAULT_MAX_RECORDS = 1000  # 단계별 보관 기록 수
+
+
+class Recorder:
+    """단계별 계측 기록 (스레드 안전)"""
+
+    def __init__(self, max_records=DEFAULT_MAX_RECORDS):
+        self.max_records = max_records
+        self.records = {}
+        self.totals = {}  # 단계별 누적 {'count', 'seconds', 'hit', 'miss'} (버퍼와 달리 줄지 않음)
+        self.lock = threading.Lock()
+        self._runs = itertools.count(1)
+        self._local = threading.local()
+
+    def start_run(self):
+        """이 스레드의 이후 기록을 새 실행 번호로 묶는다"""
+        self._local.run = next(self._runs)
+        return self._local.run
+
+    @property
+    def current_run(self):
+        return getattr(self._local, 'run', None)
+
+    def add(self, stage, ms, **fields):
+        record = {'stage': stage, 'time': time.time(), 'run': self.current_run, 'ms': ms}
+        record.update(fields)
+        with self.lock:
+            if stage not in self.records:
+                self.records[stage] = deque(maxlen=self.max_records)
+            self.records[stage].append(record)
+            totals = self.totals.get(stage)
+            if totals is None:
+                totals = self.totals[stage] = {'count': 0, 'seconds': 0.0, 'hit': 0, 'miss': 0}
+            totals['count'] += 1
+            totals['seconds'] += ms / 1000
+            if fields.get('cache') in ('hit', 'miss'):
+                totals[fields['cache']] += 1
+        return record
+
+    @contextmanager
+    def time(self, stage, **fields):
+        """블록 실행 시간 기록. 넘겨받은 dict에 rows, bytes, cache 등을 채울 수 있다."""
+        stack = self._local.__dict__.setdefault('stack', [])
+        stack.append(fields)
+        started = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            stack.pop()
+            self.add(stage, (time.perf_counter() - started) * 1000, **fields)
+
+    def note(self, **fields):
+        """이 스레드에서 진행 중인 가장 안쪽 time() 블록 기록에 값 추가
+
+        캐시된 함수 본문에서 note(cache='miss')를 부르면 바깥 호출 쪽 기록에
+        캐시 실패가 남는다. 진행 중인 블록이 없으면 무시한다.
+        """
+        stack = getattr(self._local, 'stack', None)
+        if stack:
+            stack[-1].update(fields)
+
+    def timed(self, stage):
+        """함수 호출 시간을 기록하는 데코레이터"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def all_records(self):
+        with self.lock:
+            return [record for records in self.records.values() for record in records]
+
+    def run_records(self, run=None):
+        """한 실행(기본: 이 스레드의 현재 실행)의 기록, 시간순"""
+        run = self.current_run if run is None else run
+        return sorted((r for r in self.all_records() if r['run'] == run), key=lambda r: r['time'])
+
+    def summary(self):
+        """단계별 횟수, p50/p99/평균(ms), 캐시 적중/실패 수"""
+        with self.lock:
+            snapshot = {stage: list(records) for stage, records in self.records.items()}
+        rows = []
+        for stage, records in sorted(snapshot.items()):
+            ms = np.array([r['ms'] for r in records])
+            cache = [r.get('cache') for r in records]
+            rows.append({
+                'stage': stage,
+                'count': len(records),
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p99_ms': float(np.percentile(ms, 99)),
+                'mean_ms': float(ms.mean()),
+                'hits': cache.count('hit'),
+                'misses': cache.count('miss')
+            })
+        return rows
+
+    def to_jsonl(self):
+        """전체 기록을 JSON Lines로"""
+        return ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n'
+                       for record in sorted(self.all_records(), key=lambda r: r['time']))
+
+    def to_prometheus(self, prefix='danta'):
+        """Prometheus 텍스트 노출 형식
+
+        분위수는 최근 버퍼 기준이고, _sum/_count와 캐시 카운터는 프로세스
+        누적값이라 rate()/increase()에 그대로 쓸 수 있다.
+        """
+        lines = [
+            f'# HELP {prefix}_stage_seconds Stage latency (quantiles over the recent window).',
+            f'# TYPE {prefix}_stage_seconds summary'
+        ]
+        cache_lines = []
+        with self.lock:
+            snapshot = {stage: list(records) for stage, records in self.records.items()}
+            totals = {stage: dict(values) for stage, values in self.totals.items()}
+        for stage, values in sorted(totals.items()):
+            records = snapshot.get(stage)
+            if records:
+                seconds = np.array([r['ms'] for r in records]) / 1000
+                for quantile in (0.5, 0.9, 0.99):
+                    value = np.percentile(seconds, quantile * 100)
+                    lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {values["seconds"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {values["count"]}')
+            for result in ('hit', 'miss'):
+                if values[result]:
+                    cache_lines.append(f'{prefix}_cache_total{{stage="{stage}",result="{result}"}} {values[result]}')
+        if cache_lines:
+            lines += [f'# HELP {prefix}_cache_total Cache lookups since process start.',
+                      f'# TYPE {prefix}_cache_total counter'] + cache_lines
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        """보관 기록만 비운다 (Prometheus 누적값은 유지)"""
+        with self.lock:
+            self.records.clear()
+
+
+recorder = Recorder()
@@ -0,0 +1,169 @@
+"""호가 잔량 분석 (유동성 벽 탐지)
+
+`/v1/orderbook` 스냅샷을 주기적으로 받아 호가(가격 단위)별 매수/매도 잔량을
+모으고, 최근 window개 스냅샷 평균 잔량이 같은 쪽 중앙값보다 크게 쌓인 곳을
+호가 벽으로 본다. 평균은 호가마다 그 가격이 호가창에 보였던 스냅샷끼리만 내므로
+가격이 잠깐 스쳐 간 호가의 잔량이 작게 희석되지 않는다. 구간 폭은 최신
+호가창의 호가 단위(bucket_ticks개)로 정해 가격대가 바뀌어도 15단 호가가 여러
+구간에 나뉜다. 스냅샷은 종목마다 deque(maxlen=window)에 호가와 잔량 배열만
+보관해 오래 돌려도 메모리가 늘지 않는다.
+
+    sampler = OrderbookSampler(['KRW-BTC', 'KRW-ETH']).start()
+    walls_df = sampler.walls('KRW-BTC')
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from upbit_api import fetch_orderbooks
+
+DEFAULT_WINDOW = 60        # 평균 낼 스냅샷 수
+DEFAULT_PERIOD = 1.0       # 스냅샷 주기(초)
+DEFAULT_BUCKET_TICKS = 1   # 가격 구간 폭: 최신 호가창 호가 단위의 몇 배
+WALL_THRESHOLD = 3.0       # 구간 잔량이 같은 쪽 중앙값의 몇 배 이상이면 벽
+MAX_WALLS = 5              # 쪽마다 보고할 최대 벽 수
+
+
+def orderbook_arrays(orderbook):
+    """호가 스냅샷 → (매수 호가, 매수 잔량, 매도 호가, 매도 잔량) 배열"""
+    units = orderbook['orderbook_units']
+    n = len(units)
+    return (
+        np.fromiter((u['bid_price'] for u in units), dtype=float, count=n),
+        np.fromiter((u['bid_size'] for u in units), dtype=float, count=n),
+        np.fromiter((u['ask_price'] for u in units), dtype=float, count=n),
+        np.fromiter((u['ask_size'] for u in units), dtype=float, count=n)
+    )
+
+
+def tick_size(prices):
+    """호가창 가격들의 가장 작은 간격 (호가 단위, 한 단씩뿐이면 스프레드)"""
+    steps = np.diff(np.unique(prices))
+    return steps.min() if len(steps) else None
+
+
+def _level_means(prices, sizes):
+    """호가별 평균 잔량: 그 호가가 보인 스냅샷 수로만 나눈다 (한 스냅샷에 호가는 한 번)"""
+    levels, inverse, counts = np.unique(prices, return_inverse=True, return_counts=True)
+    return levels, np.bincount(inverse, weights=sizes) / counts
+
+
+class DepthWindow:
+    """한 종목의 최근 window개 호가 스냅샷을 호가(가격 구간)별로 모은다"""
+
+    def __init__(self, window=DEFAULT_WINDOW, bucket_ticks=DEFAULT_BUCKET_TICKS):
+        self.bucket_ticks = bucket_ticks
+        self.tick = None  # 최신 호가창의 호가 단위
+        self.snapshots = deque(maxlen=window)
+
+    def add(self, orderbook):
+        bid_price, bid_size, ask_price, ask_size = orderbook_arrays(orderbook)
+        if not len(bid_price) or not len(ask_price):
+            return
+        self.tick = tick_size(np.concatenate([bid_price, ask_price]))
+        self.snapshots.append((bid_price, bid_size, ask_price, ask_size))
+
+    def depth(self):
+        """구간별 평균 잔량 표 (price, bid_size, ask_size), 가격 오름차순
+
+        price는 구간에 든 호가들의 가운데 (bucket_ticks=1이면 호가 그대로).
+        """
+        if not self.snapshots:
+            return pd.DataFrame(columns=['price', 'bid_size', 'ask_size'])
+
+        bid_price, bid_size, ask_price, ask_size = (np.concatenate(part) for part in zip(*self.snapshots))
+        width = self.tick * self.bucket_ticks
+        sides = []
+        for prices, sizes in ((bid_price, bid_size), (ask_price, ask_size)):
+            levels, means = _level_means(prices, sizes)
+            # 호가 단위 배수인 가격을 나누면 정수 근처가 되므로 반올림 후 구간으로 묶는다
+            sides.append((np.round(levels / self.tick).astype(np.int64) // self.bucket_ticks, means))
+
+        buckets, inverse = np.unique(np.concatenate([sides[0][0], sides[1][0]]), return_inverse=True)
+        n_bid = len(sides[0][0])
+        bids = np.bincount(inverse[:n_bid], weights=sides[0][1], minlength=len(buckets))
+        asks = np.bincount(inverse[n_bid:], weights=sides[1][1], minlength=len(buckets))
+        return pd.DataFrame({
+            'price': buckets * width + (self.bucket_ticks - 1) / 2 * self.tick,
+            'bid_size': bids,
+            'ask_size': asks
+        })
+
+
+def detect_walls(depth_df, threshold=WALL_THRESHOLD, max_walls=MAX_WALLS):
+    """구간 잔량이 같은 쪽 중앙값의 threshold배 이상인 호가 벽
+
+    반환: price, side('bid'/'ask'), size, strength(중앙값 대비 배수) 표, 강도 내림차순
+    """
+    walls = []
+    for side in ('bid', 'ask'):
+        sizes = depth_df[f'{side}_size'].to_numpy()
+        prices = depth_df['price'].to_numpy()
+        nonzero = sizes > 0
+        if nonzero.sum() < 3:
+            continue
+        strength = sizes / np.median(sizes[nonzero])
+        picked = np.flatnonzero(strength >= threshold)
+        picked = picked[np.argsort(strength[picked])[::-1][:max_walls]]
+        walls.append(pd.DataFrame({
+            'price': prices[picked],
+            'side': side,
+            'size': sizes[picked],
+            'strength': strength[picked]
+        }))
+
+    if not walls:
+        return pd.DataFrame(columns=['price', 'side', 'size', 'strength'])
+    return pd.concat(walls, ignore_index=True).sort_values('strength', ascending=False).reset_index(drop=True)
+
+
+class OrderbookSampler:
+    """여러 종목 호가를 한 요청으로 주기적으로 받아 DepthWindow에 쌓는 스레드"""
+
+    def __init__(self, markets, period=DEFAULT_PERIOD, window=DEFAULT_WINDOW,
+                 bucket_ticks=DEFAULT_BUCKET_TICKS):
+        self.markets = list(markets)
+        self.period = period
+        self.windows = {m: DepthWindow(window, bucket_ticks) for m in self.markets}
+        self.lock = threading.Lock()
+        self.last_update = None
+        self.last_error = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def sample(self):
+        """스냅샷 한 번 받아 반영"""
+        orderbooks = fetch_orderbooks(self.markets)
+        with self.lock:
+            for orderbook in orderbooks:
+                window = self.windows.get(orderbook['market'])
+                if window is not None:
+                    window.add(orderbook)
+            self.last_update = time.time()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+                self.last_error = None
+            except Exception as e:  # 네트워크 오류는 다음 주기에 다시 시도
+                self.last_error = e
+            self._stopped.wait(max(0, self.period - (time.monotonic() - started)))
+
+    def depth(self, market):
+        with self.lock:
+            return self.windows[market].depth()
+
+    def walls(self, market, threshold=WALL_THRESHOLD):
+        return detect_walls(self.depth(market), threshold)
@@ -0,0 +1,52 @@
+"""관심 종목 시세판
+
+현재가 API(`/v1/ticker?markets=...`) 한 번으로 여러 종목의 현재가, 전일 대비,
+24시간 거래량/거래대금을 받아 표로 만든다. 종목 수와 관계없이 갱신 한 번에
+요청 한 번 (MAX_TICKER_MARKETS개 이하일 때).
+"""
+import pandas as pd
+
+from upbit_api import fetch_markets, fetch_tickers
+
+# 시세판 컬럼 -> 현재가 API 필드
+BOARD_FIELDS = {
+    '현재가': 'trade_price',
+    '전일 대비': 'signed_change_price',
+    '고가': 'high_price',
+    '저가': 'low_price',
+    '24시간 거래량': 'acc_trade_volume_24h',
+    '24시간 거래대금': 'acc_trade_price_24h'
+}
+
+
+def ticker_frame(tickers, names=None):
+    """현재가 API 응답 → 시세판 표 (요청한 종목 순서 유지)"""
+    if not tickers:
+        return pd.DataFrame()
+    rows = []
+    for ticker in tickers:
+        row = {'종목': ticker['market']}
+        if names is not None:
+            row['이름'] = names.get(ticker['market'])
+        row.update({column: ticker.get(field) for column, field in BOARD_FIELDS.items()})
+        row['전일 대비(%)'] = ticker.get('signed_change_rate', 0) * 100
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def price_board(markets, names=None):
+    """관심 종목 시세판 (요청 1회)"""
+    return ticker_frame(fetch_tickers(markets), names)
+
+
+def top_markets(quote='KRW', limit=20):
+    """24시간 거래대금 상위 limit개 마켓 (마켓 목록 1회 + 현재가 1회 요청)
+
+    반환: ({마켓코드: 한글명}, 시세판 표). 시세판은 거래대금 내림차순이다.
+    """
+    names = {m['market']: m['korean_name'] for m in fetch_markets(quote)}
+    board = price_board(list(names), names)
+    if board.empty:
+        return {}, board
+    board = board.sort_values('24시간 거래대금', ascending=False).head(limit).reset_index(drop=True)
+    return {market: names[market] for market in board['종목']}, board
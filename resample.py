@@ -0,0 +1,151 @@
+"""1분봉 하나로 상위 간격 캔들 만들기
+
+5분~4시간봉은 UTC 기준 N분 경계, 일/주/월봉은 UTC 00:00 (KST 09:00) 경계로
+묶는다. 업비트 캔들과 같은 기준이라 API로 받은 캔들과 시각이 일치한다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from live_stream import CANDLE_COLUMNS, INTERVAL_MINUTES, KST_OFFSET
+
+_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def bucket_starts(utc, interval):
+    """UTC 시각 배열(datetime64)이 속한 캔들 시작 시각"""
+    times = pd.DatetimeIndex(utc)
+    if interval in INTERVAL_MINUTES:
+        return times.floor(f"{INTERVAL_MINUTES[interval]}min")
+    days = times.floor('D')
+    if interval == '일봉':
+        return days
+    if interval == '주봉':
+        return days - pd.to_timedelta(days.dayofweek, unit='D')
+    if interval == '월봉':
+        return days - pd.to_timedelta(days.day - 1, unit='D')
+    raise ValueError(f"지원하지 않는 간격: {interval}")
+
+
+def bucket_end(start, interval):
+    """start에 시작하는 캔들의 끝 시각 (다음 캔들 시작)"""
+    if interval in INTERVAL_MINUTES:
+        return start + pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+    if interval == '일봉':
+        return start + pd.Timedelta(days=1)
+    if interval == '주봉':
+        return start + pd.Timedelta(weeks=1)
+    if interval == '월봉':
+        return start + pd.offsets.MonthBegin(1)
+    raise ValueError(f"지원하지 않는 간격: {interval}")
+
+
+def resample_candles(base_df, interval):
+    """시간순 1분봉을 interval 캔들로 집계 (group-by 대신 경계 인덱스 + reduceat)"""
+    if base_df.empty or interval == '1분':
+        return base_df[CANDLE_COLUMNS].reset_index(drop=True)
+
+    utc = pd.to_datetime(base_df['candle_date_time_utc'], format=_TIME_FORMAT).to_numpy()
+    starts = bucket_starts(utc, interval)
+    keys = starts.asi8
+    first = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    last = np.append(first[1:], len(keys)) - 1
+    bucket = starts[first]
+
+    return pd.DataFrame({
+        'candle_date_time_utc': bucket.strftime(_TIME_FORMAT),
+        'candle_date_time_kst': bucket + KST_OFFSET,
+        'opening_price': base_df['opening_price'].to_numpy()[first],
+        'high_price': np.maximum.reduceat(base_df['high_price'].to_numpy(), first),
+        'low_price': np.minimum.reduceat(base_df['low_price'].to_numpy(), first),
+        'trade_price': base_df['trade_price'].to_numpy()[last],
+        'candle_acc_trade_price': np.add.reduceat(base_df['candle_acc_trade_price'].to_numpy(), first),
+        'candle_acc_trade_volume': np.add.reduceat(base_df['candle_acc_trade_volume'].to_numpy(), first)
+    })
+
+
+class TimeframeSet:
+    """한 종목의 1분봉과 그로부터 만든 상위 간격 캔들
+
+    update()로 새 1분봉(수정된 마지막 1분봉 포함)이 들어오면 각 간격의 마지막
+    캔들 시작 시각부터만 다시 집계해 이어 붙인다. 1분봉은 최근 max_base개만
+    보관하고, 잘려 나간 구간에 걸친 상위 간격 캔들도 함께 버린다.
+    """
+
+    def __init__(self, max_base=None):
+        self.max_base = max_base
+        self.base = pd.DataFrame(columns=CANDLE_COLUMNS)
+        self.frames = {}
+        self.lock = threading.Lock()
+
+    def update(self, base_df):
+        """1분봉 반영 (이미 가진 마지막 1분봉 이후 행만 사용)"""
+        if base_df.empty:
+            return
+        utc = base_df['candle_date_time_utc']
+
+        with self.lock:
+            if self.base.empty or utc.iloc[0] > self.base['candle_date_time_utc'].iloc[-1]:
+                # 처음이거나 가진 구간과 이어지지 않으면 새로 시작
+                self.base = base_df[CANDLE_COLUMNS].reset_index(drop=True)
+                self.frames = {}
+                self._trim()
+                return
+
+            new = base_df[utc >= self.base['candle_date_time_utc'].iloc[-1]]
+            if new.empty:
+                return
+            first_new = new['candle_date_time_utc'].iloc[0]
+            kept = self.base[self.base['candle_date_time_utc'] < first_new]
+            self.base = pd.concat([kept, new[CANDLE_COLUMNS]], ignore_index=True)
+
+            for interval, frame in list(self.frames.items()):
+                self.frames[interval] = self._extend(frame, interval, first_new)
+            self._trim()
+
+    def _trim(self):
+        """1분봉을 최근 max_base개로 자르고, 시작이 잘린 상위 간격 캔들도 버린다 (self.lock 안에서 호출)"""
+        if not self.max_base or len(self.base) <= self.max_base:
+            return
+        self.base = self.base.iloc[-self.max_base:].reset_index(drop=True)
+        first = self.base['candle_date_time_utc'].iloc[0]
+        for interval, frame in list(self.frames.items()):
+            frame = frame[frame['candle_date_time_utc'] >= first].reset_index(drop=True)
+            self.frames[interval] = self._drop_partial_head(frame, interval)
+
+    def _drop_partial_head(self, frame, interval):
+        """첫 캔들 구간의 1분봉이 다 있지 않으면(앞이 잘렸거나 빠진 분이 있으면) 버린다
+
+        1분봉 조회는 최근 N개 단위라 보관 구간 첫 캔들은 앞부분이 빠졌을 수 있다.
+        구간 안 1분봉 수가 구간 길이(분)와 같을 때만 완성된 캔들로 본다.
+        """
+        if frame.empty:
+            return frame
+        start = pd.Timestamp(frame['candle_date_time_utc'].iloc[0])
+        end = bucket_end(start, interval)
+        base_utc = self.base['candle_date_time_utc']
+        count = (base_utc.searchsorted(end.strftime(_TIME_FORMAT))
+                 - base_utc.searchsorted(start.strftime(_TIME_FORMAT)))
+        if count == (end - start) // pd.Timedelta(minutes=1):
+            return frame
+        return frame.iloc[1:].reset_index(drop=True)
+
+    def _extend(self, frame, interval, first_new):
+        """first_new가 속한 캔들부터 다시 집계해 frame 뒤에 붙이기"""
+        start = bucket_starts([pd.Timestamp(first_new)], interval)[0].strftime(_TIME_FORMAT)
+        base_utc = self.base['candle_date_time_utc']
+        tail = resample_candles(self.base.iloc[base_utc.searchsorted(start):], interval)
+        kept = frame[frame['candle_date_time_utc'] < start]
+        return pd.concat([kept, tail], ignore_index=True)
+
+    def get(self, interval, count=None):
+        """interval 캔들 (처음 요청 시 전체 집계, 이후 증분 유지)"""
+        with self.lock:
+            if interval not in self.frames:
+                frame = resample_candles(self.base, interval)
+                self.frames[interval] = self._drop_partial_head(frame, interval)
+            frame = self.frames[interval]
+        if count is not None:
+            frame = frame.iloc[-count:]
+        return frame.reset_index(drop=True)
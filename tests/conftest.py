@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈이 저장소 최상위에 평평하게 있어 테스트에서 바로 import 한다
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,91 @@
+"""AlertDaemon.tick: 거짓→참 전환 때만 알림, cooldown 안의 재전환은 건너뜀"""
+import pandas as pd
+import pytest
+
+import alerts
+from alerts import AlertDaemon
+from bench import make_candles
+
+LAST_CANDLE = pd.Timestamp('2026-01-01 00:00:00')  # make_candles 기본 마지막 캔들 (UTC)
+
+
+class ListSink:
+    def __init__(self):
+        self.alerts = []
+
+    def emit(self, alert):
+        self.alerts.append(alert)
+
+
+class Market:
+    """가짜 현재가 API와 캔들 조회 (가격과 체결 시각을 테스트가 정한다)"""
+
+    def __init__(self):
+        self.price = 90.0
+        self.trade_time = LAST_CANDLE + pd.Timedelta(minutes=10)
+        self.fetches = 0
+
+    def tickers(self, markets):
+        ts = int(self.trade_time.timestamp() * 1000)
+        return [{'market': m, 'trade_price': self.price, 'trade_timestamp': ts} for m in markets]
+
+    def candles(self, market, interval, count):
+        self.fetches += 1
+        end = self.trade_time.floor('h')
+        return make_candles(count, interval_minutes=60, end=end, market=market)
+
+
+@pytest.fixture
+def market(monkeypatch):
+    market = Market()
+    monkeypatch.setattr(alerts, 'fetch_tickers', market.tickers)
+    # 가격만 보는 조건으로 전환/쿨다운 처리만 검사한다
+    monkeypatch.setitem(alerts.CONDITIONS, 'price_above', lambda s, price, value: price > value)
+    return market
+
+
+def test_alerts_on_transition_and_respects_cooldown(market):
+    sink = ListSink()
+    daemon = AlertDaemon(['KRW-BTC'], ['1시간'], [('price_above', 100.0)], [sink],
+                         fetch=market.candles, cooldown=600)
+
+    def tick(now, price):
+        market.price = price
+        return [(a['market'], a['condition'], a['price']) for a in daemon.tick(now=now)]
+
+    assert tick(0, 90.0) == []
+    assert tick(5, 110.0) == [('KRW-BTC', 'price_above', 110.0)]  # 거짓 → 참
+    assert tick(10, 120.0) == []   # 계속 참이면 다시 보내지 않는다
+    assert tick(15, 90.0) == []
+    assert tick(20, 110.0) == []   # 다시 참이 됐지만 cooldown 안
+    assert tick(700, 115.0) == []  # cooldown이 지나도 참이 이어지는 중이면 보내지 않는다
+    assert tick(705, 90.0) == []
+    assert tick(710, 110.0) == [('KRW-BTC', 'price_above', 110.0)]
+
+    assert len(sink.alerts) == 2
+    assert sink.alerts[-1]['interval'] == '1시간' and sink.alerts[-1]['value'] == 100.0
+    assert market.fetches == 1  # 같은 캔들 안에서는 레벨을 다시 계산하지 않는다
+
+
+def test_new_candle_refreshes_levels_once(market):
+    daemon = AlertDaemon(['KRW-BTC', 'KRW-ETH'], ['1시간'], [('price_above', 100.0)], [ListSink()],
+                         fetch=market.candles, cooldown=600)
+    daemon.tick(now=0)
+    daemon.tick(now=5)
+    assert market.fetches == 2
+
+    market.trade_time += pd.Timedelta(hours=1)
+    daemon.tick(now=10)
+    daemon.tick(now=15)
+    assert market.fetches == 4
+    next_candle = (LAST_CANDLE + pd.Timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
+    assert {s.candle_key for s in daemon.states} == {next_candle}
+
+
+def test_alert_keys_are_per_market(market):
+    sink = ListSink()
+    daemon = AlertDaemon(['KRW-BTC', 'KRW-ETH'], ['1시간'], [('price_above', 100.0)], [sink],
+                         fetch=market.candles, cooldown=600)
+    daemon.tick(now=0)
+    market.price = 110.0
+    assert {a['market'] for a in daemon.tick(now=5)} == {'KRW-BTC', 'KRW-ETH'}
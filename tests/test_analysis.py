@@ -0,0 +1,140 @@
+"""벡터화한 피봇/거래량 프로파일을 반복문 기준 구현과 비교하는 회귀 테스트"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import calculate_support_resistance, calculate_volume_profile, find_pivots
+
+
+def random_candles(rng, n, tick=10):
+    """고가/저가가 자주 같은 값이 되도록 호가 단위로 반올림한 무작위 캔들"""
+    close = 10000 + np.cumsum(rng.normal(0, 30, n))
+    high = close + rng.exponential(20, n)
+    low = close - rng.exponential(20, n)
+    df = pd.DataFrame({
+        'high_price': np.round(high / tick) * tick,
+        'low_price': np.round(low / tick) * tick,
+        'trade_price': np.round(close / tick) * tick,
+        'candle_acc_trade_volume': rng.exponential(5, n)
+    })
+    df['low_price'] = np.minimum(df['low_price'], df['trade_price'])
+    df['high_price'] = np.maximum(df['high_price'], df['trade_price'])
+    df['MA20'] = df['trade_price'].rolling(20).mean()
+    df['MA60'] = df['trade_price'].rolling(60).mean()
+    return df
+
+
+def loop_pivots(high, low, left, right):
+    """i번째 값을 [i - left, i + right] 구간과 하나씩 비교하는 기준 구현"""
+    high_idx, low_idx = [], []
+    for i in range(left, len(high) - right):
+        if high[i] == max(high[i - left:i + right + 1]):
+            high_idx.append(i)
+        if low[i] == min(low[i - left:i + right + 1]):
+            low_idx.append(i)
+    return high_idx, low_idx
+
+
+def loop_support_resistance(df, window=20):
+    """벡터화 이전 calculate_support_resistance (중앙 정렬 rolling + iloc 반복문)"""
+    if len(df) < window:
+        return [], []
+
+    current_price = df.iloc[-1]['trade_price']
+
+    highs = df['high_price'].rolling(window=window, center=True).max()
+    lows = df['low_price'].rolling(window=window, center=True).min()
+
+    resistance_levels = []
+    support_levels = []
+
+    for i in range(window, len(df) - window):
+        if df.iloc[i]['high_price'] == highs.iloc[i]:
+            resistance_levels.append(df.iloc[i]['high_price'])
+        if df.iloc[i]['low_price'] == lows.iloc[i]:
+            support_levels.append(df.iloc[i]['low_price'])
+
+    if len(df) >= 20:
+        ma20 = df['MA20'].iloc[-1]
+        ma60 = df['MA60'].iloc[-1] if len(df) >= 60 else None
+
+        if ma20 < current_price:
+            support_levels.append(ma20)
+        else:
+            resistance_levels.append(ma20)
+
+        if ma60:
+            if ma60 < current_price:
+                support_levels.append(ma60)
+            else:
+                resistance_levels.append(ma60)
+
+    support_levels = [level for level in support_levels if level < current_price]
+    resistance_levels = [level for level in resistance_levels if level > current_price]
+
+    support_levels = sorted(list(set([round(x, -1) for x in support_levels])), reverse=True)[:10]
+    resistance_levels = sorted(list(set([round(x, -1) for x in resistance_levels])))[:10]
+
+    return support_levels, resistance_levels
+
+
+def loop_volume_profile(df, bins=50):
+    """구간마다 겹치는 길이 비율로 거래량을 나누는 O(bins × n) 기준 구현"""
+    low = df['low_price'].to_numpy(dtype=float)
+    high = df['high_price'].to_numpy(dtype=float)
+    volume = df['candle_acc_trade_volume'].to_numpy(dtype=float)
+    edges = np.linspace(low.min(), high.max(), bins)
+
+    result = np.zeros(bins - 1)
+    for i in range(bins - 1):
+        bin_low, bin_high = edges[i], edges[i + 1]
+        for lo, hi, v in zip(low, high, volume):
+            if hi > lo:
+                result[i] += v * max(0.0, min(hi, bin_high) - max(lo, bin_low)) / (hi - lo)
+            elif (bin_low < lo <= bin_high) or (i == 0 and lo == bin_low):
+                result[i] += v
+    return (edges[:-1] + edges[1:]) / 2, result
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_find_pivots_matches_loop(seed):
+    rng = np.random.default_rng(seed)
+    df = random_candles(rng, int(rng.integers(1, 400)))
+    high = df['high_price'].to_numpy()
+    low = df['low_price'].to_numpy()
+    left, right = (int(x) for x in rng.integers(0, 15, 2))
+
+    high_idx, high_prices, low_idx, low_prices = find_pivots(high, low, left, right)
+    expected_high, expected_low = loop_pivots(high, low, left, right)
+
+    assert high_idx.tolist() == expected_high
+    assert low_idx.tolist() == expected_low
+    assert high_prices.tolist() == high[expected_high].tolist()
+    assert low_prices.tolist() == low[expected_low].tolist()
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_support_resistance_matches_loop(seed):
+    rng = np.random.default_rng(100 + seed)
+    df = random_candles(rng, int(rng.integers(10, 500)))
+    window = int(rng.integers(3, 40))
+
+    assert calculate_support_resistance(df, window) == loop_support_resistance(df, window)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_volume_profile_matches_loop(seed):
+    rng = np.random.default_rng(200 + seed)
+    df = random_candles(rng, int(rng.integers(2, 300)))
+    # 고가 = 저가인 캔들도 섞는다
+    flat = rng.random(len(df)) < 0.1
+    df.loc[flat, 'high_price'] = df.loc[flat, 'low_price']
+    bins = int(rng.integers(3, 120))
+
+    profile = calculate_volume_profile(df, bins)
+    prices, volumes = loop_volume_profile(df, bins)
+
+    np.testing.assert_allclose(profile['price'], prices)
+    np.testing.assert_allclose(profile['volume'], volumes, rtol=1e-9,
+                               atol=1e-9 * df['candle_acc_trade_volume'].sum())
+    assert profile['volume'].sum() == pytest.approx(df['candle_acc_trade_volume'].sum())
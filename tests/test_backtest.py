@@ -0,0 +1,48 @@
+"""백테스트가 미래 캔들을 쓰지 않는지, 수수료를 일관되게 매기는지 검사"""
+import numpy as np
+import pytest
+
+import backtest
+from backtest import FEE, signal_contexts, simulate
+from bench import make_candles
+
+
+def test_contexts_do_not_look_ahead():
+    lookback = 60
+    df = make_candles(160, interval_minutes=60, seed=1)
+    contexts = signal_contexts(df, window=10, bins=30, lookback=lookback)
+
+    # i번째 캔들 뒤를 크게 바꿔도 i번째까지로 만든 기준값은 그대로여야 한다
+    cut = 110
+    altered = df.copy()
+    for column in ('opening_price', 'high_price', 'low_price', 'trade_price'):
+        altered.loc[cut + 1:, column] *= 1.5
+    altered.loc[cut + 1:, 'candle_acc_trade_volume'] *= 10
+    changed = signal_contexts(altered, window=10, bins=30, lookback=lookback)
+
+    last_unchanged = cut - (lookback - 1)  # contexts[k]는 lookback - 1 + k번째 캔들까지 사용
+    assert changed[:last_unchanged + 1] == contexts[:last_unchanged + 1]
+    assert changed[last_unchanged + 1:] != contexts[last_unchanged + 1:]
+
+
+def test_open_position_is_valued_like_a_closed_trade(monkeypatch):
+    df = make_candles(3, interval_minutes=60, seed=2)
+    price = df['trade_price'].iloc[-1]
+    df.loc[1, ['opening_price', 'low_price']] = price * 1.1, price * 0.9  # 1번 캔들에서 매수
+    df.loc[2, ['opening_price', 'high_price', 'low_price', 'trade_price']] = price * 1.2, price * 1.2, price, price * 1.2
+    params = {'dummy': np.zeros(1)}
+
+    # 1번 캔들은 price에 매수, 2번 캔들 매도 주문은 종가(price * 1.2) 또는 체결 불가 가격
+    def fixed_orders(sell_price):
+        orders = iter([(price, np.inf), (-np.inf, sell_price)])
+        return lambda context, params, size: tuple(np.full(size, p) for p in next(orders))
+
+    monkeypatch.setattr(backtest, 'order_prices', fixed_orders(price * 1.2))
+    closed = simulate(df, [None] * 3, params)
+    monkeypatch.setattr(backtest, 'order_prices', fixed_orders(np.inf))
+    still_open = simulate(df, [None] * 3, params)
+
+    assert not closed['holding'][0] and still_open['holding'][0]
+    expected = (1.2 * (1 - FEE) ** 2 - 1) * 100
+    assert closed['return_pct'][0] == pytest.approx(expected)
+    assert still_open['return_pct'][0] == pytest.approx(expected)
@@ -0,0 +1,61 @@
+"""페이지 조회 루프를 가짜 캔들 API로 검사 (DataFrame 경로와 컴팩트 배열 경로)"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import upbit_api
+from candle_arrays import fetch_candles_compact, to_frame
+from upbit_api import fetch_candles
+
+
+@pytest.fixture
+def listed(monkeypatch):
+    """상장 후 1000분 중 거래 없는 분이 섞인 1분봉 이력, 가장 최신 시각 기준 응답"""
+    rng = np.random.default_rng(0)
+    times = pd.date_range('2026-01-01', periods=1000, freq='min')
+    times = times[rng.random(len(times)) >= 0.1]
+    rows = [{
+        'market': 'KRW-BTC',
+        'candle_date_time_utc': t.strftime('%Y-%m-%dT%H:%M:%S'),
+        'candle_date_time_kst': (t + pd.Timedelta(hours=9)).strftime('%Y-%m-%dT%H:%M:%S'),
+        'opening_price': 100.0 + i,
+        'high_price': 101.0 + i,
+        'low_price': 99.0 + i,
+        'trade_price': 100.5 + i,
+        'candle_acc_trade_volume': 1.0 + i
+    } for i, t in enumerate(times)]
+    now = times[-1] + pd.Timedelta(minutes=1)
+    requests = []
+
+    def fetch_page(market, interval, count=200, to=None, raw=False):
+        requests.append(to)
+        end = now if to is None else pd.Timestamp(to.rstrip('Z'))
+        page = [row for row in rows if pd.Timestamp(row['candle_date_time_utc']) < end][-count:][::-1]
+        return json.dumps(page).encode() if raw else page
+
+    monkeypatch.setattr(upbit_api, 'fetch_candle_page', fetch_page)
+    monkeypatch.setattr(upbit_api, '_plan_cursors', lambda interval, count, to: [to])
+    return rows, requests
+
+
+@pytest.mark.parametrize('count', [150, 500, 2000])
+def test_frame_and_compact_paths_fetch_same_candles(listed, count):
+    rows, _ = listed
+    expected = [row['candle_date_time_utc'] for row in rows][-count:]
+
+    df = fetch_candles('KRW-BTC', '1분', count)
+    assert df['candle_date_time_utc'].tolist() == expected
+
+    compact = to_frame(fetch_candles_compact('KRW-BTC', '1분', count))
+    assert compact['candle_date_time_utc'].tolist() == expected
+    np.testing.assert_array_equal(compact['trade_price'], df['trade_price'])
+    np.testing.assert_array_equal(compact['candle_acc_trade_volume'], df['candle_acc_trade_volume'])
+
+
+def test_stops_at_listing(listed):
+    rows, requests = listed
+    fetch_candles('KRW-BTC', '1분', 5000)
+    # 상장 시점에 닿은 덜 찬 마지막 페이지에서 멈춘다
+    assert len(requests) == -(-len(rows) // 200)
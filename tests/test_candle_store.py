@@ -0,0 +1,86 @@
+"""CandleStore 증분 동기화와 공백 처리 (가짜 거래소 이력으로)"""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import candle_store
+from candle_store import COLUMNS, CandleStore
+
+
+class FakeExchange:
+    """1분봉 이력에서 to 이전 최신 count개를 돌려주는 fetch_candles 대역"""
+
+    def __init__(self, times):
+        self.times = pd.DatetimeIndex(times)
+        self.now = self.times[-1]
+
+    def fetch(self, market, interval, count, to=None):
+        end = self.now if to is None else pd.Timestamp(to.rstrip('Z')) - pd.Timedelta(seconds=1)
+        times = self.times[self.times <= end][-count:]
+        return pd.DataFrame({
+            'candle_date_time_utc': times.strftime('%Y-%m-%dT%H:%M:%S'),
+            'candle_date_time_kst': times + pd.Timedelta(hours=9),
+            **{column: np.arange(len(times), dtype=float) for column in COLUMNS[2:]}
+        })
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    exchange = FakeExchange(pd.date_range('2026-01-01', periods=5000, freq='min'))
+    monkeypatch.setattr(candle_store, 'fetch_candles', exchange.fetch)
+    since = candle_store._candles_since
+    monkeypatch.setattr(candle_store, '_candles_since',
+                        lambda interval, last: since(interval, last, now=exchange.now))
+    return exchange
+
+
+def _count(store):
+    with sqlite3.connect(store.path) as conn:
+        return conn.execute('SELECT COUNT(*) FROM candles').fetchone()[0]
+
+
+def _gaps(store):
+    with sqlite3.connect(store.path) as conn:
+        return conn.execute('SELECT start_utc FROM gaps').fetchall()
+
+
+def _contiguous(df):
+    times = pd.to_datetime(df['candle_date_time_utc'])
+    return bool((times.diff().dropna() == pd.Timedelta(minutes=1)).all())
+
+
+def test_long_gap_keeps_older_history_and_backfill_closes_it(tmp_path, exchange):
+    store = CandleStore(str(tmp_path / 'candles.sqlite3'))
+    exchange.now = exchange.times[2999]
+    assert len(store.get_candles('KRW-BTC', '1분', 3000)) == 3000
+
+    # 하루 쉬고 50개만 요청: 예전 3000개는 지우지 않고 공백만 기록
+    exchange.now = exchange.times[2999 + 1440]
+    df = store.get_candles('KRW-BTC', '1분', 50)
+    assert len(df) == 50 and _contiguous(df)
+    assert _count(store) == 3050
+    assert _gaps(store) == [(df['candle_date_time_utc'].iloc[0],)]
+
+    # 더 긴 요청은 공백 뒤 구간만 과거로 채우다 예전 저장분에 닿으면 공백을 지운다
+    df = store.get_candles('KRW-BTC', '1분', 3000)
+    assert len(df) == 3000 and _contiguous(df)
+    assert _gaps(store) == []
+    assert df['candle_date_time_utc'].iloc[-1] == exchange.now.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def test_no_gap_when_fetched_page_reaches_stored_candles(tmp_path, exchange):
+    # 거래가 없던 시간이 길어 시간상 공백(missing)은 크지만 실제 캔들은 이어진다
+    quiet = pd.date_range('2026-01-01', periods=100, freq='min').append(
+        pd.DatetimeIndex(['2026-01-01 12:00']))
+    exchange.times = quiet
+    exchange.now = quiet[99]
+    store = CandleStore(str(tmp_path / 'candles.sqlite3'))
+    store.get_candles('KRW-BTC', '1분', 100)
+
+    exchange.now = quiet[-1]
+    df = store.get_candles('KRW-BTC', '1분', 50)
+    assert _gaps(store) == []
+    assert len(df) == 50
+    assert len(store.load('KRW-BTC', '1분', 200)) == 101
@@ -0,0 +1,69 @@
+"""DerivedCache 메모리 예산 LRU와 무효화"""
+import numpy as np
+import pandas as pd
+
+from derived_cache import DerivedCache, frame_fingerprint
+
+
+def _value(nbytes):
+    return np.zeros(nbytes, dtype=np.uint8)
+
+
+def test_hit_skips_compute_and_params_separate_entries():
+    cache = DerivedCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return _value(10)
+
+    first = cache.get_or_compute('KRW-BTC', '일봉', 'analysis', 'fp', (True,), compute)
+    assert cache.get_or_compute('KRW-BTC', '일봉', 'analysis', 'fp', (True,), compute) is first
+    cache.get_or_compute('KRW-BTC', '일봉', 'analysis', 'fp', (False,), compute)
+    assert len(calls) == 2
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = DerivedCache(max_bytes=300)
+    for name in ('a', 'b', 'c'):
+        cache.get_or_compute('KRW-BTC', '일봉', name, 'fp', (), lambda: _value(100))
+    # a를 다시 써서 가장 오래 안 쓴 항목을 b로 만든다
+    cache.get_or_compute('KRW-BTC', '일봉', 'a', 'fp', (), lambda: _value(100))
+    cache.get_or_compute('KRW-BTC', '일봉', 'd', 'fp', (), lambda: _value(100))
+
+    kinds = [key[2] for key in cache.entries]
+    assert kinds == ['c', 'a', 'd']
+    assert cache.total_bytes == sum(size for _, size in cache.entries.values()) <= 300
+
+
+def test_value_over_budget_is_returned_but_not_stored():
+    cache = DerivedCache(max_bytes=100)
+    value = cache.get_or_compute('KRW-BTC', '일봉', 'chart', 'fp', (), lambda: _value(1000))
+    assert len(value) == 1000
+    assert not cache.entries and cache.total_bytes == 0
+
+
+def test_invalidate_by_market_and_interval():
+    cache = DerivedCache()
+    for market, interval in [('KRW-BTC', '일봉'), ('KRW-BTC', '1시간'), ('KRW-ETH', '일봉')]:
+        cache.get_or_compute(market, interval, 'analysis', 'fp', (), lambda: _value(10))
+
+    assert cache.invalidate('KRW-BTC', '일봉') == 1
+    assert cache.invalidate('KRW-BTC') == 1
+    assert [key[:2] for key in cache.entries] == [('KRW-ETH', '일봉')]
+    assert cache.total_bytes == sum(size for _, size in cache.entries.values())
+
+
+def test_fingerprint_follows_candle_content_only():
+    df = pd.DataFrame({
+        'candle_date_time_utc': ['2026-01-01T00:00:00', '2026-01-01T00:01:00'],
+        'opening_price': [1.0, 2.0], 'high_price': [2.0, 3.0], 'low_price': [0.5, 1.5],
+        'trade_price': [1.5, 2.5], 'candle_acc_trade_volume': [10.0, 20.0]
+    })
+    with_indicator = df.assign(MA5=[np.nan, 2.0]).set_axis([5, 6])
+    assert frame_fingerprint(df) == frame_fingerprint(with_indicator)
+
+    changed = df.copy()
+    changed.loc[1, 'trade_price'] = 2.6
+    assert frame_fingerprint(df) != frame_fingerprint(changed)
@@ -0,0 +1,76 @@
+"""증분 내보내기 건너뛰기와 형식을 바꾼 뒤 남은 파일 처리"""
+import os
+
+import pytest
+
+import export
+from bench import make_candles
+from export import export_markets, load_table, table_path
+
+
+class FakeCandles:
+    """종목별 고정 합성 캔들 (changed에 넣은 종목은 마지막 캔들 종가가 바뀐다)"""
+
+    def __init__(self):
+        self.changed = set()
+
+    def __call__(self, market, interval, count):
+        df = make_candles(count, interval_minutes=60, seed=len(market), market=market)
+        if market in self.changed:
+            df.loc[df.index[-1], 'trade_price'] += 1000
+        return df
+
+
+@pytest.fixture
+def fetch():
+    return FakeCandles()
+
+
+def _mtimes(out, fmt):
+    return {m: os.stat(table_path(out, 'candles', m, '1시간', fmt)).st_mtime_ns for m in ('KRW-BTC', 'KRW-ETH')}
+
+
+def test_unchanged_candles_are_skipped(tmp_path, fetch):
+    out = str(tmp_path)
+    markets = ['KRW-BTC', 'KRW-ETH']
+    first = export_markets(markets, ['1시간'], 100, out, 'json', fetch=fetch, max_workers=1)
+    assert first['stats'] == {'exported': 2, 'unchanged': 0, 'failed': 0}
+    before = _mtimes(out, 'json')
+
+    second = export_markets(markets, ['1시간'], 100, out, 'json', fetch=fetch, max_workers=1)
+    assert second['stats'] == {'exported': 0, 'unchanged': 2, 'failed': 0}
+    assert _mtimes(out, 'json') == before
+    assert second['entries'] == first['entries']
+
+    fetch.changed.add('KRW-ETH')
+    third = export_markets(markets, ['1시간'], 100, out, 'json', fetch=fetch, max_workers=1)
+    assert third['stats'] == {'exported': 1, 'unchanged': 1, 'failed': 0}
+    after = _mtimes(out, 'json')
+    assert after['KRW-BTC'] == before['KRW-BTC'] and after['KRW-ETH'] != before['KRW-ETH']
+    assert len(load_table(out, 'candles')) == 200
+
+
+def test_format_change_does_not_mix_stale_files(tmp_path, fetch):
+    pytest.importorskip('pyarrow')
+    out = str(tmp_path)
+    export_markets(['KRW-BTC', 'KRW-ETH'], ['1시간'], 200, out, 'parquet', fetch=fetch, max_workers=1)
+    assert len(load_table(out, 'candles')) == 400
+
+    # 형식을 바꾸면 이전 manifest 항목이 무효라 다시 내보낸 종목만 남는다
+    export_markets(['KRW-BTC'], ['1시간'], 200, out, 'json', fetch=fetch, max_workers=1)
+    candles = load_table(out, 'candles')
+    assert len(candles) == 200 and set(candles['market']) == {'KRW-BTC'}
+    assert len(load_table(out, 'summary')) == 1
+    assert not os.path.exists(table_path(out, 'candles', 'KRW-BTC', '1시간', 'parquet'))
+    assert not os.path.exists(table_path(out, 'candles', 'KRW-ETH', '1시간', 'parquet'))
+    assert not os.path.exists(os.path.join(out, 'summary.parquet'))
+
+
+def test_load_table_ignores_files_outside_manifest(tmp_path, fetch):
+    out = str(tmp_path)
+    export_markets(['KRW-BTC'], ['1시간'], 100, out, 'json', fetch=fetch, max_workers=1)
+    stray = table_path(out, 'candles', 'KRW-XRP', '1시간', 'json')
+    export.write_table(load_table(out, 'candles'), stray, 'json')
+
+    assert len(load_table(out, 'candles')) == 100
+    assert load_table(out, 'candles', market='KRW-XRP').empty
@@ -0,0 +1,164 @@
+"""FetchScheduler 동시 요청 합치기, 갱신 중 직전 결과 주기, 미리 갱신, 삭제 (가짜 시계/조회)"""
+import threading
+import time
+
+import pytest
+
+import fetch_scheduler
+from fetch_scheduler import FetchScheduler
+
+KEY = ('KRW-BTC', '일봉', 200)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeFetch:
+    """호출마다 다음 버전 값을 돌려주는 조회, blocked면 release()까지 기다린다"""
+
+    def __init__(self):
+        self.calls = 0
+        self.version = 0
+        self.blocked = False
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def __call__(self, market, interval, count):
+        self.calls += 1
+        self.started.set()
+        if self.blocked:
+            assert self.gate.wait(5)
+        self.version += 1
+        return [f"{market}-v{self.version}"]
+
+    def block(self):
+        self.blocked = True
+        self.started.clear()
+        self.gate.clear()
+
+    def release(self):
+        self.blocked = False
+        self.gate.set()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(fetch_scheduler, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def fetch():
+    return FakeFetch()
+
+
+@pytest.fixture
+def scheduler(clock, fetch):
+    # 백그라운드 스레드는 띄우지 않고 시계를 직접 움직이며 _due/_evict를 부른다
+    scheduler = FetchScheduler(fetch, ttl=60, refresh_ahead=10, max_stale=600, hot_seconds=300,
+                               idle_seconds=1800, max_entries=3)
+    yield scheduler
+    fetch.release()
+    scheduler.stop()
+
+
+def _wait_in_flight(scheduler, key=KEY):
+    with scheduler.lock:
+        future = scheduler.entries[key].future
+    if future is not None:
+        future.result(timeout=5)
+
+
+def test_concurrent_misses_share_one_fetch(scheduler, fetch):
+    fetch.block()
+    results = [None] * 5
+
+    def get(i):
+        results[i] = scheduler.get(*KEY)
+
+    threads = [threading.Thread(target=get, args=(i,)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    assert fetch.started.wait(5)
+    # 다섯 요청이 모두 진행 중인 조회에 붙은 뒤에 조회를 끝낸다
+    while scheduler.counts['miss'] + scheduler.counts['coalesced'] < 5:
+        time.sleep(0.001)
+    fetch.release()
+    for thread in threads:
+        thread.join(5)
+
+    assert fetch.calls == 1
+    assert results == [['KRW-BTC-v1']] * 5
+    assert scheduler.counts['miss'] == 1 and scheduler.counts['coalesced'] == 4
+
+
+def test_serves_stale_value_while_refreshing(scheduler, fetch, clock):
+    assert scheduler.get(*KEY) == ['KRW-BTC-v1']
+    clock.now += 30
+    assert scheduler.get(*KEY) == ['KRW-BTC-v1']
+    assert scheduler.counts['fresh'] == 1 and fetch.calls == 1
+
+    # 만료 후: 갱신이 끝나지 않아도 기다리지 않고 직전 결과, 갱신은 한 번만
+    clock.now += 31
+    fetch.block()
+    assert scheduler.get(*KEY) == ['KRW-BTC-v1']
+    assert fetch.started.wait(5)
+    assert scheduler.get(*KEY) == ['KRW-BTC-v1']
+    assert scheduler.counts['stale'] == 2 and fetch.calls == 2
+
+    fetch.release()
+    _wait_in_flight(scheduler)
+    assert scheduler.get(*KEY) == ['KRW-BTC-v2']
+    assert scheduler.counts['fresh'] == 2
+
+
+def test_waits_when_older_than_max_stale(scheduler, fetch, clock):
+    scheduler.get(*KEY)
+    clock.now += 601
+    assert scheduler.get(*KEY) == ['KRW-BTC-v2']
+    assert scheduler.counts['stale'] == 0 and scheduler.counts['miss'] == 2
+
+
+def test_refresh_ahead_only_for_hot_or_pinned_keys(scheduler, fetch, clock):
+    scheduler.get(*KEY)
+    scheduler.warm([('KRW-ETH', '일봉', 200)])
+    _wait_in_flight(scheduler, ('KRW-ETH', '일봉', 200))
+
+    clock.now += 49
+    with scheduler.lock:
+        assert scheduler._due(clock.now) == []
+    clock.now += 1  # ttl - refresh_ahead
+    with scheduler.lock:
+        assert {key for key, _ in scheduler._due(clock.now)} == {KEY, ('KRW-ETH', '일봉', 200)}
+
+    # 오래 안 쓰인 키는 관심 종목만 미리 갱신
+    clock.now += 300
+    with scheduler.lock:
+        assert [key for key, _ in scheduler._due(clock.now)] == [('KRW-ETH', '일봉', 200)]
+
+
+def test_evicts_idle_and_least_recent_keys(scheduler, clock):
+    scheduler.warm([('KRW-ETH', '일봉', 200)])
+    for market in ('KRW-A', 'KRW-B'):
+        scheduler.get(market, '일봉', 200)
+        clock.now += 1
+    scheduler.get(*KEY)  # 네 번째 키: 최대 3개라 가장 오래 안 쓰인 KRW-A가 빠진다
+    assert set(scheduler.entries) == {('KRW-ETH', '일봉', 200), ('KRW-B', '일봉', 200), KEY}
+
+    clock.now += 1801
+    with scheduler.lock:
+        scheduler._evict(clock.now)
+    assert set(scheduler.entries) == {('KRW-ETH', '일봉', 200)}
+
+
+def test_invalidate_forces_next_get_to_fetch(scheduler, fetch):
+    scheduler.get(*KEY)
+    assert scheduler.invalidate('KRW-BTC') == 1
+    assert scheduler.get(*KEY) == ['KRW-BTC-v2']
+    assert fetch.calls == 2
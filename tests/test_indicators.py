@@ -0,0 +1,77 @@
+"""증분 지표 엔진이 일괄 계산(calculate_technical_indicators)과 같은 값을 내는지 검사
+
+허용 오차는 indicators 모듈 설명과 같다: MA/RSI/BB_middle 상대 1e-12,
+볼린저 밴드 폭(σ) 상대 1e-7.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import calculate_technical_indicators
+from indicators import INDICATOR_COLUMNS, IndicatorEngine, fill_indicator_tail
+
+EXACT_RTOL = 1e-12
+SIGMA_RTOL = 1e-7
+
+
+def random_candles(rng, n, level, vol, start='2026-01-01'):
+    close = np.abs(level + np.cumsum(rng.normal(0, vol, n)))
+    times = pd.date_range(start, periods=n, freq='min')
+    return pd.DataFrame({
+        'candle_date_time_utc': times.strftime('%Y-%m-%dT%H:%M:%S'),
+        'opening_price': close,
+        'high_price': close,
+        'low_price': close,
+        'trade_price': close,
+        'candle_acc_trade_volume': 1.0
+    })
+
+
+def assert_matches_batch(actual, batch):
+    """actual: INDICATOR_COLUMNS를 가진 표, batch: 같은 캔들의 일괄 계산 결과"""
+    for column in ('MA5', 'MA20', 'MA60', 'MA120', 'RSI', 'BB_middle'):
+        np.testing.assert_allclose(actual[column], batch[column], rtol=EXACT_RTOL, atol=1e-10,
+                                   err_msg=column)
+    for column in ('BB_upper', 'BB_lower'):
+        np.testing.assert_allclose((actual[column] - actual['BB_middle']).abs(),
+                                   (batch[column] - batch['BB_middle']).abs(), rtol=SIGMA_RTOL,
+                                   err_msg=column)
+
+
+@pytest.mark.parametrize('level, vol', [(1.3e8, 3e5), (1.3e8, 1000), (5000, 0.1), (0.0012, 1e-5)])
+def test_streaming_updates_match_batch(level, vol):
+    rng = np.random.default_rng(int(level) % 97)
+    df = random_candles(rng, 1500, level, vol)
+    engine = IndicatorEngine(history_size=len(df))
+
+    # 진행 중 캔들을 몇 번 고친 뒤 마감 값으로 덮어쓴다 (창 크기마다 resync도 일어난다)
+    for ts, close in zip(df['candle_date_time_utc'], df['trade_price']):
+        for _ in range(3):
+            engine.update(ts, close * (1 + rng.normal(0, 1e-3)))
+        engine.update(ts, close)
+
+    streamed = pd.DataFrame([engine.history[ts] for ts in df['candle_date_time_utc']])
+    assert_matches_batch(streamed, calculate_technical_indicators(df.copy()))
+
+
+def test_fill_tail_matches_batch_after_new_candles_and_reseed():
+    rng = np.random.default_rng(7)
+    full = random_candles(rng, 600, 1.3e8, 3e5)
+    engine = IndicatorEngine()
+
+    # 앞 500개는 일괄 계산, 이어서 마지막 캔들 수정과 새 캔들 추가를 증분으로
+    df = calculate_technical_indicators(full.iloc[:500].copy())
+    for end in range(501, 601, 7):
+        merged = pd.concat([df, full.iloc[len(df):end]], ignore_index=True)
+        merged.loc[merged.index[-1], 'trade_price'] *= 1.001  # 미마감 캔들
+        start = len(df) - 1
+        df = fill_indicator_tail(engine, merged, start)
+        assert_matches_batch(df[INDICATOR_COLUMNS].iloc[start:],
+                             calculate_technical_indicators(merged[full.columns].copy()).iloc[start:])
+
+    # start 직전 캔들이 엔진 마지막 캔들보다 뒤면(공백) 앞 구간으로 seed해 다시 만든다
+    other = calculate_technical_indicators(
+        random_candles(np.random.default_rng(8), 300, 1.3e8, 3e5, start='2026-01-02'))
+    assert engine.last_ts < other['candle_date_time_utc'].iloc[249]
+    reseeded = fill_indicator_tail(engine, other.copy(), 250)
+    assert_matches_batch(reseeded[INDICATOR_COLUMNS].iloc[250:], other.iloc[250:])
@@ -0,0 +1,189 @@
+"""녹화된 업비트 체결 메시지를 재생하는 로컬 WebSocket 서버로 TradeStream 검사"""
+import base64
+import hashlib
+import json
+import os
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('websocket')
+
+from live_stream import CandleBuilder, StreamPool, TradeStream  # noqa: E402
+
+RECORDED = os.path.join(os.path.dirname(__file__), 'data', 'upbit_trades.jsonl')
+_WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def _read_frame(conn):
+    """클라이언트 프레임 하나 (마스킹 해제한 payload)"""
+    head = conn.recv(2)
+    length = head[1] & 0x7f
+    if length == 126:
+        length = struct.unpack('>H', conn.recv(2))[0]
+    elif length == 127:
+        length = struct.unpack('>Q', conn.recv(8))[0]
+    mask = conn.recv(4)
+    payload = b''
+    while len(payload) < length:
+        payload += conn.recv(length - len(payload))
+    return bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+def _send_frame(conn, payload):
+    """바이너리 프레임 전송 (업비트처럼 서버 → 클라이언트는 마스킹 없음)"""
+    if len(payload) < 126:
+        head = struct.pack('>BB', 0x82, len(payload))
+    else:
+        head = struct.pack('>BBH', 0x82, 126, len(payload))
+    conn.sendall(head + payload)
+
+
+class ReplayServer:
+    """연결마다 구독 메시지를 받은 뒤 녹화된 메시지를 그대로 보내는 서버"""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.subscriptions = []
+        self.connections = []
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen()
+        self.url = f"ws://127.0.0.1:{self.sock.getsockname()[1]}/websocket/v1"
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections.append(conn)
+            request = b''
+            while b'\r\n\r\n' not in request:
+                request += conn.recv(1024)
+            key = next(line.split(':', 1)[1].strip() for line in request.decode().split('\r\n')
+                       if line.lower().startswith('sec-websocket-key'))
+            accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+            conn.sendall(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n'
+                          f'Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n').encode())
+            self.subscriptions.append(json.loads(_read_frame(conn)))
+            for message in self.messages:
+                _send_frame(conn, message.encode())
+            threading.Thread(target=self._echo_close, args=(conn,), daemon=True).start()
+
+    def _echo_close(self, conn):
+        """클라이언트 종료 프레임에 응답 (업비트 서버처럼 연결을 닫는다)"""
+        try:
+            while True:
+                head = conn.recv(1, socket.MSG_PEEK)
+                if not head:
+                    return
+                if head[0] & 0x0f == 0x8:
+                    _read_frame(conn)
+                    conn.sendall(struct.pack('>BB', 0x88, 0))
+                    conn.close()
+                    return
+                _read_frame(conn)
+        except OSError:
+            return
+
+    def close(self):
+        self.sock.close()
+        for conn in self.connections:
+            conn.close()
+
+
+@pytest.fixture
+def recorded():
+    with open(RECORDED, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+@pytest.fixture
+def server(recorded):
+    server = ReplayServer(recorded)
+    yield server
+    server.close()
+
+
+def _wait(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("재생 메시지를 기다리다 시간 초과")
+        time.sleep(0.01)
+
+
+def test_replayed_trades_build_candles_for_every_interval(server, recorded):
+    received = []
+    stream = TradeStream(['KRW-BTC'], url=server.url)
+    stream.listeners.append(received.append)
+    stream.candles('KRW-BTC', '1분')
+    stream.candles('KRW-BTC', '5분')
+    stream.start()
+    try:
+        realtime = [m for m in map(json.loads, recorded)
+                    if m['code'] == 'KRW-BTC' and m['stream_type'] != 'SNAPSHOT']
+        _wait(lambda: len(received) == len(realtime))
+
+        minute = stream.candles('KRW-BTC', '1분')
+        five = stream.candles('KRW-BTC', '5분')
+    finally:
+        stream.stop()
+
+    # 종목 하나에 연결 하나, 간격은 그 연결을 같이 쓴다
+    assert len(server.connections) == 1
+    assert server.subscriptions[0][1] == {'type': 'trade', 'codes': ['KRW-BTC']}
+    assert [m['sequential_id'] for m in received] == [m['sequential_id'] for m in realtime]
+
+    assert minute['candle_date_time_utc'].tolist() == [
+        '2026-01-01T00:00:00', '2026-01-01T00:01:00', '2026-01-01T00:05:00']
+    first = minute.iloc[0]
+    assert (first['opening_price'], first['high_price'], first['low_price'], first['trade_price']) == (
+        130010000.0, 130050000.0, 129990000.0, 130050000.0)
+    assert first['candle_acc_trade_volume'] == pytest.approx(0.033)
+    assert minute.iloc[1]['trade_price'] == 130020000.0
+
+    assert five['candle_date_time_utc'].tolist() == ['2026-01-01T00:00:00', '2026-01-01T00:05:00']
+    assert five.iloc[0]['high_price'] == 130100000.0
+    assert five.iloc[0]['candle_acc_trade_volume'] == pytest.approx(0.223)
+
+    # 같은 메시지를 CandleBuilder에 직접 넣은 결과와 같아야 한다
+    builder = CandleBuilder('1분')
+    for m in realtime:
+        builder.add_trade(m['trade_price'], m['trade_volume'], m['trade_timestamp'])
+    assert builder.to_frame().equals(minute)
+
+
+def test_stop_closes_connection(server, recorded):
+    stream = TradeStream(['KRW-BTC'], url=server.url).start()
+    _wait(lambda: stream.last_message is not None)
+    stream.stop()
+    # 종료 응답을 수신 스레드가 먼저 읽으면 select 대기(ping_timeout 10초)가 끝나야 빠져나온다
+    stream._thread.join(timeout=15)
+    assert not stream._thread.is_alive()
+
+
+def test_stream_pool_stops_evicted_streams():
+    class Fake:
+        def __init__(self, market):
+            self.market = market
+            self.stopped = False
+
+        def stop(self):
+            self.stopped = True
+
+    pool = StreamPool(Fake, max_entries=2)
+    btc = pool.get('KRW-BTC')
+    eth = pool.get('KRW-ETH')
+    assert pool.get('KRW-BTC') is btc  # 최근 사용으로 순서 갱신
+    sol = pool.get('KRW-SOL')
+
+    assert eth.stopped and not btc.stopped and not sol.stopped
+    assert list(pool.entries) == [('KRW-BTC',), ('KRW-SOL',)]
+    pool.close()
+    assert btc.stopped and sol.stopped
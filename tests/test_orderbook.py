@@ -0,0 +1,79 @@
+"""호가 벽 탐지를 실제 KRW-BTC 규모 호가창(15단, 호가 단위 1000원)으로 검사"""
+import numpy as np
+import pytest
+
+from orderbook import DepthWindow, detect_walls, tick_size
+
+TICK = 1000.0
+LEVELS = 15
+
+
+def btc_orderbook(rng, best_bid, walls=None):
+    """best_bid부터 호가 단위 간격 15단 매수/매도 호가 (walls: 가격 → 잔량)"""
+    walls = walls or {}
+    bids = best_bid - TICK * np.arange(LEVELS)
+    asks = best_bid + TICK * (1 + np.arange(LEVELS))
+    units = []
+    for bid, ask in zip(bids, asks):
+        units.append({
+            'bid_price': float(bid),
+            'bid_size': walls.get(bid, float(rng.uniform(0.05, 0.3))),
+            'ask_price': float(ask),
+            'ask_size': walls.get(ask, float(rng.uniform(0.05, 0.3)))
+        })
+    return {'market': 'KRW-BTC', 'orderbook_units': units}
+
+
+def test_btc_book_spreads_over_levels_and_finds_walls():
+    rng = np.random.default_rng(0)
+    bid_wall, ask_wall = 129_990_000.0, 130_012_000.0
+    window = DepthWindow(window=60)
+    for i in range(60):
+        best_bid = 130_000_000.0 + TICK * int(rng.integers(-3, 4))  # 몇 호가씩 오르내림
+        window.add(btc_orderbook(rng, best_bid, {bid_wall: 4.0, ask_wall: 3.0}))
+
+    depth = window.depth()
+    assert window.tick == TICK
+    # 호가창 전체가 0.02%쯤이어도 호가마다 구간이 따로 잡힌다
+    assert len(depth) >= 2 * LEVELS
+    assert np.allclose(np.diff(depth['price']), TICK)
+
+    walls = detect_walls(depth)
+    assert set(zip(walls['side'], walls['price'])) == {('bid', bid_wall), ('ask', ask_wall)}
+    assert walls.set_index('side')['size'].to_dict() == pytest.approx({'bid': 4.0, 'ask': 3.0})
+
+
+def test_level_average_uses_only_snapshots_where_it_was_visible():
+    rng = np.random.default_rng(1)
+    window = DepthWindow(window=60)
+    deep = 130_000_000.0 - TICK * (LEVELS - 1)  # 가장 먼 매수 호가
+    for i in range(60):
+        # 앞 10개 스냅샷에서만 보이고 뒤에서는 가격이 올라 호가창 밖으로 밀린다
+        best_bid = 130_000_000.0 if i < 10 else 130_000_000.0 + 5 * TICK
+        window.add(btc_orderbook(rng, best_bid, {deep: 2.0}))
+
+    depth = window.depth().set_index('price')
+    assert depth.loc[deep, 'bid_size'] == pytest.approx(2.0)
+
+
+def test_bucket_width_follows_current_tick():
+    rng = np.random.default_rng(2)
+    window = DepthWindow(window=10, bucket_ticks=5)
+    book = btc_orderbook(rng, 130_000_000.0)
+    window.add(book)
+    depth = window.depth()
+
+    assert np.allclose(np.diff(depth['price']), 5 * TICK)
+    units = book['orderbook_units']
+    assert depth['bid_size'].sum() == pytest.approx(sum(u['bid_size'] for u in units))
+    assert depth['ask_size'].sum() == pytest.approx(sum(u['ask_size'] for u in units))
+
+    # 가격대가 바뀌어 호가 단위가 달라지면 구간 폭도 최신 호가창을 따른다
+    window.add({'market': 'KRW-BTC', 'orderbook_units': [
+        {'bid_price': 999_500.0 - 500 * i, 'bid_size': 1.0, 'ask_price': 1_000_000.0 + 1000 * i, 'ask_size': 1.0}
+        for i in range(LEVELS)]})
+    assert window.tick == 500.0
+
+
+def test_tick_size_of_single_level_book_is_spread():
+    assert tick_size(np.array([129_999_000.0, 130_001_000.0])) == 2000.0
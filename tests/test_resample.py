@@ -0,0 +1,107 @@
+"""1분봉 리샘플링을 pandas resample 결과와 비교"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from resample import TimeframeSet, resample_candles
+
+# 업비트 간격 → pandas 규칙 (모두 UTC 기준, 왼쪽 경계 포함/표시)
+RULES = {
+    '5분': '5min', '15분': '15min', '1시간': '60min', '4시간': '240min',
+    '일봉': 'D', '주봉': 'W-MON', '월봉': 'MS'
+}
+
+
+def minute_candles(rng, start, n, missing=0.0):
+    """1분봉 (missing 비율만큼 거래 없는 분을 뺀다)"""
+    times = pd.date_range(start, periods=n, freq='min')
+    times = times[rng.random(n) >= missing]
+    close = 100 + np.cumsum(rng.normal(0, 1, len(times)))
+    volume = rng.exponential(1, len(times))
+    return pd.DataFrame({
+        'candle_date_time_utc': times.strftime('%Y-%m-%dT%H:%M:%S'),
+        'candle_date_time_kst': times + pd.Timedelta(hours=9),
+        'opening_price': close + rng.normal(0, 0.5, len(times)),
+        'high_price': close + 2,
+        'low_price': close - 2,
+        'trade_price': close,
+        'candle_acc_trade_price': close * volume,
+        'candle_acc_trade_volume': volume
+    })
+
+
+def reference(base_df, interval):
+    """pandas resample로 만든 기대값 (1분봉이 없는 구간은 제외)"""
+    indexed = base_df.set_index(pd.to_datetime(base_df['candle_date_time_utc']))
+    rule = RULES[interval]
+    kwargs = {'closed': 'left', 'label': 'left'} if rule == 'W-MON' else {}
+    grouped = indexed.resample(rule, **kwargs)
+    out = pd.DataFrame({
+        'opening_price': grouped['opening_price'].first(),
+        'high_price': grouped['high_price'].max(),
+        'low_price': grouped['low_price'].min(),
+        'trade_price': grouped['trade_price'].last(),
+        'candle_acc_trade_price': grouped['candle_acc_trade_price'].sum(),
+        'candle_acc_trade_volume': grouped['candle_acc_trade_volume'].sum(),
+        'minutes': grouped['trade_price'].count()
+    })
+    out = out[out['minutes'] > 0]
+    out.insert(0, 'candle_date_time_utc', out.index.strftime('%Y-%m-%dT%H:%M:%S'))
+    return out.reset_index(drop=True)
+
+
+def assert_same(actual, expected):
+    columns = ['candle_date_time_utc', 'opening_price', 'high_price', 'low_price', 'trade_price',
+               'candle_acc_trade_price', 'candle_acc_trade_volume']
+    pd.testing.assert_frame_equal(actual[columns].reset_index(drop=True),
+                                  expected[columns].reset_index(drop=True), check_exact=False, rtol=1e-12)
+
+
+@pytest.mark.parametrize('interval', list(RULES))
+def test_resample_candles_matches_pandas(interval):
+    rng = np.random.default_rng(len(interval))
+    base = minute_candles(rng, '2026-01-28 21:17', 60 * 24 * 40, missing=0.2)
+    assert_same(resample_candles(base, interval), reference(base, interval))
+
+
+@pytest.mark.parametrize('interval', ['5분', '1시간', '4시간'])
+def test_timeframe_set_incremental_matches_pandas(interval):
+    rng = np.random.default_rng(3)
+    feed = minute_candles(rng, '2026-01-01 00:03', 6000)
+    max_base = 1500
+    timeframes = TimeframeSet(max_base=max_base)
+    timeframes.update(feed.iloc[:max_base])
+    timeframes.get(interval)
+
+    for end in range(max_base + 1, len(feed), 173):
+        window = feed.iloc[end - max_base:end].copy()
+        window.loc[window.index[-1], 'trade_price'] += 0.5  # 미마감 1분봉 수정
+        timeframes.update(window)
+
+        expected = reference(timeframes.base, interval)
+        # 보관 구간 첫 캔들은 1분봉이 다 있을 때만 남는다
+        span = pd.Timedelta(RULES[interval]) // pd.Timedelta(minutes=1)
+        if expected['minutes'].iloc[0] < span:
+            expected = expected.iloc[1:]
+        assert len(timeframes.base) == max_base
+        assert_same(timeframes.get(interval), expected)
+
+
+def test_first_bucket_kept_only_when_complete():
+    rng = np.random.default_rng(5)
+    base = minute_candles(rng, '2026-01-01 00:00', 30)
+
+    # 경계에서 시작하고 빠진 분이 없으면 첫 5분봉도 남긴다
+    timeframes = TimeframeSet()
+    timeframes.update(base)
+    assert timeframes.get('5분')['candle_date_time_utc'].iloc[0] == '2026-01-01T00:00:00'
+
+    # 경계에서 시작해도 첫 구간에 빠진 분이 있으면 버린다
+    timeframes = TimeframeSet()
+    timeframes.update(base.drop(index=2).reset_index(drop=True))
+    assert timeframes.get('5분')['candle_date_time_utc'].iloc[0] == '2026-01-01T00:05:00'
+
+    # 경계 뒤에서 시작하면 첫 구간은 앞이 잘린 것이라 버린다
+    timeframes = TimeframeSet()
+    timeframes.update(base.iloc[3:].reset_index(drop=True))
+    assert timeframes.get('5분')['candle_date_time_utc'].iloc[0] == '2026-01-01T00:05:00'
@@ -0,0 +1,53 @@
+"""TickProfile 구간 배정과 재구간화를 새로 만든 히스토그램과 비교"""
+import numpy as np
+import pytest
+
+from tick_profile import TickProfile
+
+
+def fresh_histogram(profile, prices, volumes, is_buy):
+    """profile의 지금 격자(origin, width)로 처음부터 다시 센 매수/매도 히스토그램"""
+    idx = profile._index(prices)
+    buy = np.bincount(idx[is_buy], weights=volumes[is_buy], minlength=profile.bins)
+    sell = np.bincount(idx[~is_buy], weights=volumes[~is_buy], minlength=profile.bins)
+    return buy, sell
+
+
+def trades(rng, n, start=130_000_000, tick=1000, scale=0.002):
+    """호가 단위로 반올림한 무작위 보행 체결 (가격이 구간 경계에 자주 걸린다)"""
+    prices = start * np.exp(np.cumsum(rng.normal(0, scale, n)))
+    return np.round(prices / tick) * tick, rng.exponential(0.01, n), rng.random(n) < 0.5
+
+
+@pytest.mark.parametrize('start', [4066.3698689774415, 3442.264808181643, 130_000_000.0])
+def test_scalar_path_matches_vector_bins_on_edges(start):
+    # 구간 경계와 그 바로 위/아래 가격: // 와 floor(/)가 갈리던 경우를 포함한다
+    one, many = TickProfile(window=1000, bins=64), TickProfile(window=1000, bins=64)
+    one._init_grid(start)
+    many._init_grid(start)
+    edges = one.origin + np.arange(1, 64) * one.width
+    prices = (edges[:, None] + np.array([-1, 0, 1]) * np.spacing(edges)[:, None]).ravel()
+    volumes = np.ones(len(prices))
+    is_buy = np.arange(len(prices)) % 2 == 0
+
+    for price, volume, buy in zip(prices, volumes, is_buy):
+        one.add(price, volume, buy)  # on_trade 경로
+    many.add_many(prices, volumes, is_buy)
+
+    assert (one.origin, one.width) == (many.origin, many.width)
+    np.testing.assert_array_equal(one.buy, many.buy)
+    np.testing.assert_array_equal(one.sell, many.sell)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_grown_profile_matches_fresh_histogram(seed):
+    rng = np.random.default_rng(seed)
+    prices, volumes, is_buy = trades(rng, 20_000)
+    profile = TickProfile(window=50_000, bins=64)
+    for start in range(0, len(prices), 997):
+        profile.add_many(prices[start:start + 997], volumes[start:start + 997], is_buy[start:start + 997])
+
+    assert profile.width > profile.base_width  # 범위를 넓히며 여러 번 재구간화했다
+    buy, sell = fresh_histogram(profile, prices, volumes, is_buy)
+    np.testing.assert_allclose(profile.buy, buy, atol=1e-12)
+    np.testing.assert_allclose(profile.sell, sell, atol=1e-12)
@@ -0,0 +1,237 @@
+"""체결(틱) 기반 거래량 프로파일
+
+캔들 고가-저가에 거래량을 고르게 펴는 calculate_volume_profile과 달리, 실제
+체결 가격에 체결량을 그대로 쌓는다. 체결은 REST `/v1/trades/ticks`(페이지
+조회)나 실시간 체결 스트림에서 받고, `ask_bid`로 매수(BID)/매도(ASK) 체결량을
+나눠 센다.
+
+히스토그램은 고정 개수(bins) 구간이다. 범위를 벗어난 가격이 오면 이웃 구간을
+둘씩 합쳐 폭을 두 배로 넓히고(재구간화), 범위가 다시 좁아지면 창 안의 체결로
+가는 구간을 다시 만든다. 최근 window건 체결은 미리 잡아 둔 링 버퍼에 보관해
+창을 벗어난 체결을 빼므로, 수백만 건을 넣어도 메모리는 window와 bins로
+고정이고 체결 한 건 반영은 (분할 상환) O(1)이다.
+
+    profile = TickProfile(window=1_000_000)
+    sync_trades(profile, 'KRW-BTC')
+    profile_df = profile.frame()
+"""
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from upbit_api import fetch_trades
+
+DEFAULT_WINDOW = 1_000_000    # 보관할 최근 체결 수
+DEFAULT_BINS = 1024           # 히스토그램 구간 수 (짝수)
+DEFAULT_BUCKET_PCT = 0.0001   # 가장 가는 구간 폭: 첫 체결가의 0.01%
+DEFAULT_ROWS = 200            # frame()이 돌려주는 최대 행 수
+DEFAULT_SYNC_TRADES = 5000    # sync_trades 한 번에 받을 최대 체결 수
+
+
+class TickProfile:
+    """최근 window건 체결의 가격 구간별 매수/매도 체결량 (스레드 안전)"""
+
+    def __init__(self, window=DEFAULT_WINDOW, bins=DEFAULT_BINS, bucket_pct=DEFAULT_BUCKET_PCT):
+        if bins % 2:
+            raise ValueError("bins는 짝수여야 합니다.")
+        self.window = window
+        self.bins = bins
+        self.bucket_pct = bucket_pct
+        self.base_width = None  # 가장 가는 구간 폭
+        self.width = None
+        self.origin = None      # 0번 구간 하단 가격
+        self.buy = np.zeros(bins)
+        self.sell = np.zeros(bins)
+        # 창 안 체결 링 버퍼 (가장 오래된 체결 = (head - size) % window)
+        self.prices = np.empty(window)
+        self.volumes = np.empty(window)
+        self.is_buy = np.empty(window, dtype=bool)
+        self.head = 0
+        self.size = 0
+        self.total = 0          # 지금까지 넣은 체결 수 (캐시 키용 버전)
+        self.last_id = None     # 마지막으로 넣은 체결 번호
+        self._since_rebuild = 0
+        self.lock = threading.RLock()  # add_trades가 add_many를 감싸 부른다
+
+    def _init_grid(self, price):
+        self.base_width = self.width = price * self.bucket_pct
+        self.origin = (math.floor(price / self.width) - self.bins // 2) * self.width
+
+    def _index(self, prices):
+        # 경계 가격의 부동소수점 오차로 범위를 벗어나지 않게 자른다
+        return np.clip(np.floor((prices - self.origin) / self.width).astype(np.int64), 0, self.bins - 1)
+
+    def _bin(self, price):
+        # add_many와 같은 구간에 넣도록 배열 경로(_index)를 그대로 쓴다
+        return int(self._index(price))
+
+    def _grow(self, low, high):
+        """[low, high]가 들어올 때까지 구간 폭을 두 배로 (이웃 구간 합치기)"""
+        half = self.bins // 2
+        while low < self.origin or high >= self.origin + self.bins * self.width:
+            down = low < self.origin
+            for hist in (self.buy, self.sell):
+                merged = hist.reshape(-1, 2).sum(axis=1)
+                hist[:] = 0
+                if down:
+                    hist[half:] = merged  # 기존 범위가 위쪽 절반으로
+                else:
+                    hist[:half] = merged
+            if down:
+                self.origin -= self.bins * self.width
+            self.width *= 2
+
+    def _rebuild(self):
+        """창 안 체결 범위에 맞는 가장 가는 폭으로 히스토그램을 다시 만든다"""
+        self._since_rebuild = 0
+        if not self.size:
+            return
+        prices, volumes, is_buy = self._window()
+        low, high = prices.min(), prices.max()
+        level = max(0, math.ceil(math.log2(max((high - low) / self.base_width, 1) / (self.bins // 2))))
+        width = self.base_width * 2 ** level
+        if width >= self.width:
+            return
+        self.width = width
+        self.origin = (math.floor((low + high) / 2 / width) - self.bins // 2) * width
+        idx = self._index(prices)
+        self.buy = np.bincount(idx[is_buy], weights=volumes[is_buy], minlength=self.bins).astype(float)
+        self.sell = np.bincount(idx[~is_buy], weights=volumes[~is_buy], minlength=self.bins).astype(float)
+
+    def _window(self, count=None):
+        """창 안 체결 중 오래된 쪽 count건 (기본 전체): (가격, 체결량, 매수 여부)"""
+        count = self.size if count is None else count
+        positions = (self.head - self.size + np.arange(count)) % self.window
+        return self.prices[positions], self.volumes[positions], self.is_buy[positions]
+
+    def _expire(self, count):
+        """가장 오래된 체결 count건을 히스토그램에서 뺀다"""
+        prices, volumes, is_buy = self._window(count)
+        idx = self._index(prices)
+        self.buy -= np.bincount(idx[is_buy], weights=volumes[is_buy], minlength=self.bins)
+        self.sell -= np.bincount(idx[~is_buy], weights=volumes[~is_buy], minlength=self.bins)
+        self.size -= count
+
+    def add(self, price, volume, is_buy):
+        """체결 한 건 반영 (O(1), 범위를 벗어나면 재구간화)"""
+        with self.lock:
+            if self.width is None:
+                self._init_grid(price)
+            if self.size == self.window:
+                old = self.head  # 꽉 찼으면 head가 가장 오래된 체결
+                (self.buy if self.is_buy[old] else self.sell)[self._bin(self.prices[old])] -= self.volumes[old]
+                self.size -= 1
+            self._grow(price, price)
+            (self.buy if is_buy else self.sell)[self._bin(price)] += volume
+            self.prices[self.head] = price
+            self.volumes[self.head] = volume
+            self.is_buy[self.head] = is_buy
+            self.head = (self.head + 1) % self.window
+            self.size += 1
+            self.total += 1
+            self._since_rebuild += 1
+            if self._since_rebuild >= self.window:
+                self._rebuild()
+
+    def add_many(self, prices, volumes, is_buy):
+        """체결 여러 건을 한 번에 반영 (배열 연산, 오래된 순으로 넘긴다)"""
+        prices = np.asarray(prices, dtype=float)[-self.window:]
+        volumes = np.asarray(volumes, dtype=float)[-self.window:]
+        is_buy = np.asarray(is_buy, dtype=bool)[-self.window:]
+        n = len(prices)
+        if not n:
+            return
+        with self.lock:
+            if self.width is None:
+                self._init_grid(prices[-1])
+            overflow = self.size + n - self.window
+            if overflow > 0:
+                self._expire(overflow)
+            self._grow(prices.min(), prices.max())
+            idx = self._index(prices)
+            self.buy += np.bincount(idx[is_buy], weights=volumes[is_buy], minlength=self.bins)
+            self.sell += np.bincount(idx[~is_buy], weights=volumes[~is_buy], minlength=self.bins)
+            positions = (self.head + np.arange(n)) % self.window
+            self.prices[positions] = prices
+            self.volumes[positions] = volumes
+            self.is_buy[positions] = is_buy
+            self.head = (self.head + n) % self.window
+            self.size += n
+            self.total += n
+            self._since_rebuild += n
+            if self._since_rebuild >= self.window:
+                self._rebuild()
+
+    def add_trades(self, trades):
+        """REST/실시간 체결 목록 반영 (오래된 순, 이미 넣은 체결 번호 이하는 건너뜀)
+
+        체결 번호는 유일하지만 순서를 완전히 보장하지는 않아 중복 제거는 근사다.
+        """
+        with self.lock:
+            if self.last_id is not None:
+                trades = [t for t in trades if t['sequential_id'] > self.last_id]
+            if not trades:
+                return 0
+            n = len(trades)
+            self.add_many(
+                np.fromiter((t['trade_price'] for t in trades), dtype=float, count=n),
+                np.fromiter((t['trade_volume'] for t in trades), dtype=float, count=n),
+                np.fromiter((t['ask_bid'] == 'BID' for t in trades), dtype=bool, count=n)
+            )
+            self.last_id = max(self.last_id or 0, max(t['sequential_id'] for t in trades))
+            return n
+
+    def on_trade(self, data):
+        """TradeStream 체결 메시지 리스너"""
+        with self.lock:
+            if self.last_id is not None and data['sequential_id'] <= self.last_id:
+                return
+            self.add(data['trade_price'], data['trade_volume'], data['ask_bid'] == 'BID')
+            self.last_id = data['sequential_id']
+
+    def frame(self, max_rows=DEFAULT_ROWS):
+        """거래량 프로파일 표 (calculate_volume_profile과 같은 컬럼 + buy_volume, sell_volume)
+
+        체결이 있는 범위만, max_rows행 이하가 되도록 이웃 구간을 합쳐 돌려준다.
+        """
+        with self.lock:
+            if not self.size:
+                return pd.DataFrame()
+            # 뺄셈 누적 오차로 남은 아주 작은 값은 0으로 본다
+            buy = np.where(self.buy > 1e-12, self.buy, 0.0)
+            sell = np.where(self.sell > 1e-12, self.sell, 0.0)
+            origin, width = self.origin, self.width
+
+        filled = np.flatnonzero(buy + sell)
+        if not len(filled):
+            return pd.DataFrame()
+        lo, hi = filled[0], filled[-1] + 1
+        factor = math.ceil((hi - lo) / max_rows)
+        starts = np.arange(lo, hi, factor)
+        buy = np.add.reduceat(buy[lo:hi], starts - lo)
+        sell = np.add.reduceat(sell[lo:hi], starts - lo)
+        lower = origin + starts * width
+        upper = np.minimum(lower + factor * width, origin + hi * width)
+        return pd.DataFrame({
+            'price': (lower + upper) / 2,
+            'volume': buy + sell,
+            'buy_volume': buy,
+            'sell_volume': sell,
+            'price_range': [f"{a:.0f} - {b:.0f}" for a, b in zip(lower, upper)]
+        })
+
+    def stats(self):
+        with self.lock:
+            return {
+                'trades': self.size,
+                'total': self.total,
+                'width': None if self.width is None else float(self.width),
+                'bytes': sum(a.nbytes for a in (self.buy, self.sell, self.prices, self.volumes, self.is_buy))
+            }
+
+
+def sync_trades(profile, market, max_trades=DEFAULT_SYNC_TRADES):
+    """마지막으로 넣은 체결 이후 체결을 REST로 받아 반영, 새로 넣은 건수 반환"""
+    return profile.add_trades(fetch_trades(market, max_trades, since_id=profile.last_id))
@@ -0,0 +1,311 @@
+"""업비트 REST API 조회 함수"""
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+import requests.adapters
+
+from metrics import recorder
+
+BASE_URL = "https://api.upbit.com/v1"
+
+# 차트 간격별 캔들 엔드포인트
+INTERVAL_ENDPOINTS = {
+    '1분': 'minutes/1',
+    '5분': 'minutes/5',
+    '15분': 'minutes/15',
+    '30분': 'minutes/30',
+    '1시간': 'minutes/60',
+    '4시간': 'minutes/240',
+    '일봉': 'days',
+    '주봉': 'weeks',
+    '월봉': 'months'
+}
+
+# 차트 간격별 캔들 길이 (월봉은 길이가 일정하지 않아 None)
+INTERVAL_DELTAS = {
+    '1분': pd.Timedelta(minutes=1),
+    '5분': pd.Timedelta(minutes=5),
+    '15분': pd.Timedelta(minutes=15),
+    '30분': pd.Timedelta(minutes=30),
+    '1시간': pd.Timedelta(hours=1),
+    '4시간': pd.Timedelta(hours=4),
+    '일봉': pd.Timedelta(days=1),
+    '주봉': pd.Timedelta(weeks=1),
+    '월봉': None
+}
+
+MAX_CANDLES_PER_REQUEST = 200  # 캔들 API 1회 최대 조회 개수
+MAX_TICKER_MARKETS = 200       # 현재가 API 1회 조회 종목 수 (URL 길이 제한 대비)
+MAX_TRADES_PER_REQUEST = 500   # 체결 API 1회 최대 조회 개수
+REQUESTS_PER_SECOND = 10       # 시세 API 그룹별 초당 요청 제한
+
+CONNECT_TIMEOUT = 3.05  # 초
+READ_TIMEOUT = 10
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5      # 재시도 대기: 0.5, 1, 2, 4초
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """초당 요청 수 제한 토큰 버킷 (스레드 안전)
+
+    응답의 `Remaining-Req` 헤더로 남은 요청 수를 받아 토큰 수를 맞춘다.
+    같은 IP를 쓰는 다른 프로세스의 호출까지 반영하기 위함.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def sync(self, remaining):
+        """서버가 알려준 이번 초의 남은 요청 수로 토큰 수 보정"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, remaining)
+
+    def drain(self):
+        """429 응답 시 남은 토큰 비우기"""
+        with self.lock:
+            self.updated = time.monotonic()
+            self.tokens = 0.0
+
+
+def parse_remaining_req(header):
+    """`group=candles; min=1800; sec=29` 형식 헤더 파싱"""
+    fields = dict(
+        part.strip().split('=', 1) for part in header.split(';') if '=' in part
+    )
+    return fields.get('group'), int(fields.get('sec', 0))
+
+
+class UpbitClient:
+    """업비트 시세 API 공용 클라이언트
+
+    keep-alive 커넥션 풀, 요청별 타임아웃, 백오프 재시도, 그룹별 토큰 버킷을
+    하나로 묶어 여러 세션과 스캐너가 요청 한도를 나눠 쓰게 한다.
+    """
+
+    def __init__(self, pool_size=32, rate=REQUESTS_PER_SECOND,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries=MAX_RETRIES):
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept': 'application/json'})
+        self.rate = rate
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+
+    def bucket(self, group):
+        with self.buckets_lock:
+            if group not in self.buckets:
+                self.buckets[group] = TokenBucket(self.rate)
+            return self.buckets[group]
+
+    def get(self, path, params=None, group=None, raw=False):
+        """GET 요청 후 JSON 반환 (429/5xx/네트워크 오류는 백오프 재시도)
+
+        raw=True면 디코딩하지 않은 응답 바이트를 반환한다.
+        """
+        group = group or path.split('/')[0]
+        url = f"{BASE_URL}/{path}"
+
+        for attempt in range(self.max_retries + 1):
+            bucket = self.bucket(group)
+            bucket.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(BACKOFF_BASE * 2 ** attempt)
+                continue
+            recorder.add(f'api:{group}', (time.perf_counter() - started) * 1000,
+                         status=response.status_code, bytes=len(response.content))
+
+            remaining = response.headers.get('Remaining-Req')
+            if remaining:
+                header_group, sec = parse_remaining_req(remaining)
+                self.bucket(header_group or group).sync(sec)
+
+            if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                if response.status_code == 429:
+                    bucket.drain()
+                time.sleep(BACKOFF_BASE * 2 ** attempt)
+                continue
+
+            response.raise_for_status()
+            return response.content if raw else response.json()
+
+
+client = UpbitClient()
+
+
+def _format_cursor(ts):
+    """`to` 파라미터용 UTC 시각 문자열"""
+    return ts.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def fetch_candle_page(market, interval, count=MAX_CANDLES_PER_REQUEST, to=None, raw=False):
+    """캔들 한 페이지 조회 (`to` 이전 최대 200개, 최신순, raw=True면 응답 바이트)"""
+    params = {'market': market, 'count': min(count, MAX_CANDLES_PER_REQUEST)}
+    if to is not None:
+        params['to'] = to
+    return client.get(f"candles/{INTERVAL_ENDPOINTS[interval]}", params, raw=raw)
+
+
+def _plan_cursors(interval, count, to):
+    """페이지별 `to` 커서 계산 (캔들 길이가 일정한 간격만 미리 계산 가능)"""
+    pages = math.ceil(count / MAX_CANDLES_PER_REQUEST)
+    delta = INTERVAL_DELTAS[interval]
+    if delta is None or pages == 1:
+        return [to]
+
+    anchor = pd.Timestamp.now(tz='UTC') if to is None else pd.Timestamp(to)
+    anchor = anchor.tz_localize('UTC') if anchor.tzinfo is None else anchor.tz_convert('UTC')
+    span = delta * MAX_CANDLES_PER_REQUEST
+    cursors = [to]
+    cursors += [_format_cursor(anchor - span * k) for k in range(1, pages)]
+    return cursors
+
+
+def _candles_to_frame(rows, count):
+    """페이지 결과 병합: 중복 제거 후 시간순 정렬, 최신 count개만 유지"""
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    df = df.drop_duplicates('candle_date_time_utc')
+    df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
+    df = df.sort_values('candle_date_time_kst').tail(count).reset_index(drop=True)
+    return df
+
+
+def _row_times(rows):
+    """JSON 페이지 디코더: 행 목록 그대로와 UTC 시작 시각 목록"""
+    return rows, [row['candle_date_time_utc'] for row in rows]
+
+
+def fetch_candle_pages(market, interval, count=200, to=None, decode_page=_row_times, raw=False,
+                       max_workers=4):
+    """`to` 커서로 과거 방향 페이지를 나눠 병렬 조회하고 디코딩한 페이지 목록을 반환
+
+    decode_page(응답)는 (페이지, 그 페이지 캔들의 UTC 시작 시각 목록)을 돌려준다.
+    거래가 없는 구간 때문에 부족한 개수는 가장 오래된 캔들부터 이어서 채우고,
+    페이지 사이 중복 제거와 정렬은 호출하는 쪽에서 한다.
+    """
+    pages = []
+    seen = set()
+    cursor = to
+    remaining = count
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while remaining > 0:
+            cursors = _plan_cursors(interval, remaining, cursor)
+            page_size = min(remaining, MAX_CANDLES_PER_REQUEST)
+            decoded = list(executor.map(
+                lambda c: decode_page(fetch_candle_page(market, interval, page_size, c, raw=raw)),
+                cursors
+            ))
+
+            before = len(seen)
+            for page, times in decoded:
+                pages.append(page)
+                seen.update(times)
+
+            # 가장 오래된 페이지가 덜 찼으면 상장 시점까지 모두 받은 것
+            if len(seen) == before or len(decoded[-1][1]) < page_size:
+                break
+
+            remaining = count - len(seen)
+            cursor = min(seen) + 'Z'
+
+    return pages
+
+
+def fetch_candles(market, interval, count=200, to=None, max_workers=4):
+    """캔들 데이터 조회
+
+    200개를 넘으면 `to` 커서로 과거 방향 페이지를 나눠 병렬 조회한다 (fetch_candle_pages).
+    """
+    pages = fetch_candle_pages(market, interval, count, to, max_workers=max_workers)
+    return _candles_to_frame([row for page in pages for row in page], count)
+
+
+def fetch_markets(quote='KRW'):
+    """마켓 목록 조회 (quote 통화 마켓만)"""
+    markets = client.get('market/all', {'isDetails': 'false'})
+    return [m for m in markets if m['market'].startswith(f"{quote}-")]
+
+
+def fetch_tickers(markets):
+    """여러 종목 현재가/24시간 통계 조회 (MAX_TICKER_MARKETS개당 요청 1회)"""
+    markets = list(markets)
+    tickers = []
+    for i in range(0, len(markets), MAX_TICKER_MARKETS):
+        chunk = markets[i:i + MAX_TICKER_MARKETS]
+        tickers += client.get('ticker', {'markets': ','.join(chunk)})
+    return tickers
+
+
+def fetch_orderbooks(markets):
+    """여러 종목 호가 스냅샷 조회 (MAX_TICKER_MARKETS개당 요청 1회)"""
+    markets = list(markets)
+    orderbooks = []
+    for i in range(0, len(markets), MAX_TICKER_MARKETS):
+        chunk = markets[i:i + MAX_TICKER_MARKETS]
+        orderbooks += client.get('orderbook', {'markets': ','.join(chunk)})
+    return orderbooks
+
+
+def fetch_trade_page(market, count=MAX_TRADES_PER_REQUEST, cursor=None, days_ago=None):
+    """최근 체결 한 페이지 조회 (`cursor` 체결 번호 이전 최대 500건, 최신순)"""
+    params = {'market': market, 'count': min(count, MAX_TRADES_PER_REQUEST)}
+    if cursor is not None:
+        params['cursor'] = cursor
+    if days_ago is not None:
+        params['daysAgo'] = days_ago
+    return client.get('trades/ticks', params)
+
+
+def fetch_trades(market, count=MAX_TRADES_PER_REQUEST, since_id=None, days_ago=None):
+    """최근 체결 최대 count건 (sequential_id가 since_id 이하인 체결 전에서 멈춤), 오래된 순
+
+    커서가 앞 페이지의 마지막 체결 번호라 페이지는 순서대로 받는다.
+    """
+    trades = []
+    cursor = None
+    while len(trades) < count:
+        requested = min(count - len(trades), MAX_TRADES_PER_REQUEST)
+        page = fetch_trade_page(market, requested, cursor, days_ago)
+        fresh = page if since_id is None else [t for t in page if t['sequential_id'] > since_id]
+        trades += fresh
+        # 덜 찬 페이지면 더 오래된 체결이 없고, 이미 받은 체결에 닿으면 그만 받는다
+        if len(page) < requested or len(fresh) < len(page):
+            break
+        cursor = page[-1]['sequential_id']
+    trades.reverse()
+    return trades